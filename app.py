@@ -1,14 +1,60 @@
-from fastapi import FastAPI, Query
+import os
+import secrets
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 import pandas as pd
 
+from cleaning.snapshot import RELOAD_INTERVAL, SnapshotReloader
+
 # --- Load cleaned dataset ---
-df = pd.read_csv("dataset/new_cleaned_properties.csv")
+# Only the columns the endpoints use, in compact form (categoricals, datetime64);
+# the Parquet dataset stores the dates as timestamps already (the CSV fallback parses them).
+# Each snapshot also holds the row indexes (keys normalized once, at load) the endpoints filter
+# through and the price cube they look prices up in. A background thread swaps in a new snapshot
+# when a cleaning run replaces the dataset, so the API picks it up without a restart.
+API_COLUMNS = ["city", "property_type", "property_category", "price", "added_date", "updated_date"]
+RELOAD_SECONDS = float(os.environ.get("DATASET_RELOAD_SECONDS", RELOAD_INTERVAL))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+ADMIN_OPEN = os.environ.get("ADMIN_OPEN") == "1"    # opt in to admin endpoints without a token (local use)
+VERSION_HEADER = "X-Dataset-Version"
+
+reloader = SnapshotReloader(API_COLUMNS, interval=RELOAD_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    reloader.start()
+    yield
+    reloader.stop()
+
+
+app = FastAPI(title="Nigeria Real Estate API", version="1.0", lifespan=lifespan)
+
+
+def current_snapshot(request: Request):
+    """The snapshot this request reads from start to finish, even if a reload swaps in another."""
+    request.state.snapshot = reloader.current
+    return request.state.snapshot
+
+
+@app.middleware("http")
+async def dataset_version_header(request: Request, call_next):
+    response = await call_next(request)
+    snapshot = getattr(request.state, "snapshot", None) or reloader.current
+    response.headers[VERSION_HEADER] = snapshot.version
+    return response
 
-# Ensure date columns are datetime
-df['added_date'] = pd.to_datetime(df['added_date'], errors='coerce')
-df['updated_date'] = pd.to_datetime(df['updated_date'], errors='coerce')
 
-app = FastAPI(title="Nigeria Real Estate API", version="1.0")
+def require_admin(x_admin_token: str = Header(None)):
+    """Admin endpoints need ADMIN_TOKEN in the X-Admin-Token header; with no token set they are
+    closed, unless ADMIN_OPEN=1 leaves them open."""
+    if not ADMIN_TOKEN:
+        if ADMIN_OPEN:
+            return
+        raise HTTPException(status_code=403, detail="admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="admin token required")
 
 
 # -----------------------
@@ -17,21 +63,58 @@ app = FastAPI(title="Nigeria Real Estate API", version="1.0")
 @app.get("/api/average_price")
 def average_price(
         city: str = Query(..., description="City name"),
-        property_type: str = Query(None, description="Optional property type filter")
+        property_type: str = Query(None, description="Optional property type filter"),
+        snapshot=Depends(current_snapshot)
 ):
-    df_city = df[df['city'].str.lower() == city.lower()]
+    stats = snapshot.cube.get(city, property_type or None)
+    avg_price = stats["mean"]
 
-    if property_type:
-        df_city = df_city[df_city['property_type'].str.lower() == property_type.lower()]
+    return {
+        "city": city.title(),
+        "property_type": property_type.title() if property_type else "All",
+        "average_price": round(avg_price, 2) if avg_price is not None else None,
+        "count": stats["listings"]
+    }
 
-    avg_price = df_city['price'].mean()
-    count = len(df_city)
 
+# -----------------------
+# Endpoint: Price Statistics
+# -----------------------
+@app.get("/api/stats")
+def price_stats(
+        city: str = Query(None, description="Optional city filter"),
+        property_type: str = Query(None, description="Optional property type filter"),
+        snapshot=Depends(current_snapshot)
+):
+    """Count, sum, min, max, mean, median and percentiles of price for one cell of the cube."""
     return {
-        "city": city.title(),
+        "city": city.title() if city else "All",
         "property_type": property_type.title() if property_type else "All",
-        "average_price": round(avg_price, 2) if not pd.isna(avg_price) else None,
-        "count": count
+        **snapshot.cube.get(city or None, property_type or None)
+    }
+
+
+@app.get("/api/stats/cities")
+def city_stats(
+        property_type: str = Query(None, description="Optional property type filter"),
+        snapshot=Depends(current_snapshot)
+):
+    """Price statistics per city, most listings first."""
+    return {
+        "property_type": property_type.title() if property_type else "All",
+        "cities": snapshot.cube.breakdown("city", property_type=property_type or None)
+    }
+
+
+@app.get("/api/stats/property_types")
+def property_type_stats(
+        city: str = Query(None, description="Optional city filter"),
+        snapshot=Depends(current_snapshot)
+):
+    """Price statistics per property type, most listings first."""
+    return {
+        "city": city.title() if city else "All",
+        "property_types": snapshot.cube.breakdown("property_type", city=city or None)
     }
 
 
@@ -41,12 +124,12 @@ def average_price(
 @app.get("/api/trends")
 def monthly_trends(
         city: str = Query(..., description="City name"),
-        property_type: str = Query(None, description="Optional property type filter")
+        property_type: str = Query(None, description="Optional property type filter"),
+        property_category: str = Query(None, description="Optional property category filter"),
+        snapshot=Depends(current_snapshot)
 ):
-    df_city = df[df['city'].str.lower() == city.lower()]
-
-    if property_type:
-        df_city = df_city[df_city['property_type'].str.lower() == property_type.lower()]
+    df_city = snapshot.listings.select(["added_date", "price"], city=city, property_type=property_type or None,
+                                       property_category=property_category or None)
 
     # Extract month-year from added_date
     df_city['month_posted'] = df_city['added_date'].dt.to_period('M')
@@ -60,10 +143,39 @@ def monthly_trends(
     return {
         "city": city.title(),
         "property_type": property_type.title() if property_type else "All",
+        "property_category": property_category.title() if property_category else "All",
         "trends": trend_list
     }
 
 
+# -----------------------
+# Endpoint: Memory Report
+# -----------------------
+@app.get("/api/memory")
+def memory(snapshot=Depends(current_snapshot)):
+    """Bytes per column of the loaded listings, before and after compaction."""
+    return {
+        "rows": len(snapshot.df),
+        "columns": snapshot.memory_report.reset_index(names="column").to_dict(orient="records")
+    }
+
+
+# -----------------------
+# Admin: Dataset Reload
+# -----------------------
+@app.get("/admin/reload", dependencies=[Depends(require_admin)])
+def reload_status():
+    """The snapshot being served and the reloader's last check, error and reload count."""
+    return reloader.status()
+
+
+@app.post("/admin/reload", dependencies=[Depends(require_admin)])
+def trigger_reload(force: bool = Query(True, description="Reload even if the dataset files look unchanged")):
+    """Load the dataset now and swap it in; requests already running finish on the old snapshot."""
+    reloaded = reloader.reload(force=force)
+    return {"reloaded": reloaded, **reloader.status()}
+
+
 # -----------------------
 # Root endpoint
 # -----------------------
@@ -1,107 +1,325 @@
+import argparse
+import multiprocessing
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import pandas as pd
-from scrapers.propertypro_scraper import scrape_propertypro
-from scrapers.nigeria_property_center_scraper import scrape_all as scrape_npc
-from scrapers.private_propertng_scrapper import scrape_all as scrape_private
+from scrapers.propertypro_scraper import iter_propertypro
+from scrapers.nigeria_property_center_scraper import iter_all as iter_npc
+from scrapers.private_propertng_scrapper import iter_all as iter_private
+from scrapers import http_client
+from scrapers.async_fetch import DEFAULT_BURST, DEFAULT_CONCURRENCY, DEFAULT_RATE
+from scrapers.seen_store import SeenStore
+from scrapers.frontier import CrawlFrontier, DeferredCheckpoints
+from scrapers.metrics import metrics
+from scrapers.work_queue import DEFAULT_QUEUE_PATH, WorkQueue
+from scrapers import sharded_crawl
+from scrapers.records import (
+    COLUMN_MAP, STANDARD_COLUMNS, ChunkedCSVWriter, concat_csv_files, iter_normalized,
+)
+from cleaning import storage
+
+PARTS_DIR = os.path.join("dataset", "parts")
 
 # -----------------------------
 # 1️⃣ Helper: Normalize columns
 # -----------------------------
 def normalize_columns(df):
     """Ensure all DataFrames share the same column structure and names."""
-    column_map = {
-        "proper_type": "property_type",
-        "date_added": "added_date",
-        "date_updated": "updated_date",
-        "updated_dates": "updated_date",
-    }
-
     # Rename columns if necessary
-    df = df.rename(columns=column_map)
+    df = df.rename(columns=COLUMN_MAP)
 
     # Ensure all required columns exist
-    standard_columns = [
-        "title",
-        "property_type",
-        "location",
-        "price",
-        "bedrooms",
-        "bathrooms",
-        "toilets",
-        "added_date",
-        "updated_date",
-    ]
-
-    for col in standard_columns:
+    for col in STANDARD_COLUMNS:
         if col not in df.columns:
             df[col] = None
 
     # Keep only standard columns
-    return df[standard_columns]
+    return df[STANDARD_COLUMNS]
+
+def merge_with_existing(new_df, path):
+    """Append freshly scraped rows to the existing CSV.
+
+    Rows whose (title, location, property_type) reappear in the new batch
+    are treated as updated listings and replaced by the new version.
+    """
+    if not os.path.exists(path):
+        return new_df
+    existing = pd.read_csv(path)
+    key = ["title", "location", "property_type"]
+    replaced = existing.set_index(key).index.isin(new_df.set_index(key).index)
+    print(f"🔄 Merging {len(new_df)} new rows into {len(existing)} existing ({replaced.sum()} updated)")
+    return pd.concat([existing[~replaced], new_df], ignore_index=True)
 
 # -----------------------------
-# 2️⃣ Main scraping controller
+# 2️⃣ Per-source runner
 # -----------------------------
-def run_all_scrapers(propertypro_pages=2, npc_pages=1, private_pages=2):
-    """Run all three scrapers and combine their results into one CSV."""
-    all_dfs = []
-
-    print("\n🏠 Starting PropertyPro scraper...")
-    try:
-        propertypro_data = scrape_propertypro(max_pages=propertypro_pages)
-        if not isinstance(propertypro_data, pd.DataFrame):
-            propertypro_data = pd.DataFrame(propertypro_data)
-        propertypro_data = normalize_columns(propertypro_data)
-        all_dfs.append(propertypro_data)
-    except Exception as e:
-        print(f"⚠️ PropertyPro failed: {e}")
-
-    print("\n🏠 Starting NigeriaPropertyCentre scraper...")
-    try:
-        npc_data = scrape_npc(max_pages=npc_pages)
-        npc_df = pd.DataFrame(npc_data)
-        npc_df = normalize_columns(npc_df)
-        all_dfs.append(npc_df)
-    except Exception as e:
-        print(f"⚠️ NigeriaPropertyCentre failed: {e}")
-
-    print("\n🏠 Starting PrivateProperty scraper...")
-    try:
-        private_data = scrape_private(max_pages=private_pages)
-        private_df = pd.DataFrame(private_data)
-        private_df = normalize_columns(private_df)
-        all_dfs.append(private_df)
-    except Exception as e:
-        print(f"⚠️ PrivateProperty failed: {e}")
-
-    # Concatenate all DataFrames
-    if all_dfs:
-        final_df = pd.concat(all_dfs, ignore_index=True)
-    else:
-        final_df = pd.DataFrame(columns=[
-            "title", "property_type", "location", "price",
-            "bedrooms", "bathrooms", "toilets", "added_date", "updated_date"
-        ])
+def run_source(name, iter_fn, max_pages, part_path, resume=False, seen_store=None, frontier=None):
+    """Stream one scraper's normalized records into its part CSV.
+
+    Returns (name, records written, ok, seconds). Records written before a
+    failure stay in the part file and are kept in the combined output.
+    Records are written in chunks, and the scraper's checkpoints in the
+    crawl frontier and seen-listings store are committed only once the
+    chunk holding their records is on disk. A resumed run appends to the
+    part file it left behind, cut back to the last committed chunk.
+    """
+    print(f"\n🏠 Starting {name} scraper...")
+    start = time.perf_counter()
+    ok = True
+    checkpoints = DeferredCheckpoints(frontier, part_path)
+    resume_size = frontier.part_size(part_path) if resume and frontier is not None else None
+    with ChunkedCSVWriter(part_path, append=resume, on_flush=checkpoints.commit, resume_size=resume_size) as writer:
+        try:
+            records = iter_fn(max_pages=max_pages, seen_store=checkpoints.wrap(seen_store),
+                              frontier=checkpoints.wrap(frontier))
+            writer.write_all(iter_normalized(records))
+        except Exception as e:
+            print(f"⚠️ {name} failed: {e}")
+            ok = False
+    elapsed = time.perf_counter() - start
+    return name, writer.count, ok, elapsed
+
+
+def print_source_report(results, wall_time):
+    """Print per-source timing and record counts."""
+    print("\n⏱️ Scraper timings:")
+    for name, records, ok, elapsed in results:
+        status = "ok" if ok else "failed"
+        print(f"   {name:<24} {elapsed:8.1f}s  {records:6d} records  ({status})")
+    print(f"   {'Total wall time':<24} {wall_time:8.1f}s")
 
-    # Create dataset folder if not exists
-    os.makedirs("dataset", exist_ok=True)
 
-    # Save unified CSV
+def print_metrics_report(snapshot):
+    """Print where crawl time went, per host and per source."""
+    print("\n📈 Requests per host:")
+    for host, stats in snapshot["hosts"].items():
+        print(f"   {host:<32} {stats['requests']:5d} req  {stats['bytes'] / 1e6:7.1f} MB  "
+              f"avg {stats['latency_avg'] * 1000:6.0f} ms  max {stats['latency_max'] * 1000:6.0f} ms  "
+              f"{stats['retries']} retries  {stats['backoff_seconds']:.0f}s backoff  "
+              f"{stats['throttle_seconds']:.0f}s throttled  {stats['cache_hits']} cached  {stats['statuses']}")
+    for source, stats in snapshot["sources"].items():
+        parsed = ", ".join(f"{kind} {p['pages']} pages @ {p['ms_per_page']:.1f} ms"
+                           for kind, p in stats["parse"].items())
+        print(f"   {source:<32} slept {stats['sleep_seconds']:.0f}s  parsed {parsed or 'nothing'}")
+
+
+# -----------------------------
+# 3️⃣ Main scraping controller
+# -----------------------------
+def scrape_all_sources(propertypro_pages=2, npc_pages=1, private_pages=2, concurrent=False,
+                     async_details=False, use_cache=False, offline=False, incremental=False,
+                     resume=False, detail_concurrency=DEFAULT_CONCURRENCY, detail_rate=DEFAULT_RATE,
+                     adaptive=False):
+    """Run all three scrapers and combine their results into one CSV and its Parquet copy.
+
+    Records are streamed to per-source part files under dataset/parts as
+    they arrive, then stitched into combined_listings.csv, so memory stays
+    flat and a crash keeps everything scraped so far. Returns the output
+    path; run_all_scrapers returns the combined listings as a DataFrame.
+
+    With concurrent=True each source runs in its own worker thread, so the
+    total wall time is close to the slowest source instead of the sum.
+    With async_details=True the NigeriaPropertyCentre and PrivateProperty
+    detail pages are fetched through the bounded async engine, at most
+    detail_concurrency in flight and detail_rate requests/sec per host.
+    With use_cache=True responses are kept in the on-disk HTTP cache and
+    revalidated on reruns; offline=True serves pages from that cache only.
+    With incremental=True only listings that are new or updated since the
+    seen-listings store last saw them are scraped (where the listing page
+    shows no date, known listings are revisited once due, staggered per
+    listing between REVISIT_AFTER and twice that), paging stops at the first
+    page with nothing to fetch or holding only listings added before the
+    source's watermark, and the new rows are merged into the existing
+    combined CSV instead of replacing it.
+    Progress is always checkpointed in the crawl frontier; resume=True
+    continues an interrupted run where it stopped and retries only the
+    detail pages that failed.
+    With adaptive=True the fixed sleeps and rate limits give way to an AIMD
+    controller per host, which raises concurrency while the site answers
+    fast and backs off on 429/503, timeouts, slow responses and Retry-After.
+    Request, sleep and parse totals are exported to dataset/metrics as
+    JSON and Prometheus text at the end of the run.
+    """
+    if use_cache or offline:
+        http_client.enable_cache(offline=offline)
+    if adaptive:
+        http_client.enable_adaptive()
+    metrics.reset()
+    seen_store = SeenStore() if incremental else None
+    frontier = CrawlFrontier()
+    source_keys = ["propertypro", "nigeriapropertycentre", "privateproperty"]
+    if not resume:
+        for source in source_keys:
+            frontier.reset(source)
+
+    sources = [
+        ("PropertyPro", iter_propertypro,
+         propertypro_pages, os.path.join(PARTS_DIR, "propertypro.csv"), resume, seen_store, frontier),
+        ("NigeriaPropertyCentre",
+         partial(iter_npc, use_async=async_details, concurrency=detail_concurrency, rate=detail_rate),
+         npc_pages, os.path.join(PARTS_DIR, "nigeriapropertycentre.csv"), resume, seen_store, frontier),
+        ("PrivateProperty",
+         partial(iter_private, use_async=async_details, concurrency=detail_concurrency, rate=detail_rate),
+         private_pages, os.path.join(PARTS_DIR, "privateproperty.csv"), resume, seen_store, frontier),
+    ]
+
+    wall_start = time.perf_counter()
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            futures = [pool.submit(run_source, *source) for source in sources]
+            results = [future.result() for future in futures]
+    else:
+        results = [run_source(*source) for source in sources]
+    print_source_report(results, time.perf_counter() - wall_start)
+    print_metrics_report(metrics.snapshot())
+    if adaptive:
+        for state in http_client.adaptive_limits().states():
+            print(f"📶 {state['host']}: final concurrency {state['limit']}, "
+                  f"{state['increases']} increases, {state['decreases']} decreases, "
+                  f"latency {state['latency_ms']} ms (best {state['best_latency_ms']} ms)")
+        http_client.disable_adaptive()
+    for source in source_keys:
+        print(f"🧭 {source}: {frontier.summary(source)}")
+    frontier.close()
+
+    # Stitch the part files together in source order
     output_path = os.path.join("dataset", "combined_listings.csv")
-    final_df.to_csv(output_path, index=False, encoding="utf-8")
+    part_paths = [source[3] for source in sources]
+    if incremental:
+        new_path = os.path.join(PARTS_DIR, "new_listings.csv")
+        concat_csv_files(part_paths, new_path)
+        merged = merge_with_existing(pd.read_csv(new_path), output_path)
+        merged.to_csv(output_path, index=False, encoding="utf-8")
+        for source in source_keys:
+            added, updated = seen_store.watermark(source)
+            print(f"🔖 {source}: {seen_store.count(source)} seen, newest added {added}, updated {updated}")
+        seen_store.close()
+    else:
+        concat_csv_files(part_paths, output_path)
+    parquet_path = storage.write_raw_copy(output_path)
+
+    print(f"\n📦 Data saved to: {output_path}" + (f" and {parquet_path}" if parquet_path else ""))
+    print(pd.read_csv(output_path, nrows=5))
+    print(f"✅ Records scraped this run: {sum(records for _, records, _, _ in results)}")
+    json_path, prom_path = metrics.export()
+    print(f"📈 Crawl metrics saved to: {json_path}, {prom_path}")
+
+    return output_path
+
+def run_all_scrapers(*args, **kwargs):
+    """Run all three scrapers (see scrape_all_sources for the options); returns the combined DataFrame."""
+    return pd.read_csv(scrape_all_sources(*args, **kwargs))
+
+# -----------------------------
+# 4️⃣ Sharded multi-process crawl
+# -----------------------------
+def merge_shards(shard_dir=sharded_crawl.DEFAULT_SHARD_DIR,
+                 output_path=os.path.join("dataset", "combined_listings.csv")):
+    """Combine the workers' shard files into one CSV (and its Parquet copy), in crawl order; returns the rows."""
+    frames = []
+    for source in sharded_crawl.SOURCES:
+        paths = sharded_crawl.shard_paths(shard_dir, source)
+        if not paths:
+            continue
+        df = pd.concat([pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths],
+                       ignore_index=True)
+        # An item re-leased after its lease ran out can be written twice
+        df = df.drop_duplicates(subset=["item_id", "item_index"])
+        df = df.sort_values(["page", "position", "item_index"], key=lambda col: col.astype(int), kind="stable")
+        frames.append(normalize_columns(df.drop(columns=sharded_crawl.SHARD_KEY_COLUMNS)))
 
+    combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=STANDARD_COLUMNS)
+    combined.to_csv(output_path, index=False, encoding="utf-8")
+    storage.write_raw_copy(output_path, os.path.splitext(output_path)[0] + ".parquet")
+    return combined
+
+def crawl_sharded(propertypro_pages=2, npc_pages=1, private_pages=2, workers=4, rate=DEFAULT_RATE,
+                      burst=DEFAULT_BURST, resume=False, queue_path=DEFAULT_QUEUE_PATH,
+                      shard_dir=sharded_crawl.DEFAULT_SHARD_DIR):
+    """Crawl all three sources with `workers` processes sharing a SQLite work queue.
+
+    Listing pages and detail URLs are leased to workers one at a time, and
+    every worker draws from the same per-host token buckets (`rate`
+    requests/sec, bursts of `burst`), so adding workers never raises the load
+    on a site above the limit. More workers can join from other machines
+    sharing the volume (see scrapers/sharded_crawl.py). resume=True continues
+    the queue and shards a previous run left behind. Returns the output
+    path; run_sharded_crawl returns the combined listings as a DataFrame.
+    """
+    queue = WorkQueue(queue_path)
+    if not resume:
+        queue.reset()
+        sharded_crawl.clear_shards(shard_dir)
+        sharded_crawl.plan(queue, {
+            "propertypro": propertypro_pages,
+            "nigeriapropertycentre": npc_pages,
+            "privateproperty": private_pages,
+        }, rate, burst)
+
+    wall_start = time.perf_counter()
+    spawn = multiprocessing.get_context("spawn")
+    processes = [
+        spawn.Process(target=sharded_crawl.run_worker, kwargs={"queue_path": queue_path, "shard_dir": shard_dir})
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    print(f"\n⏱️ {workers} workers finished in {time.perf_counter() - wall_start:.1f}s")
+    for source, counts in queue.summary().items():
+        print(f"🧭 {source}: {counts}")
+    queue.close()
+
+    output_path = os.path.join("dataset", "combined_listings.csv")
+    merge_shards(shard_dir, output_path)
     print(f"\n📦 Data saved to: {output_path}")
-    print(final_df.head())
-    print(f"✅ Total records: {len(final_df)}")
+    print(pd.read_csv(output_path, nrows=5))
+    return output_path
 
-    return final_df
+def run_sharded_crawl(*args, **kwargs):
+    """Sharded crawl of all three sources (see crawl_sharded for the options); returns the combined DataFrame."""
+    return pd.read_csv(crawl_sharded(*args, **kwargs))
 
 # -----------------------------
-# 3️⃣ Run script directly
+# 5️⃣ Run script directly
 # -----------------------------
 if __name__ == "__main__":
-    run_all_scrapers(
+    parser = argparse.ArgumentParser(description="Scrape all sources into dataset/combined_listings.csv")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run and retry only failed detail pages")
+    parser.add_argument("--incremental", action="store_true",
+                        help="scrape only listings not seen in earlier runs")
+    parser.add_argument("--use-cache", action="store_true", help="use the on-disk HTTP cache")
+    parser.add_argument("--offline", action="store_true", help="serve pages from the HTTP cache only")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="pace each site with an AIMD concurrency controller instead of fixed sleeps")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="crawl with this many worker processes through the shared work queue")
+    args = parser.parse_args()
+
+    if args.workers:
+        crawl_sharded(
+            propertypro_pages=100,
+            npc_pages=50,
+            private_pages=50,
+            workers=args.workers,
+            resume=args.resume
+        )
+        raise SystemExit(0)
+
+    scrape_all_sources(
         propertypro_pages=100,
         npc_pages=50,
-        private_pages=50
+        private_pages=50,
+        concurrent=True,
+        async_details=True,
+        use_cache=args.use_cache,
+        offline=args.offline,
+        incremental=args.incremental,
+        resume=args.resume,
+        adaptive=args.adaptive
     )
@@ -0,0 +1,78 @@
+"""API lookup benchmark: a row scan vs the ListingQuery indexes vs a PriceCube lookup.
+
+Builds listings of each size by sampling the cleaned listings, loads them
+compactly as app.py does, then answers the same random (city,
+property_type) queries three ways: with the old filter (lowercase both
+columns, mask, mean), by selecting the rows through ListingQuery and
+averaging them (what /api/trends does), and with PriceCube.get (what
+/api/average_price does). The report shows the index and cube build time
+and the p50/p99 latency of each. The scan grows with the rows, the index
+select with the rows matched, and the cube lookup stays flat.
+
+Run from the repo root:  python -m benchmarks.bench_api [--rows 10000 100000 1000000] [--queries 2000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning.aggregates import PriceCube
+from cleaning.loader import compact
+from cleaning.pipeline import OUTPUT_PATH
+from cleaning.query import ListingQuery
+
+
+def scan_average(df, city, property_type):
+    df_city = df[df['city'].str.lower() == city.lower()]
+    if property_type:
+        df_city = df_city[df_city['property_type'].str.lower() == property_type.lower()]
+    return df_city['price'].mean(), len(df_city)
+
+
+def index_average(listings, city, property_type):
+    df_city = listings.select(["price"], city=city, property_type=property_type)
+    return df_city['price'].mean(), len(df_city)
+
+
+def cube_average(cube, city, property_type):
+    stats = cube.get(city, property_type or None)
+    return stats["mean"], stats["listings"]
+
+
+def latencies(fn, target, queries):
+    timings = []
+    for city, property_type in queries:
+        start = time.perf_counter()
+        fn(target, city, property_type)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, [50, 99]) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=OUTPUT_PATH, help="cleaned listings CSV to sample from")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="listing counts to query")
+    parser.add_argument("--queries", type=int, default=2000, help="queries per method and size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    real = pd.read_csv(args.source, usecols=["city", "property_type", "price"])
+    pairs = real[["city", "property_type"]].dropna().drop_duplicates().to_numpy()
+    picks = pairs[rng.integers(0, len(pairs), size=args.queries)]
+    queries = [(city, property_type if rng.random() < 0.7 else None) for city, property_type in picks]
+
+    print(f"\n{'rows':>10}{'build s':>9}{'scan p50 µs':>13}{'scan p99 µs':>13}{'index p50 µs':>14}"
+          f"{'index p99 µs':>14}{'cube p50 µs':>13}{'cube p99 µs':>13}")
+    for rows in args.rows:
+        df = compact(real.iloc[rng.integers(0, len(real), size=rows)].reset_index(drop=True))
+        start = time.perf_counter()
+        listings = ListingQuery(df)
+        cube = PriceCube(df, listings.keys)
+        build = time.perf_counter() - start
+        scan_p50, scan_p99 = latencies(scan_average, df, queries[:200])
+        index_p50, index_p99 = latencies(index_average, listings, queries)
+        cube_p50, cube_p99 = latencies(cube_average, cube, queries)
+        print(f"{rows:>10,}{build:>9.2f}{scan_p50:>13.0f}{scan_p99:>13.0f}{index_p50:>14.0f}{index_p99:>14.0f}"
+              f"{cube_p50:>13.1f}{cube_p99:>13.1f}")
@@ -0,0 +1,71 @@
+"""Cleaning benchmark: clean_listings vs clean_parallel at 1/2/4/8 workers.
+
+Builds a synthetic combined-listings file by sampling rows of the real one
+(a share of them retitled, so they are new listings rather than
+duplicates), cleans it single-process and with each worker count, checks
+every parallel output is byte-identical to the single-process one and
+reports the speedup. Speedups are capped by the cores the machine has.
+
+Run from the repo root:  python -m benchmarks.bench_cleaning [--rows 500000] [--workers 1 2 4 8]
+"""
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning.parallel import clean_parallel
+from cleaning.pipeline import INPUT_PATH, RAW_DTYPES, clean_listings
+
+
+def synthetic_listings(source, rows, path, unique_share=0.6, seed=7):
+    """Write `rows` listings sampled from `source`; unique_share of them get a distinct title."""
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(source, dtype=RAW_DTYPES)
+    df = df.iloc[rng.integers(0, len(df), size=rows)].reset_index(drop=True)
+    retitled = rng.random(rows) < unique_share
+    df.loc[retitled, "title"] = df.loc[retitled, "title"].fillna("") + " #" + pd.Series(
+        np.flatnonzero(retitled).astype(str), index=np.flatnonzero(retitled)
+    )
+    df.to_csv(path, index=False)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=INPUT_PATH, help="listings CSV to sample rows from")
+    parser.add_argument("--rows", type=int, default=500_000, help="synthetic listings to clean")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="worker counts to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "listings.csv")
+        synthetic_listings(args.source, args.rows, input_path)
+        print(f"🧹 Cleaning {args.rows:,} synthetic listings on {os.cpu_count()} cores...")
+
+        serial_path = os.path.join(tmp, "serial.csv")
+        # dataset_path=None: the synthetic rows must not replace the real dataset/cleaned_properties
+        serial_seconds = timed(clean_listings, input_path, serial_path, dataset_path=None)
+        results = []
+        for workers in args.workers:
+            output_path = os.path.join(tmp, f"parallel_{workers}.csv")
+            seconds = timed(clean_parallel, input_path, output_path, workers, dataset_path=None)
+            results.append((workers, seconds, filecmp.cmp(serial_path, output_path, shallow=False)))
+
+    print(f"\n{'run':<16}{'seconds':>9}{'rows/s':>12}{'speedup':>9}  identical")
+    print(f"{'clean_listings':<16}{serial_seconds:>9.2f}{args.rows / serial_seconds:>12,.0f}{1:>8.2f}x")
+    for workers, seconds, same in results:
+        print(f"{f'{workers} workers':<16}{seconds:>9.2f}{args.rows / seconds:>12,.0f}"
+              f"{serial_seconds / seconds:>8.2f}x  {'yes' if same else 'NO'}")
+
+    if not all(same for _, _, same in results):
+        raise SystemExit("❌ A parallel run's output differs from clean_listings")
+    print("✅ Identical output at every worker count")
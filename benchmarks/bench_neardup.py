@@ -0,0 +1,81 @@
+"""Near-duplicate benchmark: MinHash/LSH clustering time and accuracy as listings grow.
+
+Builds synthetic cleaned listings from the real cleaned CSV: distinct
+properties (a sampled title and location with a plot number, and a price
+jittered up to 4.5x either way) plus cross-posted copies of some of them,
+retitled and reformatted the way another site would show them. Each size
+is clustered once; the report shows seconds, time per listing (flat when
+the cost is linear), how many planted copies were found and how many
+clusters joined two distinct properties and how many hold a listing priced
+more than PRICE_TOLERANCE away from the one kept. Titles are drawn from a few
+thousand real ones, so distinct properties often share a title, area and
+bedrooms and only the price tells them apart: a harder mix than real
+listings.
+
+Run from the repo root:  python -m benchmarks.bench_neardup [--rows 25000 50000 100000 200000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning.neardup import PRICE_TOLERANCE, NearDuplicateFinder
+from cleaning.pipeline import OUTPUT_PATH
+
+REWRITES = [
+    lambda text: "for sale: " + text,
+    lambda text: text + " for sale",
+    lambda text: text.replace(" ", "  ").replace(",", " ,"),
+    lambda text: "newly built " + text,
+    lambda text: text.replace("bedroom", "bedrooms"),
+]
+
+
+def synthetic_listings(source, rows, copy_share=0.2, seed=7):
+    """Listings with a `property` column; copies of a property share its number."""
+    rng = np.random.default_rng(seed)
+    real = pd.read_csv(source, usecols=["title", "location", "price", "bedrooms"]).dropna(subset=["price"])
+    properties = int(rows / (1 + copy_share))
+    base = real.iloc[rng.integers(0, len(real), size=properties)].reset_index(drop=True)
+    base["location"] = [f"plot {plot} {location}" for plot, location in
+                        zip(rng.integers(1, 100_000, size=properties), base["location"])]
+    base["price"] = (base["price"] * np.exp(rng.uniform(-1.5, 1.5, size=properties))).round(-3)
+    base["property"] = np.arange(properties)
+
+    copies = base.iloc[rng.integers(0, properties, size=rows - properties)].reset_index(drop=True)
+    kinds = rng.integers(0, len(REWRITES), size=len(copies))
+    copies["title"] = [REWRITES[kind](title) for kind, title in zip(kinds, copies["title"])]
+    copies["location"] = copies["location"].str.replace(" ", ", ", n=1, regex=False)
+    listings = pd.concat([base, copies], ignore_index=True)
+    return listings.iloc[rng.permutation(len(listings))].reset_index(drop=True)
+
+
+def accuracy(listings, cluster_id):
+    """(share of copies clustered with their property, clusters holding more than one property,
+    clusters with a price beyond PRICE_TOLERANCE of their first listing's)."""
+    frame = pd.DataFrame({"property": listings["property"], "cluster": cluster_id, "price": listings["price"]})
+    copies = frame[frame["property"].duplicated(keep=False)]
+    found = copies.groupby("property")["cluster"].nunique().eq(1).mean()
+    mixed = frame.groupby("cluster")["property"].nunique().gt(1).sum()
+    ratio = frame["price"] / frame.groupby("cluster")["price"].transform("first")
+    drifted = frame.loc[np.log(ratio).abs().gt(np.log1p(PRICE_TOLERANCE)), "cluster"].nunique()
+    return found, mixed, drifted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=OUTPUT_PATH, help="cleaned listings CSV to sample from")
+    parser.add_argument("--rows", type=int, nargs="+", default=[25_000, 50_000, 100_000, 200_000],
+                        help="listing counts to cluster")
+    args = parser.parse_args()
+
+    finder = NearDuplicateFinder()
+    print(f"\n{'listings':>10}{'seconds':>9}{'µs/listing':>12}{'copies found':>14}{'mixed clusters':>16}{'drifted':>9}")
+    for rows in args.rows:
+        listings = synthetic_listings(args.source, rows)
+        start = time.perf_counter()
+        cluster_id = finder.cluster(listings)
+        seconds = time.perf_counter() - start
+        found, mixed, drifted = accuracy(listings, cluster_id)
+        print(f"{rows:>10,}{seconds:>9.2f}{1e6 * seconds / rows:>12.1f}{found:>13.1%}{mixed:>16,}{drifted:>9,}")
@@ -0,0 +1,222 @@
+"""Side-by-side parse benchmark: html.parser soup vs strained soup vs lxml.
+
+Builds synthetic pages shaped like each source (listing cards and detail
+pages buried in navigation, scripts and footer noise), checks that all
+three parsing paths extract identical records, and prints ms per page.
+
+Run from the repo root:  python -m benchmarks.bench_parsing
+"""
+import argparse
+import random
+import time
+
+from bs4 import BeautifulSoup
+
+from scrapers import fast_parse
+from scrapers import propertypro_scraper as propertypro
+from scrapers import nigeria_property_center_scraper as npc
+from scrapers import private_propertng_scrapper as private
+
+# --- Synthetic pages ---
+NOISE = (
+    '<header><nav>' + "".join(f'<a href="/nav/{i}">Menu {i}</a>' for i in range(60)) + '</nav></header>'
+    '<script>window.dataLayer = [];' + "x = 1;" * 200 + '</script>'
+    '<style>.a{color:red}' + ".b{margin:0}" * 200 + '</style>'
+    + "".join(f'<div class="ad-slot"><p>Sponsored {i}</p><span>promo</span></div>' for i in range(80))
+)
+FOOTER = '<footer>' + "".join(f'<p>Footer link {i}</p>' for i in range(80)) + '</footer>'
+
+# Values shaped like what each site really serves (see the per-source CSVs in
+# dataset/): room counts are bare numbers, and land has none of them
+AREAS = ["Lekki Lagos", "Ikoyi Lagos", "Gwarinpa Abuja", "Maitama Abuja", "GRA Port Harcourt"]
+PP_TYPES = ["House", "Flat Apartment", "Land"]
+NPC_TYPES = ["Detached Duplex", "Terraced Duplex", "Semi Detached Duplex", "Flat / Apartment",
+             "Residential Land", "Mixed-use Land"]
+PV_TYPES = ["House", "Flat & Apartment", "Land"]
+
+
+def rooms(rng, property_type):
+    """(bedrooms, bathrooms, toilets) for a listing, or None for land; bathrooms/toilets may be missing."""
+    if "Land" in property_type:
+        return None
+    beds = rng.randint(1, 6)
+    baths = beds + rng.randint(0, 1) if rng.random() < 0.8 else None
+    toilets = beds + 1 if rng.random() < 0.6 else None
+    return beds, baths, toilets
+
+
+def headline(property_type, counts):
+    return f"{counts[0]} Bedroom {property_type}" if counts else property_type
+
+
+def propertypro_page(rng, cards=20):
+    body = []
+    for i in range(cards):
+        property_type = rng.choice(PP_TYPES)
+        counts = rooms(rng, property_type)
+        title = headline(property_type, counts)
+        features = ""
+        if counts:
+            beds, baths, toilets = counts
+            features = f"{beds} Beds" + (f" {baths} Baths" if baths else "") + (f" {toilets} Toilets" if toilets else "")
+        body.append(
+            f'<div class="single-room-sale listings-property property-listing">'
+            f'<div class="pl-title"><h3><a href="/property/{rng.randint(1, 10**6)}">'
+            f'{title}</a></h3><p>{rng.choice(AREAS)}</p>'
+            f'<h6>{title}/{property_type} FOR SALE</h6></div>'
+            f'<div class="pl-price"><h3>₦{rng.randint(10, 900):,},000,000</h3>'
+            f'<h6>{features}</h6></div>'
+            f'<div class="date-added">Updated 1{i % 9} Nov 2025, Added 0{i % 9 + 1} Oct 2025</div>'
+            f'</div>'
+        )
+    return f'<html><body>{NOISE}<main>{"".join(body)}</main>{FOOTER}</body></html>'
+
+
+def npc_listing_page(rng, cards=20):
+    body = "".join(
+        f'<div class="wp-block property list"><div class="wp-block-title">'
+        f'<a itemprop="url" href=" /for-sale/houses/{rng.randint(1, 10**6)} ">x</a></div>'
+        f'<div class="wp-block-body"><p>{rng.choice(AREAS)}</p></div></div>'
+        for _ in range(cards)
+    )
+    return f'<html><body>{NOISE}{body}{FOOTER}</body></html>'
+
+
+def npc_details_page(rng):
+    property_type = rng.choice(NPC_TYPES)
+    counts = rooms(rng, property_type)
+    rows = [
+        ("Property Ref", str(rng.randint(1, 10**6))), ("Added On", "10 Oct 2025"),
+        ("Last Updated", "11 Nov 2025"), ("Market Status", "Available"), ("Type", property_type),
+    ]
+    if counts:
+        rows += [(name, value) for name, value in zip(("Bedrooms", "Bathrooms", "Toilets"), counts) if value]
+    table = "".join(f"<tr><td><strong>{k}:</strong> {v}</td></tr>" for k, v in rows)
+    street, area = rng.choice(AREAS).rsplit(" ", 1)
+    return (
+        f'<html><body>{NOISE}<h4 class="content-title">{headline(property_type, counts).lower()} for sale</h4>'
+        f'<address><i class="fa"></i> {street}, {area}</address>'
+        f'<span class="price"><span itemprop="priceCurrency">₦</span>'
+        f'<span itemprop="price">{rng.randint(10, 900):,},000,000</span></span>'
+        f'<table class="table table-bordered table-striped">{table}</table>{FOOTER}</body></html>'
+    )
+
+
+def private_listing_page(rng, cards=20):
+    body = "".join(
+        f'<div class="similar-listings-item"><a href="/listings/{rng.randint(1, 10**6)}">'
+        f'<img src="x.jpg"/></a><p>{rng.choice(AREAS)}</p></div>'
+        for _ in range(cards)
+    )
+    return f'<html><body>{NOISE}{body}{FOOTER}</body></html>'
+
+
+def private_details_page(rng):
+    property_type = rng.choice(PV_TYPES)
+    counts = rooms(rng, property_type)
+    benefits = ""
+    if counts:
+        # One <li> per count, in order, each holding just the number
+        benefits = '<ul class="property-benefit">' + "".join(
+            f'<li><i class="icon-{icon}"></i>{value or ""}</li>'
+            for icon, value in zip(("bed", "bath", "toilet"), counts)
+        ) + '</ul>'
+    return (
+        f'<html><body>{NOISE}<div class="property-info"><h1>For sale: {headline(property_type, counts)}</h1>'
+        f'<p>{rng.choice(AREAS)}</p><p class="price">₦{rng.randint(10, 900):,},000,000</p></div>'
+        f'<div class="property-details"><ul><li><span>Property Type</span> <a href="/t">{property_type}</a></li>'
+        f'<li><span>Added</span> 10 Oct 2025</li><li><span>Updated</span> 11 Nov 2025</li></ul></div>'
+        f'{benefits}{FOOTER}</body></html>'
+    )
+
+
+# --- Parse paths ---
+def full_soup_paths():
+    """The original extractors on a full html.parser tree."""
+    def propertypro_cards(html):
+        soup = BeautifulSoup(html, "html.parser")
+        return [
+            propertypro.extract_listing_data(listing)
+            for listing in soup.find_all("div", class_="property-listing")
+        ]
+
+    return {
+        "propertypro listing": propertypro_cards,
+        "npc listing": lambda html: npc.extract_property_links(BeautifulSoup(html, "html.parser")),
+        "npc details": lambda html: npc.extract_details(BeautifulSoup(html, "html.parser")),
+        "private listing": lambda html: [
+            a["href"] for a in (
+                item.find("a", href=True)
+                for item in BeautifulSoup(html, "html.parser").find_all("div", class_="similar-listings-item")
+            ) if a
+        ],
+        "private details": lambda html: private.extract_details(BeautifulSoup(html, "html.parser")),
+    }
+
+
+def module_paths():
+    """The scraper modules' own entry points (strained soup or lxml, per fast_parse.ENABLED)."""
+    return {
+        "propertypro listing": lambda html: [data for _, data in propertypro.parse_listings_html(html)],
+        "npc listing": lambda html: npc.parse_property_links(html, 0),
+        "npc details": lambda html: npc.parse_details_html("/x", html),
+        "private listing": private.parse_listing_html,
+        "private details": lambda html: private.parse_details_html("/x", html),
+    }
+
+
+def build_corpus(pages, seed=7):
+    rng = random.Random(seed)
+    return {
+        "propertypro listing": [propertypro_page(rng) for _ in range(pages)],
+        "npc listing": [npc_listing_page(rng) for _ in range(pages)],
+        "npc details": [npc_details_page(rng) for _ in range(pages)],
+        "private listing": [private_listing_page(rng) for _ in range(pages)],
+        "private details": [private_details_page(rng) for _ in range(pages)],
+    }
+
+
+def time_path(fn, pages, enabled):
+    fast_parse.ENABLED = enabled
+    start = time.perf_counter()
+    results = [fn(html) for html in pages]
+    elapsed = time.perf_counter() - start
+    return results, elapsed * 1000 / len(pages)
+
+
+def run(pages=50, corpus=None):
+    """Time every page kind on all three paths and check they agree."""
+    import contextlib
+    import io
+
+    corpus = corpus or build_corpus(pages)
+    full, module = full_soup_paths(), module_paths()
+    rows = []
+    # The scrapers print a line per parsed page; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for kind, kind_pages in corpus.items():
+            expected, soup_ms = time_path(full[kind], kind_pages, enabled=False)
+            strained, strained_ms = time_path(module[kind], kind_pages, enabled=False)
+            fast, fast_ms = (time_path(module[kind], kind_pages, enabled=True)
+                             if fast_parse.AVAILABLE else (expected, float("nan")))
+            rows.append((kind, soup_ms, strained_ms, fast_ms, expected == strained == fast))
+    fast_parse.ENABLED = fast_parse.AVAILABLE
+    return rows
+
+
+def print_report(rows):
+    print(f"{'page kind':<22}{'soup ms':>10}{'strained ms':>13}{'lxml ms':>10}{'speedup':>9}  same output")
+    for kind, soup_ms, strained_ms, fast_ms, same in rows:
+        print(f"{kind:<22}{soup_ms:>10.2f}{strained_ms:>13.2f}{fast_ms:>10.2f}"
+              f"{soup_ms / fast_ms:>8.1f}x  {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50, help="pages per page kind")
+    args = parser.parse_args()
+
+    rows = run(args.pages)
+    print_report(rows)
+    if not all(same for *_, same in rows):
+        raise SystemExit("❌ Parsers disagree on at least one page kind")
@@ -0,0 +1,76 @@
+"""Price parsing benchmark: row-wise clean_price vs vectorized normalize_prices.
+
+Builds a synthetic price column shaped like the scraped listings (naira
+amounts with and without the sign and commas, bare numbers, USD prices,
+per-sqm land prices, rent periods and blanks), checks that both parsers
+give identical prices and reports rows per second for each. The fail
+threshold is the order-of-magnitude speedup normalize_prices is there for.
+
+Run from the repo root:  python -m benchmarks.bench_prices [--rows 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning.prices import clean_price, normalize_prices
+
+FORMATS = [
+    (0.30, lambda n: f"₦{n:,}"),
+    (0.20, lambda n: f"{n:,}"),
+    (0.20, lambda n: f"{n}"),
+    (0.10, lambda n: f"₦ {n:,}"),
+    (0.05, lambda n: f"$ {n // 1500}"),
+    (0.05, lambda n: f"{n // 1000}/sqm"),
+    (0.04, lambda n: f"₦{n:,}/year"),
+    (0.03, lambda n: "Price on request"),
+    (0.03, lambda n: None),
+]
+
+
+def synthetic_prices(rows, seed=7):
+    """Prices quoted to three significant figures, as listings are, in the scraped formats."""
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(100, 1000, size=rows) * 10 ** rng.integers(4, 8, size=rows)
+    weights = np.array([weight for weight, _ in FORMATS])
+    kinds = rng.choice(len(FORMATS), size=rows, p=weights / weights.sum())
+    # read_csv hands the cleaner a string column
+    return pd.Series([FORMATS[kind][1](int(n)) for kind, n in zip(kinds, amounts)], dtype="str")
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(rows):
+    prices = synthetic_prices(rows)
+    print(f"   {prices.nunique():,} distinct price strings")
+    reference, row_seconds = timed(lambda s: s.apply(clean_price).astype("float64"), prices)
+    normalized, vector_seconds = timed(normalize_prices, prices)
+    same = np.array_equal(reference.to_numpy(), normalized["price"].to_numpy(), equal_nan=True)
+    return row_seconds, vector_seconds, same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic prices to parse")
+    parser.add_argument("--min-speedup", type=float, default=10.0,
+                        help="fail when the vectorized parser is less than this many times faster")
+    args = parser.parse_args()
+
+    print(f"💰 Parsing {args.rows:,} synthetic prices...")
+    row_seconds, vector_seconds, same = run(args.rows)
+    speedup = row_seconds / vector_seconds
+    print(f"\n{'parser':<20}{'seconds':>9}{'rows/s':>14}")
+    print(f"{'clean_price (apply)':<20}{row_seconds:>9.2f}{args.rows / row_seconds:>14,.0f}")
+    print(f"{'normalize_prices':<20}{vector_seconds:>9.2f}{args.rows / vector_seconds:>14,.0f}")
+    print(f"\nSpeedup: {speedup:.1f}x")
+
+    if not same:
+        raise SystemExit("❌ normalize_prices disagrees with clean_price")
+    if speedup < args.min_speedup:
+        raise SystemExit(f"❌ Speedup below {args.min_speedup:.0f}x")
+    print("✅ Identical prices")
@@ -0,0 +1,278 @@
+"""Scraper throughput benchmarks against the local replay servers.
+
+Starts one ReplayServer per source over the fixture corpus, points the
+scraper modules at them and runs scrape_propertypro, both scrape_all
+functions (sync and async), run_all_scrapers and the sharded multi-process
+crawl, each in a fresh process.
+Reports pages/sec, records/sec, peak memory and parse ms per page, and
+exits non-zero when a result is worse than benchmarks/baseline.json allows.
+The baseline holds timings of one machine, so it is not checked in: record
+it with --update-baseline on the machine that runs the comparison. Parsing
+is compared by its speedup over a full html.parser soup measured in the
+same run, which holds across machines better than ms per page.
+
+The scrapers' politeness sleeps (and retry backoff) are skipped and only
+totalled, so the numbers measure the crawl machinery; pass --keep-sleeps
+to run with them.
+
+Run from the repo root:  python -m benchmarks.bench_scrapers [--update-baseline]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from scrapers import fast_parse, http_client
+from scrapers import propertypro_scraper as propertypro
+from scrapers import nigeria_property_center_scraper as npc
+from scrapers import private_propertng_scrapper as private
+from scrapers.sharded_crawl import use_site_urls
+from benchmarks import bench_parsing
+from benchmarks.fixtures import CORPUS_DIR, load_corpus
+from benchmarks.replay_server import ReplayServer
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25    # allowed slowdown before a metric counts as a regression
+
+SCENARIOS = [
+    "scrape_propertypro",
+    "npc scrape_all",
+    "npc scrape_all async",
+    "private scrape_all",
+    "private scrape_all async",
+    "run_all_scrapers",
+    "run_sharded_crawl",
+]
+HIGHER_IS_BETTER = ("pages_per_sec", "records_per_sec")
+LOWER_IS_BETTER = ("peak_rss_mb",)
+
+# Fixture kind -> bench_parsing parse path
+PARSE_KINDS = {
+    (propertypro.SOURCE, "listing"): "propertypro listing",
+    (npc.SOURCE, "listing"): "npc listing",
+    (npc.SOURCE, "details"): "npc details",
+    (private.SOURCE, "listing"): "private listing",
+    (private.SOURCE, "details"): "private details",
+}
+
+
+class SleepMeter:
+    """Stands in for the `time` module in the scrapers: totals sleeps, optionally skipping them."""
+
+    def __init__(self, keep=False):
+        self.keep = keep
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.total += seconds
+        if self.keep:
+            time.sleep(seconds)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def count_csv_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+def run_scenario(name, urls, settings):
+    """Run one scenario in this (fresh) process and return its raw measurements."""
+    use_site_urls(urls)
+    meter = SleepMeter(keep=settings["keep_sleeps"])
+    for module in (propertypro, npc, private, http_client):
+        module.time = meter
+
+    pages = settings["pages"]
+    async_options = {"use_async": True, "concurrency": settings["concurrency"], "rate": settings["rate"]}
+    workdir = tempfile.mkdtemp(prefix="bench_scrapers_")
+    os.chdir(workdir)    # run_all_scrapers writes under ./dataset
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if name == "scrape_propertypro":
+            records = len(propertypro.scrape_propertypro(max_pages=pages))
+        elif name == "npc scrape_all":
+            records = len(npc.scrape_all(max_pages=pages))
+        elif name == "npc scrape_all async":
+            records = len(npc.scrape_all(max_pages=pages, **async_options))
+        elif name == "private scrape_all":
+            records = len(private.scrape_all(max_pages=pages))
+        elif name == "private scrape_all async":
+            records = len(private.scrape_all(max_pages=pages, **async_options))
+        elif name == "run_all_scrapers":
+            from baseSrapper import scrape_all_sources
+            output_path = scrape_all_sources(
+                pages, pages, pages, concurrent=True, async_details=True,
+                detail_concurrency=settings["concurrency"], detail_rate=settings["rate"],
+            )
+            records = count_csv_rows(output_path)
+        elif name == "run_sharded_crawl":
+            from baseSrapper import crawl_sharded
+            output_path = crawl_sharded(
+                pages, pages, pages, workers=settings["workers"], rate=settings["rate"],
+            )
+            records = count_csv_rows(output_path)
+        else:
+            raise ValueError(f"Unknown scenario: {name}")
+    seconds = time.perf_counter() - start
+
+    # Worker processes of the sharded crawl count too (their largest peak)
+    peak_rss_mb = None
+    if resource:
+        peak_rss_mb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                          resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+    return {"seconds": seconds, "records": records, "sleep_skipped": meter.total, "peak_rss_mb": peak_rss_mb}
+
+
+def measure_parsing(corpus, rounds=20):
+    """{kind: {"ms": parse ms per page, "speedup": over a full soup}} through the scrapers' own parse paths."""
+    paths, soup_paths = bench_parsing.module_paths(), bench_parsing.full_soup_paths()
+    parse_ms = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for key, kind in PARSE_KINDS.items():
+            if key not in corpus:
+                continue
+            pages = corpus[key] * rounds
+            _, soup_ms = bench_parsing.time_path(soup_paths[kind], pages, enabled=False)
+            _, ms = bench_parsing.time_path(paths[kind], pages, enabled=fast_parse.AVAILABLE)
+            parse_ms[kind] = {"ms": ms, "speedup": soup_ms / ms}
+    fast_parse.ENABLED = fast_parse.AVAILABLE
+    return parse_ms
+
+
+def run(settings, corpus_dir=CORPUS_DIR, scenarios=SCENARIOS):
+    """Run every scenario against fresh replay servers; returns the results dict."""
+    servers = {
+        source: ReplayServer(source, corpus_dir, settings["latency"], settings["jitter"], settings["error_rate"])
+        for source in (propertypro.SOURCE, npc.SOURCE, private.SOURCE)
+    }
+    results = {"settings": settings, "scenarios": {}}
+    spawn = multiprocessing.get_context("spawn")
+    try:
+        for server in servers.values():
+            server.start()
+        urls = {source: server.url for source, server in servers.items()}
+        for name in scenarios:
+            before = [server.stats() for server in servers.values()]
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                raw = pool.submit(run_scenario, name, urls, settings).result()
+            after = [server.stats() for server in servers.values()]
+            requests = sum(a["requests"] - b["requests"] for a, b in zip(after, before))
+            errors = sum(a["errors"] - b["errors"] for a, b in zip(after, before))
+            results["scenarios"][name] = dict(
+                raw,
+                requests=requests,
+                errors=errors,
+                pages_per_sec=requests / raw["seconds"],
+                records_per_sec=raw["records"] / raw["seconds"],
+            )
+            print(f"   ✔ {name}: {raw['records']} records in {raw['seconds']:.2f}s")
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    results["parse_ms"] = measure_parsing(load_corpus(corpus_dir))
+    return results
+
+
+def print_report(results):
+    print(f"\n{'scenario':<26}{'pages/s':>9}{'records/s':>11}{'requests':>10}{'errors':>8}"
+          f"{'records':>9}{'sleep skipped':>15}{'peak MB':>9}")
+    for name, row in results["scenarios"].items():
+        peak = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "n/a"
+        print(f"{name:<26}{row['pages_per_sec']:>9.1f}{row['records_per_sec']:>11.1f}{row['requests']:>10d}"
+              f"{row['errors']:>8d}{row['records']:>9d}{row['sleep_skipped']:>14.0f}s{peak:>9}")
+    print(f"\n{'page kind':<26}{'parse ms/page':>14}{'vs soup':>9}")
+    for kind, parse in results["parse_ms"].items():
+        print(f"{kind:<26}{parse['ms']:>14.2f}{parse['speedup']:>8.1f}x")
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return a list of regressions of `results` against `baseline`."""
+    regressions = []
+    for name, row in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        for metric in HIGHER_IS_BETTER:
+            if row[metric] < base[metric] * (1 - tolerance):
+                regressions.append(f"{name} {metric}: {row[metric]:.1f} < baseline {base[metric]:.1f}")
+        for metric in LOWER_IS_BETTER:
+            if row[metric] is not None and base.get(metric) is not None \
+                    and row[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {row[metric]:.1f} > baseline {base[metric]:.1f}")
+    for kind, parse in results["parse_ms"].items():
+        base = baseline["parse_ms"].get(kind)
+        if isinstance(base, dict) and parse["speedup"] < base["speedup"] * (1 - tolerance):
+            regressions.append(f"{kind} parse speedup over soup: {parse['speedup']:.1f}x "
+                               f"< baseline {base['speedup']:.1f}x")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=3, help="listing pages per source")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra random delay per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--concurrency", type=int, default=8, help="async detail pages in flight per host")
+    parser.add_argument("--rate", type=float, default=100.0, help="async requests/sec per host")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes for the sharded crawl")
+    parser.add_argument("--keep-sleeps", action="store_true", help="keep the scrapers' politeness delays")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed fraction worse than the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--dir", default=CORPUS_DIR, help="fixture corpus directory")
+    args = parser.parse_args()
+
+    settings = {
+        "pages": args.pages,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "workers": args.workers,
+        "keep_sleeps": args.keep_sleeps,
+    }
+    print("🏁 Running scraper benchmarks against the replay servers...")
+    results = run(settings, args.dir)
+    print_report(results)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"\n❌ No baseline at {args.baseline}; record one on this machine with --update-baseline first")
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["settings"] != settings:
+        sys.exit(f"\n❌ Baseline was recorded with different settings: {baseline['settings']}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ Below baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print("\n✅ Within baseline")
@@ -0,0 +1,109 @@
+"""HTML fixture corpus for the offline scraper benchmarks.
+
+benchmarks/corpus/<source>/ holds listing_NN.html and details_NN.html pages
+for each site; the replay server serves them in place of the live sites.
+The checked-in pages are synthetic (built by bench_parsing's page builders,
+which mirror each site's markup and the values the scraped CSVs in dataset/
+hold: bare room counts, none for land). --live re-records them from the
+real sites through the shared HTTP client.
+
+Run from the repo root:  python -m benchmarks.fixtures [--live]
+"""
+import argparse
+import glob
+import os
+import random
+
+from scrapers import propertypro_scraper as propertypro
+from scrapers import nigeria_property_center_scraper as npc
+from scrapers import private_propertng_scrapper as private
+from benchmarks import bench_parsing
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+SOURCES = (propertypro.SOURCE, npc.SOURCE, private.SOURCE)
+
+
+def fixture_paths(source, kind, corpus_dir=CORPUS_DIR):
+    """Sorted paths of a source's `listing` or `details` fixtures."""
+    return sorted(glob.glob(os.path.join(corpus_dir, source, f"{kind}_*.html")))
+
+
+def load_pages(paths):
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """Return {(source, kind): [html, ...]} for every fixture on disk."""
+    corpus = {}
+    for source in SOURCES:
+        for kind in ("listing", "details"):
+            pages = load_pages(fixture_paths(source, kind, corpus_dir))
+            if pages:
+                corpus[(source, kind)] = pages
+    return corpus
+
+
+def save_pages(corpus_dir, source, kind, pages):
+    folder = os.path.join(corpus_dir, source)
+    os.makedirs(folder, exist_ok=True)
+    for path in fixture_paths(source, kind, corpus_dir):
+        os.remove(path)
+    for i, html in enumerate(pages, start=1):
+        with open(os.path.join(folder, f"{kind}_{i:02d}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+    print(f"💾 {source}: {len(pages)} {kind} pages")
+
+
+def write_synthetic(corpus_dir=CORPUS_DIR, listing_pages=3, details=8, seed=7):
+    """(Re)build the corpus from the synthetic page builders."""
+    rng = random.Random(seed)
+    save_pages(corpus_dir, propertypro.SOURCE, "listing",
+               [bench_parsing.propertypro_page(rng) for _ in range(listing_pages)])
+    save_pages(corpus_dir, npc.SOURCE, "listing",
+               [bench_parsing.npc_listing_page(rng) for _ in range(listing_pages)])
+    save_pages(corpus_dir, npc.SOURCE, "details",
+               [bench_parsing.npc_details_page(rng) for _ in range(details)])
+    save_pages(corpus_dir, private.SOURCE, "listing",
+               [bench_parsing.private_listing_page(rng) for _ in range(listing_pages)])
+    save_pages(corpus_dir, private.SOURCE, "details",
+               [bench_parsing.private_details_page(rng) for _ in range(details)])
+
+
+def record_live(corpus_dir=CORPUS_DIR, listing_pages=3, details=8):
+    """Record real pages: the first listing pages and the first detail pages they link to."""
+    from scrapers.http_client import fetch_text
+
+    pp_pages = [fetch_text(f"{propertypro.LISTING_URL}?page={page}", propertypro.HEADERS_LIST)
+                for page in range(1, listing_pages + 1)]
+    save_pages(corpus_dir, propertypro.SOURCE, "listing", pp_pages)
+
+    npc_pages = [npc.get_html(npc.listing_page_url(page)) for page in range(1, listing_pages + 1)]
+    links = [link for page, html in enumerate(npc_pages, start=1)
+             for link in npc.parse_property_links(html, page)]
+    save_pages(corpus_dir, npc.SOURCE, "listing", npc_pages)
+    save_pages(corpus_dir, npc.SOURCE, "details", [npc.get_html(link) for link in links[:details]])
+
+    pv_pages = [fetch_text(f"{private.LISTING_URL}?page={page}", private.HEADERS_POOL)
+                for page in range(1, listing_pages + 1)]
+    urls = [url for html in pv_pages for url in private.parse_listing_html(html)]
+    save_pages(corpus_dir, private.SOURCE, "listing", pv_pages)
+    save_pages(corpus_dir, private.SOURCE, "details",
+               [fetch_text(private.BASE_URL + url, private.HEADERS_POOL) for url in urls[:details]])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="record from the real sites")
+    parser.add_argument("--listing-pages", type=int, default=3, help="listing pages per source")
+    parser.add_argument("--details", type=int, default=8, help="detail pages per source")
+    parser.add_argument("--dir", default=CORPUS_DIR, help="corpus directory")
+    args = parser.parse_args()
+
+    if args.live:
+        record_live(args.dir, args.listing_pages, args.details)
+    else:
+        write_synthetic(args.dir, args.listing_pages, args.details)
@@ -0,0 +1,172 @@
+"""Local HTTP stand-in for one source site, replaying the fixture corpus.
+
+Requests with a ?page=N query get listing fixture N (cycling through the
+corpus); any other path gets a detail fixture picked by a hash of the path,
+so every detail link a listing page contains resolves. Latency, jitter and
+an error rate (503 responses) are configurable, and per-server counters
+record requests, errors and bytes served. With max_in_flight set, requests
+beyond that many in flight get 429 with a Retry-After, like a site that
+throttles aggressive clients.
+
+Run from the repo root:  python -m benchmarks.replay_server nigeriapropertycentre --port 8001
+"""
+import argparse
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import CORPUS_DIR, SOURCES, fixture_paths, load_pages
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive, like the real sites
+    disable_nagle_algorithm = True   # headers and body go out as separate writes
+
+    def do_GET(self):
+        server = self.server
+        if not server.enter():
+            server.count(error=True)
+            self.send_bytes(429, b"Too Many Requests", "text/plain",
+                            {"Retry-After": str(server.retry_after)})
+            return
+        try:
+            self.replay()
+        finally:
+            server.leave()
+
+    def replay(self):
+        server = self.server
+        delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if server.error_rate and random.random() < server.error_rate:
+            server.count(error=True)
+            self.send_bytes(503, b"Service Unavailable", "text/plain")
+            return
+
+        body = server.page_for(self.path).encode("utf-8")
+        server.count(size=len(body))
+        self.send_bytes(200, body, "text/html; charset=utf-8")
+
+    def send_bytes(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Serve one source's fixtures on a background thread.
+
+    Use as a context manager, or call start()/stop(). Port 0 picks a free port;
+    the bound address is in `url`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, source, corpus_dir=CORPUS_DIR, latency=0.0, jitter=0.0, error_rate=0.0,
+                 max_in_flight=None, retry_after=1, host="127.0.0.1", port=0):
+        self.source = source
+        self.listing_pages = load_pages(fixture_paths(source, "listing", corpus_dir))
+        self.details_pages = load_pages(fixture_paths(source, "details", corpus_dir))
+        if not self.listing_pages:
+            raise FileNotFoundError(f"No listing fixtures for {source} in {corpus_dir}")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.thread = None
+        super().__init__((host, port), ReplayHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_for(self, path):
+        parsed = urlparse(path)
+        page = parse_qs(parsed.query).get("page")
+        if page or not self.details_pages:
+            number = int(page[0]) if page and page[0].isdigit() else 1
+            return self.listing_pages[(number - 1) % len(self.listing_pages)]
+        return self.details_pages[zlib.crc32(parsed.path.encode()) % len(self.details_pages)]
+
+    def enter(self):
+        """Admit a request, unless max_in_flight are already being served."""
+        with self.stats_lock:
+            if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def leave(self):
+        with self.stats_lock:
+            self.in_flight -= 1
+
+    def count(self, size=0, error=False):
+        with self.stats_lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.bytes_sent += size
+
+    def stats(self):
+        with self.stats_lock:
+            return {"requests": self.requests, "errors": self.errors, "bytes": self.bytes_sent,
+                    "peak_in_flight": self.peak_in_flight}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", choices=SOURCES)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="answer 429 + Retry-After beyond this many concurrent requests")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--dir", default=CORPUS_DIR, help="corpus directory")
+    args = parser.parse_args()
+
+    server = ReplayServer(args.source, args.dir, args.latency, args.jitter, args.error_rate,
+                          args.max_in_flight, args.retry_after, port=args.port)
+    print(f"🛰️ Replaying {args.source} on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
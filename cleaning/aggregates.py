@@ -0,0 +1,76 @@
+"""Precomputed price aggregates for the API: a (city, property_type) cube.
+
+PriceCube groups the loaded listings once, at load time, on their
+normalized city and property type (see cleaning/query.py) and keeps one
+cell per
+
+- (city, property_type),
+- (city, *) and (*, property_type), the rollups over the other key, and
+- (*, *), every listing.
+
+Each cell holds the listing count, the priced count, sum, min and max (the
+parts that merge across cells) and the mean, median and PERCENTILES of
+price. A request then costs one dictionary lookup, whatever the number of
+rows. A rollup key is None in the cube, so no real city can collide with it.
+"""
+import pandas as pd
+
+from cleaning.query import normalize_key, normalized
+
+PERCENTILES = [0.1, 0.25, 0.75, 0.9]
+LEVELS = [("city", "property_type"), ("city", None), (None, "property_type"), (None, None)]
+EMPTY = {
+    "listings": 0, "priced": 0, "sum": 0.0, "min": None, "max": None, "mean": None, "median": None,
+    **{f"p{round(q * 100)}": None for q in PERCENTILES},
+}
+
+
+def as_float(value):
+    return None if pd.isna(value) else float(value)
+
+
+class PriceCube:
+    """Price statistics per (city, property_type) cell and rollup, built once from the listings."""
+
+    def __init__(self, df, keys=None):
+        # `keys` may hand over the normalized columns a ListingQuery already holds
+        keys = keys or {}
+        keys = {column: keys[column] if column in keys else normalized(df[column])
+                for column in ["city", "property_type"]}
+        price = df["price"].astype("float64")
+        everything = pd.Series("", index=df.index)
+        self.cells = {}
+        self.labels = {}
+        for column in keys:
+            # Display name per key: the first spelling seen
+            seen = pd.DataFrame({"key": keys[column], "label": df[column].astype(object)})
+            seen = seen.dropna(subset=["key"]).drop_duplicates("key")
+            self.labels[column] = dict(zip(seen["key"], seen["label"]))
+
+        for city_column, type_column in LEVELS:
+            by = [keys[city_column] if city_column else everything,
+                  keys[type_column] if type_column else everything]
+            grouped = price.groupby(by, sort=False, dropna=True)
+            summary = grouped.agg(["size", "count", "sum", "min", "max"])
+            summary["mean"] = summary["sum"] / summary["count"].where(summary["count"] > 0)
+            quantiles = grouped.quantile([0.5] + PERCENTILES).unstack()
+            quantiles.columns = ["median"] + [f"p{round(q * 100)}" for q in PERCENTILES]
+            summary = summary.rename(columns={"size": "listings", "count": "priced"}).join(quantiles)
+            for (city, property_type), row in zip(summary.index, summary.to_dict(orient="records")):
+                cell = {name: as_float(value) for name, value in row.items()}
+                cell["listings"], cell["priced"] = int(row["listings"]), int(row["priced"])
+                self.cells[(city or None, property_type or None)] = cell
+
+    def get(self, city=None, property_type=None):
+        """Statistics of one cell; None for city or property_type means all of them."""
+        return self.cells.get((normalize_key(city), normalize_key(property_type)), EMPTY)
+
+    def breakdown(self, column, city=None, property_type=None):
+        """{display name: statistics} for every city or property type, within the other filter."""
+        fixed = normalize_key(property_type) if column == "city" else normalize_key(city)
+        rows = {}
+        for (cell_city, cell_type), cell in self.cells.items():
+            key, other = (cell_city, cell_type) if column == "city" else (cell_type, cell_city)
+            if key is not None and other == fixed:
+                rows[self.labels[column][key]] = cell
+        return dict(sorted(rows.items(), key=lambda item: -item[1]["listings"]))
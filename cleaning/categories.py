@@ -0,0 +1,46 @@
+"""Rule-table property categorizer.
+
+The rules (cleaning/property_rules.json by default) are tried in order and
+the first match wins; a rule matches when the lowercased text contains any
+of its "any" phrases, or all of its "all" phrases. Text no rule matches
+gets the default category. Each distinct value is categorized once.
+"""
+import json
+import os
+
+from cleaning.text import map_distinct
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "property_rules.json")
+
+
+def load_rules(path=RULES_PATH):
+    """Read a rule file: {"default": category, "rules": [{"category", "any" | "all"}, ...]}."""
+    with open(path, encoding="utf-8") as f:
+        table = json.load(f)
+    return table["rules"], table["default"]
+
+
+class RuleCategorizer:
+    def __init__(self, rules, default):
+        self.rules = [
+            (rule["category"], tuple(rule.get("any", ())), tuple(rule.get("all", ())))
+            for rule in rules
+        ]
+        self.default = default
+
+    @classmethod
+    def from_file(cls, path=RULES_PATH):
+        return cls(*load_rules(path))
+
+    def categorize_one(self, text):
+        t = str(text).lower()
+        for category, any_of, all_of in self.rules:
+            if any_of and any(phrase in t for phrase in any_of):
+                return category
+            if all_of and all(phrase in t for phrase in all_of):
+                return category
+        return self.default
+
+    def categorize(self, values):
+        """Category of every value in a column, aligned with it."""
+        return map_distinct(values, lambda distinct: distinct.map(self.categorize_one))
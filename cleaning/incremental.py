@@ -0,0 +1,397 @@
+"""Incremental cleaning: only new or changed raw rows go through the cleaning steps.
+
+Every raw row gets a fingerprint, a hash of all its fields. The state
+database keeps the fingerprints seen last run with their dedupe keys, plus
+the cleaned result of every row that won its dedupe key (the first row
+with that key, as drop_duplicates(keep="first") picks). A run then:
+
+- normalizes and dedupe-keys only fingerprints it has not seen,
+- cleans only rows that newly won their key,
+- forgets rows that left the input or lost their key to an earlier row,
+- appends the new cleaned rows to the output when the input only grew at
+  the end, and otherwise rewrites the output from the stored rows.
+
+When the raw file only had rows appended since the last run (its old bytes
+are unchanged, which a hash of them shows), only the new bytes are read at
+all, so the run costs what the delta costs.
+
+The output is the same as a full clean_listings run. Changing the
+gazetteer, the rule file, the input columns or PIPELINE_VERSION starts the
+state over.
+"""
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cleaning.categories import RULES_PATH, RuleCategorizer
+from cleaning.locations import GAZETTEER_PATH, LocationResolver
+from cleaning.pipeline import (
+    INPUT_PATH, KEY_BATCH, OUTPUT_PATH, RAW_DTYPES, CleanReport, clean_frame, dataset_writer, date_format_of,
+    dedupe_keys, normalize_frame, read_listings, row_keys,
+)
+from cleaning import storage
+from cleaning.storage import CLEANED_PATH
+
+STATE_PATH = os.path.join("dataset", "clean_state.sqlite")
+PIPELINE_VERSION = 1    # bump when a cleaning step changes its output
+READ_BLOCK = 1 << 20
+
+
+class CleanState:
+    """Fingerprints and cleaned rows from the previous run, in SQLite.
+
+    Cleaned rows are stored as JSON arrays in the output column order
+    (floats keep their exact value; timestamps are ISO strings). A winning
+    row that the rental filter dropped is stored with kept = 0 and no row.
+    """
+
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                fingerprint BLOB PRIMARY KEY,
+                dedupe_key BLOB NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS fingerprints_key ON fingerprints (dedupe_key);
+            CREATE TABLE IF NOT EXISTS cleaned (
+                fingerprint BLOB PRIMARY KEY,
+                position INTEGER NOT NULL,
+                kept INTEGER NOT NULL,
+                row TEXT
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def reset(self):
+        with self.lock:
+            self.db.execute("DELETE FROM fingerprints")
+            self.db.execute("DELETE FROM cleaned")
+            self.db.execute("DELETE FROM settings")
+
+    def setting(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, key, value):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    def taken_keys(self, keys):
+        """The subset of `keys` some stored row already has."""
+        taken = set()
+        with self.lock:
+            for start in range(0, len(keys), KEY_BATCH):
+                batch = keys[start:start + KEY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                taken.update(row[0] for row in self.db.execute(
+                    f"SELECT dedupe_key FROM fingerprints WHERE dedupe_key IN ({placeholders})", batch
+                ))
+        return taken
+
+    def dedupe_keys(self):
+        """{fingerprint: dedupe_key} for every row seen last run."""
+        with self.lock:
+            return dict(self.db.execute("SELECT fingerprint, dedupe_key FROM fingerprints"))
+
+    def cleaned_positions(self):
+        """{fingerprint: (position, kept)} for every stored winning row."""
+        with self.lock:
+            return {fp: (position, kept) for fp, position, kept in
+                    self.db.execute("SELECT fingerprint, position, kept FROM cleaned")}
+
+    def apply(self, added_keys, removed, moved, cleaned):
+        """Write one run's changes in a single transaction.
+
+        added_keys: [(fingerprint, dedupe_key)] of unseen rows; removed:
+        fingerprints that left the input; moved: [(position, fingerprint)]
+        of stored winners that shifted; cleaned: [(fingerprint, position,
+        kept, row)] of rows that just won their key.
+        """
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany("DELETE FROM fingerprints WHERE fingerprint = ?", [(fp,) for fp in removed])
+            self.db.executemany("INSERT OR REPLACE INTO fingerprints (fingerprint, dedupe_key) VALUES (?, ?)",
+                                added_keys)
+            self.db.executemany("UPDATE cleaned SET position = ? WHERE fingerprint = ?", moved)
+            self.db.executemany("INSERT OR REPLACE INTO cleaned (fingerprint, position, kept, row) VALUES (?, ?, ?, ?)",
+                                cleaned)
+            self.db.execute("COMMIT")
+
+    def drop_cleaned(self, fingerprints):
+        with self.lock:
+            self.db.executemany("DELETE FROM cleaned WHERE fingerprint = ?", [(fp,) for fp in fingerprints])
+
+    def winners(self):
+        """(rows that won their key, of which kept) counts."""
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*), COALESCE(SUM(kept), 0) FROM cleaned").fetchone()
+
+    def kept_rows(self):
+        """JSON rows of every kept winner, in input order."""
+        with self.lock:
+            return [row for row, in self.db.execute("SELECT row FROM cleaned WHERE kept = 1 ORDER BY position")]
+
+    def counts(self, column_index):
+        """Value counts of one output column over the kept rows."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT json_extract(row, ?) AS value, COUNT(*) FROM cleaned WHERE kept = 1 GROUP BY value",
+                (f"$[{column_index}]",),
+            ).fetchall()
+        return pd.Series({value: n for value, n in rows if value is not None}, dtype="int64")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# --- Row encoding ---
+def encode_rows(df):
+    """JSON array per row, with NaN/NaT as null and timestamps as ISO strings."""
+    columns = []
+    for name in df.columns:
+        values = df[name]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime("%Y-%m-%dT%H:%M:%S")
+        columns.append(values.astype(object).where(values.notna(), None).to_numpy(dtype=object))
+    return [json.dumps(list(row), ensure_ascii=False) for row in zip(*columns)]
+
+
+def decode_rows(rows, columns, datetime_columns):
+    df = pd.DataFrame([json.loads(row) for row in rows], columns=columns)
+    for name in datetime_columns:
+        df[name] = pd.to_datetime(df[name], format="ISO8601")
+    return df
+
+
+def config_hash(gazetteer_path, rules_path, columns):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{PIPELINE_VERSION}\x1f{pd.__version__}\x1f{json.dumps(columns)}".encode("utf-8"))
+    for path in (gazetteer_path, rules_path):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def snapshot(path, prefix_size=None):
+    """(size, digest, digest of the first prefix_size bytes, ends with a newline) in one read."""
+    digest = hashlib.blake2b(digest_size=16)
+    prefix = digest.hexdigest() if prefix_size == 0 else None
+    size = 0
+    last = b""
+    with open(path, "rb") as f:
+        while block := f.read(READ_BLOCK):
+            if prefix is None and prefix_size is not None and size + len(block) >= prefix_size:
+                cut = prefix_size - size
+                digest.update(block[:cut])
+                prefix = digest.hexdigest()
+                digest.update(block[cut:])
+            else:
+                digest.update(block)
+            size += len(block)
+            last = block[-1:]
+    return size, digest.hexdigest(), prefix, last == b"\n"
+
+
+def stored_rows(cleaned, positions):
+    """State rows for freshly cleaned winners at `positions` (the frame's index)."""
+    kept = set(cleaned.index)
+    encoded = dict(zip(cleaned.index, encode_rows(cleaned)))
+    return [(fp, int(position), int(position in kept), encoded.get(position)) for fp, position in positions]
+
+
+def remember_columns(state, cleaned):
+    columns = list(cleaned.columns)
+    state.set_setting("columns", json.dumps(columns))
+    state.set_setting("datetime_columns", json.dumps(
+        [name for name in columns if pd.api.types.is_datetime64_any_dtype(cleaned[name])]
+    ))
+
+
+def report_from_state(state, rows_in):
+    columns = json.loads(state.setting("columns"))
+    report = CleanReport()
+    report.rows_in = rows_in
+    report.rows_unique, report.rows_out = state.winners()
+    report.categories = state.counts(columns.index("property_category"))
+    report.cities = state.counts(columns.index("city"))
+    return report
+
+
+def write_outputs(cleaned, output_path, dataset_path, append):
+    """Append `cleaned` to the CSV export and Parquet dataset, or replace them with it (either may be unset)."""
+    if append:
+        if output_path:
+            cleaned.to_csv(output_path, index=False, mode="a", header=False)
+        if dataset_path and storage.available():
+            storage.append_cleaned(cleaned, dataset_path)
+        return
+    if output_path:
+        cleaned.to_csv(output_path, index=False)
+    writer = dataset_writer(dataset_path)
+    if writer:
+        writer.write(cleaned)
+        writer.commit()
+
+
+# --- Runs ---
+def update_appended(tail, first_row, columns, state, output_path, dataset_path, resolver, categorizer):
+    """Clean rows appended to the input; every old row keeps its position and result."""
+    if not tail.strip():
+        print("🧮 No new rows")
+        return report_from_state(state, first_row), first_row
+
+    raw = pd.read_csv(io.BytesIO(tail), header=None, names=columns, dtype=RAW_DTYPES)
+    raw.index = pd.RangeIndex(first_row, first_row + len(raw))
+    fingerprints = row_keys(raw, columns)
+    rows = normalize_frame(raw.copy())
+    keys = dedupe_keys(rows)
+
+    # Old rows come first, so a key they already have is never won here
+    taken = state.taken_keys(keys)
+    winner = ~pd.Series(keys, dtype=object).duplicated(keep="first").to_numpy()
+    winner &= np.array([key not in taken for key in keys], dtype=bool)
+
+    date_format = json.loads(state.setting("date_format") or "null")
+    if date_format is None:
+        date_format = date_format_of(raw["added_date"][winner])
+        state.set_setting("date_format", json.dumps(date_format))
+
+    cleaned = clean_frame(rows[winner], resolver, categorizer, date_format)
+    state.apply(
+        list(zip(fingerprints, keys)), [], [],
+        stored_rows(cleaned, [(fingerprints[i], first_row + i) for i in np.flatnonzero(winner)]),
+    )
+    write_outputs(cleaned, output_path, dataset_path, append=True)
+    print(f"➕ {len(raw)} appended rows, {winner.sum()} first of their key, {len(cleaned)} cleaned rows "
+          f"appended to {output_path or dataset_path}")
+    return report_from_state(state, first_row + len(raw)), first_row + len(raw)
+
+
+def update_changed(input_path, state, output_path, dataset_path, resolver, categorizer, rewrite=False):
+    """Diff the whole input against the state by fingerprint and clean what changed."""
+    raw = read_listings(input_path)
+    fingerprints = row_keys(raw, list(raw.columns))
+
+    # --- Dedupe keys: computed only for fingerprints not seen before ---
+    known = state.dedupe_keys()
+    keys = [known.get(fp) for fp in fingerprints]
+    unseen = np.array([key is None for key in keys], dtype=bool)
+    if unseen.any():
+        for position, key in zip(np.flatnonzero(unseen), dedupe_keys(normalize_frame(raw[unseen].copy()))):
+            keys[position] = key
+    winner = ~pd.Series(keys, dtype=object).duplicated(keep="first").to_numpy()
+    positions = np.flatnonzero(winner)
+
+    # A different date format (inferred from the first winner) changes every row
+    date_format = date_format_of(raw["added_date"][winner])
+    if state.setting("date_format") != json.dumps(date_format):
+        state.drop_cleaned(list(state.cleaned_positions()))
+        state.set_setting("date_format", json.dumps(date_format))
+
+    # --- Compare with the stored winners ---
+    stored = state.cleaned_positions()
+    current = {fingerprints[position]: int(position) for position in positions}
+    present = set(fingerprints)
+    removed = [fp for fp in known if fp not in present]
+    dethroned = [fp for fp in stored if fp not in current]
+    moved = [(position, fp) for fp, position in current.items() if fp in stored and stored[fp][0] != position]
+    fresh = [(fp, position) for fp, position in current.items() if fp not in stored]
+
+    # --- Clean only the newly winning rows ---
+    rows = normalize_frame(raw.iloc[[position for _, position in fresh]].copy())
+    cleaned = clean_frame(rows, resolver, categorizer, date_format)
+
+    # The old output is still a prefix of the new one: nothing before the new rows changed
+    last_kept = max((position for position, was_kept in stored.values() if was_kept), default=-1)
+    appendable = (
+        not rewrite
+        and bool(stored)
+        and not any(stored[fp][1] for fp in dethroned)
+        and not any(stored[fp][1] for _, fp in moved)
+        and all(position > last_kept for _, position in fresh)
+    )
+
+    state.drop_cleaned(dethroned)
+    state.apply([(fingerprints[position], keys[position]) for position in np.flatnonzero(unseen)],
+                removed, moved, stored_rows(cleaned, fresh))
+    remember_columns(state, cleaned)
+
+    if appendable:
+        write_outputs(cleaned, output_path, dataset_path, append=True)
+        print(f"➕ Appended {len(cleaned)} cleaned rows to {output_path or dataset_path}")
+    elif not stored:
+        write_outputs(cleaned, output_path, dataset_path, append=False)
+        print(f"💾 Wrote {output_path or dataset_path} ({len(cleaned)} rows)")
+    else:
+        output = decode_rows(state.kept_rows(), list(cleaned.columns), json.loads(state.setting("datetime_columns")))
+        write_outputs(output, output_path, dataset_path, append=False)
+        print(f"💾 Rewrote {output_path or dataset_path} ({len(output)} rows)")
+
+    print(f"🧮 {unseen.sum()} new or changed rows, {len(removed)} removed, {len(fresh)} cleaned, "
+          f"{len(dethroned)} no longer first of their key")
+    return report_from_state(state, len(raw)), len(raw)
+
+
+def clean_incremental(input_path=INPUT_PATH, output_path=OUTPUT_PATH, state_path=STATE_PATH,
+                      gazetteer_path=GAZETTEER_PATH, rules_path=RULES_PATH, dataset_path=CLEANED_PATH):
+    """Bring the cleaned CSV and Parquet dataset up to date with the raw listings; returns a CleanReport.
+
+    The append-only fast path needs the raw CSV; a Parquet input is always
+    diffed whole (it never ends in a newline, so never looks appended to).
+    """
+    resolver = LocationResolver.from_file(gazetteer_path)
+    categorizer = RuleCategorizer.from_file(rules_path)
+    if input_path.endswith(".parquet"):
+        columns = storage.raw_columns(input_path)
+    else:
+        columns = list(pd.read_csv(input_path, dtype=RAW_DTYPES, nrows=0).columns)
+
+    state = CleanState(state_path)
+    try:
+        config = config_hash(gazetteer_path, rules_path, columns)
+        if state.setting("config") != config:
+            state.reset()
+            state.set_setting("config", config)
+
+        known_size = state.setting("input_size")
+        size, digest, prefix, ends_newline = snapshot(input_path, int(known_size) if known_size else None)
+        output_intact = ((not output_path or (os.path.exists(output_path)
+                                              and str(os.path.getsize(output_path)) == state.setting("output_size")))
+                         and (not dataset_path or not storage.available() or os.path.isdir(dataset_path)))
+        grew = (known_size is not None and prefix == state.setting("input_digest")
+                and state.setting("input_ends_newline") == "1")
+
+        if grew and output_intact:
+            with open(input_path, "rb") as f:
+                f.seek(int(known_size))
+                tail = f.read()
+            report, rows = update_appended(tail, int(state.setting("input_rows")), columns, state, output_path,
+                                           dataset_path, resolver, categorizer)
+        else:
+            report, rows = update_changed(input_path, state, output_path, dataset_path, resolver, categorizer,
+                                          rewrite=not output_intact)
+
+        state.set_setting("input_size", str(size))
+        state.set_setting("input_digest", digest)
+        state.set_setting("input_ends_newline", "1" if ends_newline else "0")
+        state.set_setting("input_rows", str(rows))
+        # No export this run: a later run with one finds no size to match and rewrites it whole
+        state.set_setting("output_size", str(os.path.getsize(output_path)) if output_path else "")
+        return report
+    finally:
+        state.close()
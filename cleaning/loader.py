@@ -0,0 +1,89 @@
+"""Shared loader for the cleaned listings, in a compact in-memory form.
+
+app.py and dashboard.py keep the cleaned listings in memory for the life
+of the process, once per API worker or dashboard replica, so the frame is
+compacted on load:
+
+- repeated text (city, location, property_type, the category columns and
+  month_posted) becomes categoricals: one small integer code per row;
+- bedrooms/bathrooms/toilets become the smallest nullable unsigned
+  integer that holds them (UInt8 for room counts) when they are whole;
+- dates stay datetime64, int64 underneath, never strings;
+- any other text becomes Arrow-backed strings rather than Python objects.
+
+memory_report shows the bytes per column before and after. "Before" is
+the plain form (text as Python objects, numbers as float64, see plain),
+whichever source the rows came from: the Parquet dataset is categorical
+already, so measured as loaded it would show nothing saved.
+"""
+import pandas as pd
+
+from cleaning.prices import STRING_DTYPE
+from cleaning.storage import (
+    CLEANED_CSV_PATH, CLEANED_PATH, COUNT_COLUMNS, DICTIONARY_COLUMNS, TIMESTAMP_COLUMNS, load_cleaned,
+)
+
+CATEGORY_COLUMNS = DICTIONARY_COLUMNS + ["month_posted"]
+
+
+def downcast_counts(values):
+    """Whole, non-negative counts as the smallest nullable unsigned integer; others unchanged."""
+    present = values.dropna()
+    if (present < 0).any() or not (present == present.round()).all():
+        return values
+    return pd.to_numeric(values.astype("Int64"), downcast="unsigned")
+
+
+def compact(df):
+    """A compact frame with the same rows, columns and values as `df`."""
+    columns = {}
+    for name in df.columns:
+        values = df[name]
+        if name in CATEGORY_COLUMNS:
+            values = values.astype("category").cat.remove_unused_categories()
+        elif name in COUNT_COLUMNS:
+            values = downcast_counts(values)
+        elif name in TIMESTAMP_COLUMNS:
+            values = pd.to_datetime(values, errors="coerce")
+        elif values.dtype == object:
+            values = values.astype(STRING_DTYPE)
+        columns[name] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def plain(df):
+    """`df` in the plain form pandas used to read the CSV into: text as objects, numbers as float64."""
+    columns = {}
+    for name in df.columns:
+        values = df[name]
+        if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+            values = values.astype("float64")
+        elif not pd.api.types.is_datetime64_any_dtype(values.dtype):
+            values = values.astype(object)
+        columns[name] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_usage(df):
+    """Bytes per column, counting the strings and categories each one holds."""
+    return df.memory_usage(deep=True, index=False)
+
+
+def memory_report(before, after):
+    """Frame of dtype and bytes per column for two versions of the same frame, with a total row."""
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "bytes_before": memory_usage(before),
+        "dtype_after": after.dtypes.astype(str),
+        "bytes_after": memory_usage(after),
+    })
+    report.loc["total"] = ["", report["bytes_before"].sum(), "", report["bytes_after"].sum()]
+    report["saved_%"] = (100 * (1 - report["bytes_after"] / report["bytes_before"])).round(1)
+    return report
+
+
+def load_listings(columns=None, filters=None, path=CLEANED_PATH, csv_path=CLEANED_CSV_PATH):
+    """Cleaned listings (Parquet dataset or CSV export) in compact form; returns (df, memory report)."""
+    loaded = load_cleaned(columns, filters, path, csv_path)
+    df = compact(loaded)
+    return df, memory_report(plain(loaded), df)
@@ -0,0 +1,113 @@
+"""City and area resolution for listing locations.
+
+A gazetteer (cleaning/gazetteer.json by default) lists the cities and
+states to look for, in priority order, and known areas with the spellings
+they appear under. Each distinct location string is resolved once:
+
+- city: the first gazetteer city (in list order) found as a whole word,
+  else the last word of the location, then stripped of punctuation and
+  title-cased. This is what the old per-row extract_city loop produced.
+- area: the known area named closest to the end of the location (the
+  district in "ikate, lekki, lagos"), else the last comma-separated part
+  before the city, cleaned up the same way.
+"""
+import json
+import os
+import re
+
+import pandas as pd
+
+from cleaning.text import map_distinct
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.json")
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Read a gazetteer: {"cities": [name, ...], "areas": {area: [spelling, ...]}}."""
+    with open(path, encoding="utf-8") as f:
+        gazetteer = json.load(f)
+    return gazetteer["cities"], gazetteer.get("areas", {})
+
+
+def alternation(words):
+    return "|".join(re.escape(word) for word in words)
+
+
+class LocationResolver:
+    """Resolve city and area for a column of locations with two precompiled regexes."""
+
+    def __init__(self, cities, areas=None):
+        self.cities = [city.lower() for city in cities]
+        self.priority = {}
+        for rank, city in enumerate(self.cities):
+            self.priority.setdefault(city, rank)
+        # A lookahead finds a match starting at every position, overlapping or
+        # not, and at each position the alternation tries cities in list order
+        self.city_pattern = re.compile(rf"(?=\b({alternation(self.cities)})\b)")
+
+        self.areas = {}
+        for area, spellings in (areas or {}).items():
+            for spelling in [area, *spellings]:
+                self.areas.setdefault(spelling.lower(), area)
+        # Longest spelling first, so "ibeju lekki" wins over "lekki"
+        spellings = sorted(self.areas, key=len, reverse=True)
+        self.area_pattern = re.compile(rf"\b({alternation(spellings)})\b") if spellings else None
+
+    @classmethod
+    def from_file(cls, path=GAZETTEER_PATH):
+        return cls(*load_gazetteer(path))
+
+    def find_city(self, location):
+        """(city, start) of the highest-priority city named in `location`, or (None, None)."""
+        best = None
+        for match in self.city_pattern.finditer(location):
+            rank = self.priority[match.group(1)]
+            if best is None or rank < best[0]:
+                best = (rank, match.start())
+        if best is None:
+            return None, None
+        return self.cities[best[0]], best[1]
+
+    def find_area(self, location):
+        """Known area named closest to the end of `location`, or None."""
+        if self.area_pattern is None:
+            return None
+        area = None
+        for match in self.area_pattern.finditer(location):
+            area = self.areas[match.group(1)]
+        return area
+
+    def resolve(self, locations):
+        """Return a frame of city and area, aligned with `locations`."""
+        return map_distinct(locations, self.resolve_distinct)
+
+    def resolve_distinct(self, distinct):
+        lowered = pd.Series([str(location).lower() for location in distinct], dtype=object)
+
+        found = [self.find_city(location) for location in lowered]
+        matched = pd.Series([city for city, _ in found], dtype=object)
+        last_word = lowered.str.strip().str.split(r"[,\s]+", regex=True).str[-1]
+        city = matched.str.title().where(matched.notna(), last_word.str.title())
+        city = clean_place(city)
+
+        # Text ahead of the city (or of the last word when no city was found)
+        cut = [len(text.rstrip()) - len(word) if start is None else start
+               for text, word, (_, start) in zip(lowered, last_word, found)]
+        before = pd.Series([text[:end] for text, end in zip(lowered, cut)], dtype=object)
+        known = pd.Series([self.find_area(text) for text in before], dtype=object)
+        segment = before.str.split(",").str[-1].str.replace(r"[^\w\s]", " ", regex=True)
+        guessed = segment.str.split().str.join(" ").str.title().replace("", None)
+        area = known.where(known.notna(), guessed)
+
+        return pd.DataFrame({"city": city.to_numpy(dtype=object), "area": area.to_numpy(dtype=object)})
+
+
+def clean_place(names):
+    """Strip punctuation and title-case place names."""
+    return (
+        names
+        .astype(str)
+        .str.replace(r"[^\w\s]", "", regex=True)
+        .str.strip()
+        .str.title()
+    )
@@ -0,0 +1,210 @@
+"""Near-duplicate listings: the same property cross-posted with a slightly different text.
+
+Exact deduplication (step 2) only catches listings whose title, location
+and property type match after lowercasing. This stage groups listings
+whose title + location text is nearly the same and whose price and
+bedrooms agree:
+
+1. Each distinct text is cut into overlapping 4-byte shingles and given a
+   MinHash signature (NUM_PERM minimums of random hash functions over its
+   shingles); two signatures agree in a share of places close to the
+   Jaccard similarity of the two shingle sets.
+2. LSH banding splits each signature into BANDS bands. Listings whose
+   band matches land in the same bucket, so similar texts meet in at
+   least one bucket with high probability and dissimilar ones rarely do.
+3. Within a bucket, listings are sorted by bedrooms and price and each is
+   compared with its neighbour only: same bedrooms, prices within
+   PRICE_TOLERANCE of each other, estimated similarity of at least
+   THRESHOLD and no conflicting numbers in the text (numbers_agree) make
+   a link. Linked listings form a cluster.
+4. Links chain: A-B and B-C can each pass while C fails the checks
+   against A (price drifting past PRICE_TOLERANCE, text below THRESHOLD,
+   "phase 1" vs "phase 2"). So every member must also pass them against
+   its cluster's first listing, the one kept. Members that do not are
+   split off, and their own links re-cluster them the same way.
+
+Every step is a sort or a vectorized pass over rows × bands (the number
+check loops only over pairs already linked), so the cost grows with the
+number of listings, not with the number of possible pairs.
+cluster_id numbers the clusters in input order, and the first listing of
+each cluster is the one kept, as drop_duplicates(keep="first") does.
+"""
+import numpy as np
+import pandas as pd
+
+SHINGLE_SIZE = 4         # bytes per shingle, packed into one 32-bit integer
+NUM_PERM = 128
+BANDS = 16               # 8 rows per band: texts about 0.7 similar or more usually meet
+THRESHOLD = 0.7          # estimated Jaccard similarity a link needs
+PRICE_TOLERANCE = 0.02   # higher price at most 2% above the lower
+MERSENNE = np.uint64((1 << 31) - 1)
+DOC_BLOCK = 50_000       # texts hashed at a time, to bound memory
+
+
+def listing_text(df):
+    """Title and location, lowercased with punctuation runs collapsed to one space."""
+    text = df["title"].fillna("").astype(str) + " " + df["location"].fillna("").astype(str)
+    return text.str.lower().str.replace(r"[^\w]+", " ", regex=True).str.strip()
+
+
+def number_sets(texts):
+    """The set of numbers in each text (plot, house, flat or phase numbers, room counts)."""
+    return [frozenset(found) for found in pd.Series(texts, dtype=object).str.findall(r"\d+")]
+
+
+def numbers_agree(numbers, a, b):
+    """Per pair, whether texts a[i] and b[i] carry no conflicting numbers: one set holds the other.
+
+    "plot 12" and "plot 40", or "phase 1" and "phase 2", are different
+    properties however similar the rest; a site adding "phase 2" to the
+    area is not.
+    """
+    return np.fromiter((numbers[i] <= numbers[j] or numbers[j] <= numbers[i] for i, j in zip(a, b)),
+                       dtype=bool, count=len(a))
+
+
+def connected_labels(n, u, v):
+    """Per node, the smallest node id of its connected component (edges u[i]-v[i])."""
+    labels = np.arange(n)
+    while len(u):
+        lu, lv = labels[u], labels[v]
+        if (lu == lv).all():
+            break
+        # Hook the higher root onto the lower one, then point every node at its root
+        np.minimum.at(labels, np.maximum(lu, lv), np.minimum(lu, lv))
+        while True:
+            jumped = labels[labels]
+            if (jumped == labels).all():
+                break
+            labels = jumped
+    return labels
+
+
+def anchored_labels(labels, u, v, fits):
+    """Split connected_labels clusters until every member fits(members, anchors) its first listing."""
+    nodes = np.arange(len(labels))
+    while True:
+        members = np.flatnonzero(labels != nodes)
+        far = np.zeros(len(labels), dtype=bool)
+        far[members] = ~fits(members, labels[members])
+        if not far.any():
+            return labels
+        # Re-cluster the split-off members over the links among themselves, within their old cluster
+        kept = far[u] & far[v] & (labels[u] == labels[v])
+        u, v = u[kept], v[kept]
+        labels = np.where(far, connected_labels(len(labels), u, v), labels)
+
+
+class NearDuplicateFinder:
+    """MinHash/LSH clustering of listings whose text is nearly the same and price and bedrooms agree."""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, price_tolerance=PRICE_TOLERANCE,
+                 seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.price_tolerance = price_tolerance
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE, size=num_perm, dtype=np.uint64)
+        self.band_weights = rng.integers(1, 1 << 63, size=num_perm // bands, dtype=np.uint64) | np.uint64(1)
+
+    # --- Signatures ---
+    def shingles(self, texts):
+        """(start of each text's run, shingle codes): every SHINGLE_SIZE-byte window as an integer."""
+        encoded = [text.encode("utf-8").ljust(SHINGLE_SIZE) for text in texts]
+        lengths = np.array([len(chunk) for chunk in encoded], dtype=np.int64)
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        counts = lengths - SHINGLE_SIZE + 1
+        runs = np.cumsum(counts) - counts
+        positions = np.repeat(np.cumsum(lengths) - lengths - runs, counts) + np.arange(counts.sum())
+        codes = np.zeros(len(positions), dtype=np.uint64)
+        for offset in range(SHINGLE_SIZE):
+            codes = codes << np.uint64(8) | data[positions + offset]
+        return runs, codes % MERSENNE
+
+    def signatures(self, texts):
+        """MinHash signature per text, shape (len(texts), num_perm)."""
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(texts), DOC_BLOCK):
+            runs, codes = self.shingles(texts[start:start + DOC_BLOCK])
+            block = signatures[start:start + DOC_BLOCK]
+            for i in range(self.num_perm):
+                block[:, i] = np.minimum.reduceat((self.a[i] * codes + self.b[i]) % MERSENNE, runs)
+        return signatures
+
+    def band_keys(self, signatures):
+        """One 64-bit key per text and band, shape (bands, len(signatures))."""
+        rows = self.num_perm // self.bands
+        keys = np.empty((self.bands, len(signatures)), dtype=np.uint64)
+        for band in range(self.bands):
+            values = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+            keys[band] = (values * self.band_weights).sum(axis=1) + np.uint64(band)
+        return keys
+
+    # --- Clustering ---
+    def links(self, docs, signatures, bedrooms, prices, numbers):
+        """(u, v) listing pairs that pass every check; neighbours in the sorted buckets only."""
+        keys = self.band_keys(signatures)[:, docs].ravel()
+        listings = np.tile(np.arange(len(docs)), self.bands)
+        # Missing bedrooms match each other; listings without a price never link
+        rooms = np.tile(np.where(np.isnan(bedrooms), -1.0, bedrooms), self.bands)
+        log_price = np.tile(np.log(np.where(prices > 0, prices, np.nan)), self.bands)
+        priced = ~np.isnan(log_price)
+        keys, listings, rooms, log_price = keys[priced], listings[priced], rooms[priced], log_price[priced]
+
+        order = np.lexsort((listings, log_price, rooms, keys))
+        keys, listings, rooms, log_price = keys[order], listings[order], rooms[order], log_price[order]
+        linked = (
+            (keys[1:] == keys[:-1])
+            & (rooms[1:] == rooms[:-1])
+            & (log_price[1:] - log_price[:-1] <= np.log1p(self.price_tolerance))
+        )
+        u, v = listings[:-1][linked], listings[1:][linked]
+        if len(u):
+            pairs = np.unique(np.stack([np.minimum(u, v), np.maximum(u, v)], axis=1), axis=0)
+            u, v = pairs[:, 0], pairs[:, 1]
+        similar = self.similarity(signatures, docs[u], docs[v]) >= self.threshold
+        u, v = u[similar], v[similar]
+        agree = numbers_agree(numbers, docs[u], docs[v])
+        return u[agree], v[agree]
+
+    def similarity(self, signatures, a, b):
+        """Estimated Jaccard similarity of texts a[i] and b[i], DOC_BLOCK pairs at a time."""
+        estimates = np.empty(len(a))
+        for start in range(0, len(a), DOC_BLOCK):
+            block = slice(start, start + DOC_BLOCK)
+            estimates[block] = (signatures[a[block]] == signatures[b[block]]).mean(axis=1)
+        return estimates
+
+    def cluster(self, df):
+        """Cluster id per listing of `df` (numbered in input order of each cluster's first listing)."""
+        docs, texts = pd.factorize(listing_text(df))
+        signatures = self.signatures(list(texts))
+        bedrooms = df["bedrooms"].to_numpy(dtype="float64", na_value=np.nan)
+        prices = df["price"].to_numpy(dtype="float64", na_value=np.nan)
+        numbers = number_sets(texts)
+        u, v = self.links(docs, signatures, bedrooms, prices, numbers)
+        first = connected_labels(len(df), u, v)
+        log_price = np.log(np.where(prices > 0, prices, np.nan))
+
+        def fits(members, anchors):
+            close = np.abs(log_price[members] - log_price[anchors]) <= np.log1p(self.price_tolerance)
+            fit = close & (self.similarity(signatures, docs[members], docs[anchors]) >= self.threshold)
+            fit[fit] = numbers_agree(numbers, docs[members[fit]], docs[anchors[fit]])
+            return fit
+
+        first = anchored_labels(first, u, v, fits)
+        return pd.Series(pd.factorize(first)[0], index=df.index, name="cluster_id")
+
+
+def collapse_near_duplicates(df, finder=None):
+    """Step 8: add cluster_id and keep the first listing of each cluster."""
+    finder = finder or NearDuplicateFinder()
+    if not len(df):
+        return df.assign(cluster_id=pd.Series(dtype="int64"))
+    cluster_id = finder.cluster(df)
+    keep = ~cluster_id.duplicated(keep="first")
+    return df[keep].assign(cluster_id=cluster_id[keep])
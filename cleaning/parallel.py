@@ -0,0 +1,107 @@
+"""Parallel cleaning: the input split by dedupe key across worker processes.
+
+Rows are assigned to partitions by a hash of their normalized dedupe key,
+so every copy of a listing lands in the same partition, in input order.
+Each worker then runs the whole pipeline (drop_duplicates(keep="first")
+and steps 3-7A) on its partition, and the parent puts the cleaned rows
+back in input order. The first row of a key in its partition is the first
+row of that key in the file, so the output is the same as clean_listings.
+
+The one thing a partition cannot see on its own is the date format, which
+pandas infers from the first dated row left after deduplication; the
+parent works it out before starting the workers.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cleaning.categories import RULES_PATH, RuleCategorizer
+from cleaning.locations import GAZETTEER_PATH, LocationResolver
+from cleaning.pipeline import (
+    DEDUPE_COLUMNS, INPUT_PATH, OUTPUT_PATH, CleanReport, clean_frame, collapse_near, dataset_writer,
+    date_format_of, normalize_frame, read_listings,
+)
+from cleaning.storage import CLEANED_PATH
+
+HASH_MULTIPLIER = np.uint64(1_000_003)
+
+
+def partition_of(df, partitions):
+    """Partition number per row from a hash of its dedupe columns (missing values hash alike)."""
+    combined = np.zeros(len(df), dtype=np.uint64)
+    for column in DEDUPE_COLUMNS:
+        # Hash each distinct value once; the key hash folds the column hashes together
+        codes, distinct = pd.factorize(df[column], use_na_sentinel=False)
+        hashed = pd.util.hash_array(np.asarray(distinct, dtype=object))
+        combined = combined * HASH_MULTIPLIER ^ hashed[codes]
+    return (combined % np.uint64(partitions)).astype(np.int64)
+
+
+def first_date_format(df):
+    """date_format_of the deduplicated rows, without building the deduplicated frame.
+
+    The first dated row that is also the first of its key decides the
+    format. One hashing pass over the keys marks the first rows (the same
+    rows drop_duplicates keeps, missing values matching each other).
+    """
+    first = ~df.duplicated(subset=DEDUPE_COLUMNS, keep="first").to_numpy()
+    dated = np.flatnonzero(first & df["added_date"].notna().to_numpy())
+    if not len(dated):
+        return None
+    return date_format_of(df["added_date"].iloc[dated[:1]])
+
+
+def clean_partition(rows, date_format, gazetteer_path, rules_path):
+    """Worker: dedupe and clean one partition; returns (cleaned, unique row count)."""
+    resolver = LocationResolver.from_file(gazetteer_path)
+    categorizer = RuleCategorizer.from_file(rules_path)
+    unique = rows.drop_duplicates(subset=DEDUPE_COLUMNS, keep="first")
+    return clean_frame(unique, resolver, categorizer, date_format), len(unique)
+
+
+def clean_parallel(input_path=INPUT_PATH, output_path=OUTPUT_PATH, workers=None,
+                   gazetteer_path=GAZETTEER_PATH, rules_path=RULES_PATH, dataset_path=CLEANED_PATH,
+                   near_duplicates=False):
+    """Clean the combined listings with `workers` processes; returns a CleanReport.
+
+    Writes the same CSV export and Parquet dataset as clean_listings. Step 8
+    (near_duplicates) runs in the parent on the merged rows: a cluster can
+    span partitions.
+    """
+    workers = workers or os.cpu_count() or 1
+    df = normalize_frame(read_listings(input_path))
+    print(f"Original shape: {df.shape}")
+
+    date_format = first_date_format(df)
+    partition = partition_of(df, workers)
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as pool:
+        futures = [
+            pool.submit(clean_partition, df[partition == number], date_format, gazetteer_path, rules_path)
+            for number in range(workers)
+        ]
+        results = [future.result() for future in futures]
+
+    # Back to input order: each frame keeps the row positions it was read with
+    # (empty partitions are left out, their column dtypes can differ)
+    parts = [part for part, _ in results if len(part)] or [results[0][0]]
+    cleaned = pd.concat(parts).sort_index(kind="stable")
+    rows_unique = sum(unique for _, unique in results)
+    print(f"After removing duplicates: ({rows_unique}, {df.shape[1]})")
+    if near_duplicates:
+        cleaned = collapse_near(cleaned)
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        cleaned.to_csv(output_path, index=False)
+    writer = dataset_writer(dataset_path)
+    if writer:
+        writer.write(cleaned)
+        writer.commit()
+    report = CleanReport()
+    report.add(len(df), rows_unique, cleaned)
+    print(f"⚙️ {workers} workers cleaned {len(df)} rows into {len(cleaned)}")
+    return report
@@ -0,0 +1,290 @@
+"""Listings cleaning pipeline: combined listings -> cleaned dataset and CSV export.
+
+clean_listings cleans the whole file in memory, or, given a chunksize,
+streams it: each chunk is normalized, deduplicated against every earlier
+chunk through an on-disk key set (DedupeIndex), cleaned and appended to the
+output. Peak memory then follows the chunk size, not the input size, and
+the output is the same as the in-memory run's.
+
+The raw listings are read from combined_listings.csv or its Parquet copy,
+and the cleaned rows are written to the partitioned Parquet dataset and to
+new_cleaned_properties.csv (see cleaning/storage.py).
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from cleaning.categories import RULES_PATH, RuleCategorizer
+from cleaning.locations import GAZETTEER_PATH, LocationResolver
+from cleaning.neardup import collapse_near_duplicates
+from cleaning import storage
+from cleaning.prices import normalize_prices
+from cleaning.storage import CLEANED_PATH, RAW_DTYPES
+from cleaning.text import normalize_text
+
+INPUT_PATH = os.path.join("dataset", "combined_listings.csv")
+OUTPUT_PATH = storage.CLEANED_CSV_PATH
+DEDUPE_PATH = os.path.join("dataset", "clean_dedupe.sqlite")
+
+TEXT_COLUMNS = ["title", "location", "property_type"]
+DEDUPE_COLUMNS = ["title", "location", "property_type"]
+EXCLUDE_PATTERN = "for rent|shortlet|lease"
+KEY_BATCH = 500     # keys per SQLite IN (...) lookup
+
+
+# --- Reading ---
+def read_listings(input_path, chunksize=None):
+    """Raw listings from the CSV or its Parquet copy (by extension); with chunksize, an iterator of frames."""
+    if input_path.endswith(".parquet"):
+        return storage.read_raw(input_path, chunksize=chunksize)
+    return pd.read_csv(input_path, dtype=RAW_DTYPES, chunksize=chunksize)
+
+
+def default_input(csv_path=INPUT_PATH, parquet_path=storage.RAW_PATH):
+    """The Parquet copy of the raw listings when it is at least as new as the CSV, else the CSV."""
+    if (storage.available() and os.path.exists(parquet_path)
+            and (not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path))):
+        return parquet_path
+    return csv_path
+
+
+def dataset_writer(dataset_path):
+    """CleanedWriter for `dataset_path`, or None when it is unset or pyarrow is missing."""
+    if not dataset_path:
+        return None
+    if not storage.available():
+        print("⚠️ pyarrow is not installed, skipping the Parquet dataset")
+        return None
+    return storage.CleanedWriter(dataset_path)
+
+
+# --- Row keys ---
+def row_keys(df, columns):
+    """Stable 128-bit key per row from `columns` (missing values hash alike)."""
+    fields = [df[column].to_numpy(dtype=object) for column in columns]
+    return [
+        hashlib.blake2b(
+            "\x1f".join(
+                value if isinstance(value, str) else "\x00" if pd.isna(value) else repr(value)
+                for value in row
+            ).encode("utf-8"),
+            digest_size=16,
+        ).digest()
+        for row in zip(*fields)
+    ]
+
+
+def dedupe_keys(df):
+    return row_keys(df, DEDUPE_COLUMNS)
+
+
+class DedupeIndex:
+    """On-disk set of dedupe keys, so deduplication spans chunks without holding them in memory."""
+
+    def __init__(self, path=DEDUPE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen_keys (key BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def reset(self):
+        with self.lock:
+            self.db.execute("DELETE FROM seen_keys")
+
+    def admit(self, keys):
+        """Record `keys`; returns a mask of the ones not seen before (first occurrence wins)."""
+        with self.lock:
+            self.db.execute("BEGIN")
+            seen = set()
+            for start in range(0, len(keys), KEY_BATCH):
+                batch = keys[start:start + KEY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                seen.update(row[0] for row in self.db.execute(
+                    f"SELECT key FROM seen_keys WHERE key IN ({placeholders})", batch
+                ))
+            fresh = np.zeros(len(keys), dtype=bool)
+            for position, key in enumerate(keys):
+                if key not in seen:
+                    fresh[position] = True
+                    seen.add(key)
+            self.db.executemany(
+                "INSERT INTO seen_keys (key) VALUES (?)", [(key,) for key, new in zip(keys, fresh) if new]
+            )
+            self.db.execute("COMMIT")
+        return fresh
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM seen_keys").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# --- Cleaning steps ---
+def normalize_frame(df):
+    """Step 1: lowercase and strip the text columns."""
+    for col in TEXT_COLUMNS:
+        df[col] = normalize_text(df[col])
+    return df
+
+
+def categorize_price(p):
+    if pd.isna(p):
+        return None
+    if p < 10_000_000:
+        return "Low"
+    elif p < 50_000_000:
+        return "Mid"
+    else:
+        return "High"
+
+
+def date_format_of(values):
+    """Date format pandas would infer for a column: the one of its first non-blank value."""
+    first = values.dropna()
+    return guess_datetime_format(first.iloc[0]) if len(first) else None
+
+
+def clean_frame(df, resolver, categorizer, date_format=None):
+    """Steps 3-7A on normalized, deduplicated rows; returns the cleaned frame."""
+    df = df.copy()
+
+    # --- Step 3: Resolve city and area from location ---
+    places = resolver.resolve(df["location"])
+
+    # --- Step 4: Add city and area columns ---
+    df["city"] = places["city"]
+    df["area"] = places["area"]
+
+    # --- Step 5: Remove rentals / shortlets ---
+    df = df[~df["property_type"].str.contains(EXCLUDE_PATTERN)]
+    df = df[~df["title"].str.contains(EXCLUDE_PATTERN)]
+    df = df[~df["price"].astype(str).str.contains("/day|/year", regex=True)]
+
+    # --- Step 6: Clean price column ---
+    # NGN price (same values as clean_price), plus whether it is a total or per-sqm
+    # price and the currency it was quoted in
+    prices = normalize_prices(df["price"])
+    df["price"] = prices["price"]
+    df["price_unit"] = prices["price_unit"]
+    df["currency"] = prices["currency"]
+
+    # --- Step 7: Derived columns for analytics ---
+    df["price_per_bedroom"] = df["price"] / df["bedrooms"].where(df["bedrooms"] > 0)
+    df["price_category"] = df["price"].apply(categorize_price)
+
+    if date_format is None:
+        df["added_date"] = pd.to_datetime(df["added_date"], errors="coerce")
+    else:
+        df["added_date"] = pd.to_datetime(df["added_date"], format=date_format, errors="coerce")
+    df["month_posted"] = df["added_date"].dt.to_period("M").astype(str)
+
+    # --- Step 7A: Categorize Property Type ---
+    # Ordered rules in cleaning/property_rules.json; the first match wins
+    df["property_category"] = categorizer.categorize(df["property_type"])
+    return df
+
+
+def collapse_near(cleaned):
+    """Step 8 (optional): keep the first listing of each near-duplicate cluster, with its cluster_id."""
+    collapsed = collapse_near_duplicates(cleaned)
+    print(f"🧬 Near duplicates: kept {len(collapsed)} of {len(cleaned)} listings, one per cluster")
+    return collapsed
+
+
+# --- Runs ---
+class CleanReport:
+    """Row counts and the category/city breakdown of a cleaning run."""
+
+    def __init__(self):
+        self.rows_in = 0
+        self.rows_unique = 0
+        self.rows_out = 0
+        self.categories = pd.Series(dtype="int64")
+        self.cities = pd.Series(dtype="int64")
+
+    def add(self, rows_in, rows_unique, cleaned):
+        self.rows_in += rows_in
+        self.rows_unique += rows_unique
+        self.rows_out += len(cleaned)
+        self.categories = self.categories.add(cleaned["property_category"].value_counts(), fill_value=0)
+        self.cities = self.cities.add(cleaned["city"].value_counts(), fill_value=0)
+
+    def top(self, counts, n=20):
+        return counts.astype("int64").sort_values(ascending=False, kind="stable").head(n)
+
+
+def clean_listings(input_path=INPUT_PATH, output_path=OUTPUT_PATH, chunksize=None, dedupe_path=DEDUPE_PATH,
+                   gazetteer_path=GAZETTEER_PATH, rules_path=RULES_PATH, dataset_path=CLEANED_PATH,
+                   near_duplicates=False):
+    """Clean the combined listings (CSV or Parquet) into the cleaned CSV and dataset; returns a CleanReport.
+
+    With chunksize set, reads that many rows at a time and keeps the dedupe
+    keys in the SQLite set at `dedupe_path` (emptied at the start of the run).
+    The Parquet dataset goes to `dataset_path` and the CSV export to
+    `output_path`; either can be None to skip it. near_duplicates=True adds
+    step 8 (cleaning/neardup.py), which needs every row at once.
+    """
+    if near_duplicates and chunksize is not None:
+        raise ValueError("near-duplicate detection needs the whole file; it cannot run chunked")
+    resolver = LocationResolver.from_file(gazetteer_path)
+    categorizer = RuleCategorizer.from_file(rules_path)
+    report = CleanReport()
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    writer = dataset_writer(dataset_path)
+
+    if chunksize is None:
+        df = normalize_frame(read_listings(input_path))
+        print(f"Original shape: {df.shape}")
+
+        # --- Step 2: Remove duplicates ---
+        df_no_dup = df.drop_duplicates(subset=DEDUPE_COLUMNS, keep="first")
+        print(f"After removing duplicates: {df_no_dup.shape}")
+
+        cleaned = clean_frame(df_no_dup, resolver, categorizer, date_format_of(df_no_dup["added_date"]))
+        if near_duplicates:
+            cleaned = collapse_near(cleaned)
+        if output_path:
+            cleaned.to_csv(output_path, index=False)
+        if writer:
+            writer.write(cleaned)
+            writer.commit()
+        report.add(len(df), len(df_no_dup), cleaned)
+        return report
+
+    index = DedupeIndex(dedupe_path)
+    index.reset()
+    date_format = None
+    try:
+        for number, chunk in enumerate(read_listings(input_path, chunksize)):
+            chunk = normalize_frame(chunk)
+            unique = chunk.drop_duplicates(subset=DEDUPE_COLUMNS, keep="first")
+            unique = unique[index.admit(dedupe_keys(unique))]
+            if date_format is None:
+                date_format = date_format_of(unique["added_date"])
+
+            cleaned = clean_frame(unique, resolver, categorizer, date_format)
+            if output_path:
+                cleaned.to_csv(output_path, index=False, mode="w" if number == 0 else "a", header=number == 0)
+            if writer:
+                writer.write(cleaned)
+            report.add(len(chunk), len(unique), cleaned)
+            print(f"🧹 Chunk {number + 1}: {len(chunk)} rows, {len(unique)} new, {len(cleaned)} kept "
+                  f"({report.rows_out} written)")
+        if writer:
+            writer.commit()
+    finally:
+        index.close()
+    print(f"Original rows: {report.rows_in}")
+    print(f"After removing duplicates: {report.rows_unique}")
+    return report
@@ -0,0 +1,150 @@
+"""Price parsing for the listings cleaner.
+
+clean_price is the original row-at-a-time parser and stays the reference.
+normalize_prices gives identical prices for a whole column in one pass of
+vectorized string operations (Arrow compute when pyarrow is installed),
+along with the unit (total or per_sqm) and the currency the price was
+quoted in. The few rows it cannot parse exactly the way clean_price does
+(non-ASCII digits or whitespace, malformed numbers) go through clean_price
+itself, so the two always agree.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - only needed for the Arrow-backed string dtype
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+EXCHANGE_RATE_USD_NGN = 1438
+
+STRING_DTYPE = "string[pyarrow]" if pyarrow is not None else object
+
+UNIT_TOTAL = "total"
+UNIT_PER_SQM = "per_sqm"
+
+# A number float() takes once commas and currency text are stripped
+NUMBER = r"[0-9]+\.?[0-9]*|\.[0-9]+"
+# Keeps the first run of digits and dots (what re.search(r"[\d\.]+") finds)
+FIRST_NUMBER = r"(?s)^[^0-9.]*([0-9.]+).*$"
+# An ASCII separator (\x1c-\x1f) among leading whitespace, which str.strip() drops
+LEADING_SEPARATOR = r"^\s*[\x1c-\x1f]"
+
+
+# --- Row at a time (reference) ---
+def clean_price(price):
+    if pd.isna(price):
+        return None
+
+    price_str = str(price).lower().replace(",", "").strip()
+
+    if "/sqm" in price_str:
+        num = re.search(r"[\d\.]+", price_str)
+        return float(num.group()) if num else None
+
+    if price_str.startswith("$"):
+        num = re.search(r"[\d\.]+", price_str)
+        return float(num.group()) * EXCHANGE_RATE_USD_NGN if num else None
+
+    price_str = re.sub(r"[^\d\.]", "", price_str)
+
+    try:
+        return float(price_str) if price_str else None
+    except:
+        return None
+
+
+def price_terms(price):
+    """(unit, currency) of one raw price, by the same rules clean_price applies."""
+    if pd.isna(price):
+        return None, None
+    price_str = str(price).lower().replace(",", "").strip()
+    unit = UNIT_PER_SQM if "/sqm" in price_str else UNIT_TOTAL
+    currency = "USD" if price_str.startswith("$") else "NGN"
+    return unit, currency
+
+
+# --- Whole column ---
+def normalize_prices(prices):
+    """Parse a column of raw prices; returns a frame of price, price_unit and currency.
+
+    `price` equals prices.apply(clean_price) exactly. Per-sqm prices keep
+    their quoted amount (clean_price never converts them), so a "$…/sqm"
+    price is per_sqm in USD. Listings repeat the same few price strings a
+    lot, so each distinct string is parsed once.
+    """
+    prices = pd.Series(prices)
+    if prices.dtype == object and pd.api.types.infer_dtype(prices, skipna=True) != "string":
+        # 1 and 1.0 (or True) would share a code but not a str()
+        prices = prices.astype(str).where(prices.notna())
+    codes, distinct = pd.factorize(prices)
+    if not len(distinct):
+        distinct = np.array([""], dtype=object)
+    values, per_sqm, usd = parse_distinct(pd.Series(distinct, dtype=object))
+
+    missing = codes < 0
+    price = values[codes]
+    price[missing] = np.nan
+    unit_codes = np.where(missing, -1, per_sqm[codes].astype(np.int8))
+    currency_codes = np.where(missing, -1, usd[codes].astype(np.int8))
+    return pd.DataFrame(
+        {
+            "price": price,
+            "price_unit": pd.Categorical.from_codes(unit_codes, categories=[UNIT_TOTAL, UNIT_PER_SQM]),
+            "currency": pd.Categorical.from_codes(currency_codes, categories=["NGN", "USD"]),
+        },
+        index=prices.index,
+    )
+
+
+def parse_distinct(raw):
+    """Vectorized clean_price over distinct non-null price strings.
+
+    Returns (values, per_sqm, usd) arrays. Most prices are a bare amount
+    once commas and the naira sign are gone, and those skip the regexes.
+    """
+    text = (
+        raw.astype(STRING_DTYPE)
+        .str.lower().str.replace(",", "", regex=False).str.strip()
+    )
+    per_sqm = text.str.contains("/sqm", regex=False).to_numpy(dtype=bool)
+    usd = text.str.startswith("$").to_numpy(dtype=bool)
+    first_number = per_sqm | usd
+
+    # Rows only clean_price can settle: Unicode digits or whitespace (Python's
+    # \d and strip() go beyond ASCII), and the ASCII separators strip() also eats
+    unnaired = text.str.replace("₦", "", regex=False)
+    fallback = ~unnaired.str.isascii().to_numpy(dtype=bool)
+    fallback |= text.str.contains(LEADING_SEPARATOR, regex=True).to_numpy(dtype=bool)
+
+    # Plain prices keep every digit and dot, "/sqm" and "$" prices their first number
+    candidate = unnaired.str.strip()
+    bare = candidate.str.fullmatch(NUMBER).to_numpy(dtype=bool)
+    rest = ~first_number & ~bare
+    if rest.any():
+        candidate[rest] = text[rest].str.replace(r"[^0-9.]", "", regex=True)
+    if first_number.any():
+        numbered = text[first_number]
+        candidate[first_number] = numbered.str.replace(FIRST_NUMBER, r"\1", regex=True).where(
+            numbered.str.contains(r"[0-9.]", regex=True), ""
+        )
+    valid = bare & ~first_number
+    valid[rest | first_number] = candidate[rest | first_number].str.fullmatch(NUMBER).to_numpy(dtype=bool)
+
+    # A first number float() rejects makes clean_price raise, so we do too
+    fallback |= first_number & ~valid & (candidate.str.len() > 0).to_numpy(dtype=bool)
+
+    values = np.full(len(raw), np.nan)
+    fast = valid & ~fallback
+    values[fast] = candidate[fast].astype("float64").to_numpy()
+    values[fast & usd & ~per_sqm] *= EXCHANGE_RATE_USD_NGN
+
+    if fallback.any():
+        odd = raw[fallback]
+        values[fallback] = [np.nan if value is None else value for value in map(clean_price, odd)]
+        terms = [price_terms(price) for price in odd]
+        per_sqm[fallback] = [unit == UNIT_PER_SQM for unit, _ in terms]
+        usd[fallback] = [currency == "USD" for _, currency in terms]
+    return values, per_sqm, usd
@@ -0,0 +1,74 @@
+"""Query layer for the loaded listings: normalized keys and row-position indexes.
+
+The API filters listings by city, property_type and property_category.
+Rather than lowercasing a whole column per request, ListingQuery
+normalizes each indexed column once, at load time (normalize_key:
+whitespace runs collapsed, lowercased, so "Lagos", " lagos" and "LAGOS"
+are one key). Then it keeps, per distinct key, the sorted int64 positions
+of its rows.
+
+positions() looks up one array per filter and intersects them, smallest
+first. select() returns those rows in their original order, the same
+frame a boolean mask would give. A value no row has matches nothing.
+"""
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ["city", "property_type", "property_category"]
+NO_ROWS = np.empty(0, dtype=np.int64)
+
+
+def normalize_key(value):
+    """Lookup form of a city, property type or category: whitespace collapsed, lowercased (None stays None)."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return " ".join(str(value).split()).lower()
+
+
+def normalized(values):
+    """normalize_key over a column, as object values (None where blank); categoricals map per category."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.array([normalize_key(value) or None for value in values.cat.categories] + [None], dtype=object)
+        return pd.Series(lookup[values.cat.codes.to_numpy()], index=values.index)
+    return values.astype(object).map(lambda value: normalize_key(value) or None)
+
+
+def position_index(keys):
+    """{key: sorted row positions} for a column of normalized keys (rows without a key are left out)."""
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {key: order[bounds[i]:bounds[i + 1]].astype(np.int64) for i, key in enumerate(uniques)}
+
+
+class ListingQuery:
+    """Row-position indexes over the loaded listings, one per column in `columns` that `df` has."""
+
+    def __init__(self, df, columns=INDEX_COLUMNS):
+        self.df = df
+        self.keys = {column: normalized(df[column]) for column in columns if column in df}
+        self.indexes = {column: position_index(keys) for column, keys in self.keys.items()}
+
+    def positions(self, **filters):
+        """Sorted positions of the rows matching every filter; a None filter is skipped."""
+        matches = []
+        for column, value in filters.items():
+            if column not in self.indexes:
+                raise ValueError(f"no index on {column!r}; indexed: {', '.join(self.indexes)}")
+            if value is not None:
+                matches.append(self.indexes[column].get(normalize_key(value), NO_ROWS))
+        if not matches:
+            return np.arange(len(self.df))
+        matches.sort(key=len)
+        rows = matches[0]
+        for other in matches[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def select(self, columns=None, **filters):
+        """The matching rows of the listings (only `columns`, when given), in their original order."""
+        df = self.df if columns is None else self.df[columns]
+        return df.iloc[self.positions(**filters)]
+
+    def count(self, **filters):
+        return len(self.positions(**filters))
@@ -0,0 +1,153 @@
+"""Immutable dataset snapshots for the API, hot-reloaded in the background.
+
+A Snapshot is everything a request reads: the compact listings frame, its
+memory report, the ListingQuery indexes and the PriceCube. It is built
+whole and never changed afterwards. A request takes the current snapshot
+once and keeps using it, so a reload never shows a request half of two
+datasets.
+
+SnapshotReloader watches the cleaned dataset (the Parquet directory and the
+CSV export). Every `interval` seconds it compares a stat fingerprint of
+their files (names, sizes, mtimes). When the fingerprint has changed and
+then held still for one more check, so a cleaning run that is still
+swapping files in is not picked up half way, it builds a new snapshot on
+the watcher thread and swaps it in with one reference assignment. A
+failed build is recorded and the old snapshot keeps serving. The snapshot
+version is a content digest of the files it was loaded from.
+"""
+import os
+import threading
+import time
+
+from cleaning.aggregates import PriceCube
+from cleaning.loader import load_listings
+from cleaning.query import ListingQuery
+from cleaning.stages import path_digest
+from cleaning.storage import CLEANED_CSV_PATH, CLEANED_PATH, available
+
+RELOAD_INTERVAL = 30    # seconds between checks of the dataset files
+
+
+def source_path(path=CLEANED_PATH, csv_path=CLEANED_CSV_PATH):
+    """The files load_cleaned reads: the Parquet dataset when it can, else the CSV."""
+    return path if available() and os.path.isdir(path) else csv_path
+
+
+def fingerprint(paths):
+    """(name, size, mtime) of every file under `paths`; cheap enough to take on every check."""
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(os.path.join(root, name) for name in sorted(names))
+    entries = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:   # swapped out since the walk; the next check sees the new files
+            continue
+        entries.append((path, stat.st_size, stat.st_mtime_ns))
+    return tuple(entries)
+
+
+class Snapshot:
+    """One loaded dataset with its indexes and aggregates; never modified once built."""
+
+    def __init__(self, columns, path=CLEANED_PATH, csv_path=CLEANED_CSV_PATH):
+        start = time.perf_counter()
+        source = source_path(path, csv_path)
+        self.version = path_digest(source)[:12]
+        self.source = source
+        self.df, self.memory_report = load_listings(columns, path=path, csv_path=csv_path)
+        self.listings = ListingQuery(self.df)
+        self.cube = PriceCube(self.df, self.listings.keys)
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.load_seconds = round(time.perf_counter() - start, 3)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "source": self.source,
+            "rows": len(self.df),
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
+
+
+class SnapshotReloader:
+    """Holds the current Snapshot and replaces it when the dataset files change."""
+
+    def __init__(self, columns, interval=RELOAD_INTERVAL, path=CLEANED_PATH, csv_path=CLEANED_CSV_PATH):
+        self.columns = columns
+        self.interval = interval
+        self.paths = [path, csv_path]
+        self.path, self.csv_path = path, csv_path
+        self.lock = threading.Lock()     # one build at a time
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.pending = None
+        self.reloads = 0
+        self.last_check = None
+        self.last_error = None
+        self.seen = fingerprint(self.paths)
+        self.current = Snapshot(columns, path, csv_path)
+
+    def reload(self, force=False):
+        """Build a new snapshot and swap it in; unless forced, only when the files changed and settled.
+
+        Returns True when a new snapshot was swapped in.
+        """
+        with self.lock:
+            self.last_check = time.strftime("%Y-%m-%dT%H:%M:%S")
+            seen = fingerprint(self.paths)
+            if not force:
+                if seen == self.seen:
+                    self.pending = None
+                    return False
+                if seen != self.pending:
+                    # Changed since the last check: wait for it to hold still for one more
+                    self.pending = seen
+                    return False
+            try:
+                snapshot = Snapshot(self.columns, self.path, self.csv_path)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Dataset reload failed, still serving {self.current.version}: {self.last_error}")
+                return False
+            self.seen, self.pending, self.last_error = seen, None, None
+            old, self.current = self.current, snapshot
+            self.reloads += 1
+            print(f"🔄 Dataset reloaded: {old.version} -> {snapshot.version} "
+                  f"({len(snapshot.df)} rows, {snapshot.load_seconds}s)")
+            return True
+
+    def watch(self):
+        while not self.stop_event.wait(self.interval):
+            self.reload()
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.watch, name="dataset-reloader", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def status(self):
+        return {
+            "current": self.current.info(),
+            "reloads": self.reloads,
+            "interval_seconds": self.interval,
+            "watching": self.thread is not None and self.thread.is_alive(),
+            "reload_in_progress": self.lock.locked(),
+            "change_pending": self.pending is not None,
+            "last_check": self.last_check,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,191 @@
+"""Content-hashed stage caching for the scrape -> clean -> serve pipeline.
+
+A Stage is one node: a function that writes its outputs into a directory
+it is given. Its cache key hashes together
+
+- the content of every input file or directory,
+- its code version (the content of the source files it runs), and
+- its parameters (exchange rate, exclude keywords, flags, ...).
+
+StageRunner keeps each result under artifacts/<stage>/<key>/ with a
+manifest.json of what went into it. A stage whose key already has a
+complete artifact directory is skipped and its outputs reused, so a
+refresh redoes only the stages whose inputs, code or parameters changed.
+Each key is its own version directory. artifacts/<stage>/LATEST names
+the most recent one, and prune() drops the oldest versions.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+ARTIFACTS_DIR = "artifacts"
+READ_BLOCK = 1 << 20
+
+
+# --- Content hashes ---
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while block := f.read(READ_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def path_digest(path):
+    """Digest of a file, or of every file under a directory (names included)."""
+    if not os.path.isdir(path):
+        return file_digest(path)
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            digest.update(os.path.relpath(full, path).replace(os.sep, "/").encode("utf-8"))
+            digest.update(file_digest(full).encode("ascii"))
+    return digest.hexdigest()
+
+
+def code_digest(paths):
+    """Code version: the digest of the source files a stage runs (by file name, so any checkout agrees)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(paths, key=os.path.basename):
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(file_digest(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+# --- Stages ---
+class Stage:
+    """One pipeline node.
+
+    run(inputs, out_dir, **params) gets {name: path} inputs and writes the
+    files or directories named in `outputs` into out_dir.
+    """
+
+    def __init__(self, name, run, outputs, code, params=None):
+        self.name = name
+        self.run = run
+        self.outputs = outputs
+        self.code = code
+        self.params = params or {}
+
+    def key(self, inputs):
+        """Cache key; returns (key, {input name: digest})."""
+        digests = {name: path_digest(path) for name, path in sorted(inputs.items())}
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps({
+            "stage": self.name,
+            "inputs": digests,
+            "code": code_digest(self.code),
+            "params": self.params,
+        }, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest(), digests
+
+
+class StageRunner:
+    """Runs stages into a versioned artifact directory, skipping those already built."""
+
+    def __init__(self, root=ARTIFACTS_DIR):
+        self.root = root
+
+    def stage_dir(self, stage):
+        return os.path.join(self.root, stage.name)
+
+    def run(self, stage, inputs, force=False):
+        """Build `stage` unless its key is already built; returns {output name: path}."""
+        key, digests = stage.key(inputs)
+        out_dir = os.path.join(self.stage_dir(stage), key)
+        outputs = {name: os.path.join(out_dir, name) for name in stage.outputs}
+
+        if not force and self.built(out_dir, outputs):
+            print(f"⏭️ {stage.name}: unchanged ({key[:12]}), reusing {out_dir}")
+            self.mark_latest(stage, key)
+            return outputs
+
+        # Build into a staging directory, so an interrupted run leaves no half-built version
+        staging = out_dir + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        print(f"🔧 {stage.name}: building {key[:12]}")
+        start = time.perf_counter()
+        stage.run(inputs, staging, **stage.params)
+        seconds = time.perf_counter() - start
+
+        manifest = {
+            "stage": stage.name,
+            "key": key,
+            "inputs": {name: {"path": path, "digest": digests[name]} for name, path in inputs.items()},
+            "code": code_digest(stage.code),
+            "params": stage.params,
+            "outputs": {name: path_digest(os.path.join(staging, name)) for name in stage.outputs},
+            "seconds": round(seconds, 3),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.replace(staging, out_dir)
+        self.mark_latest(stage, key)
+        print(f"✅ {stage.name}: built in {seconds:.1f}s -> {out_dir}")
+        return outputs
+
+    def built(self, out_dir, outputs):
+        return os.path.exists(os.path.join(out_dir, "manifest.json")) and all(
+            os.path.exists(path) for path in outputs.values()
+        )
+
+    def mark_latest(self, stage, key):
+        with open(os.path.join(self.stage_dir(stage), "LATEST"), "w", encoding="utf-8") as f:
+            f.write(key + "\n")
+
+    def latest(self, stage_name):
+        path = os.path.join(self.root, stage_name, "LATEST")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+
+    def prune(self, stage_name, keep=5):
+        """Delete all but the `keep` most recently built versions of a stage (never LATEST)."""
+        stage_dir = os.path.join(self.root, stage_name)
+        if not os.path.isdir(stage_dir):
+            return []
+        latest = self.latest(stage_name)
+        versions = [
+            name for name in os.listdir(stage_dir)
+            if os.path.exists(os.path.join(stage_dir, name, "manifest.json"))
+        ]
+        versions.sort(key=lambda name: os.path.getmtime(os.path.join(stage_dir, name, "manifest.json")),
+                      reverse=True)
+        removed = [name for name in versions[keep:] if name != latest]
+        for name in removed:
+            shutil.rmtree(os.path.join(stage_dir, name))
+        return removed
+
+
+# --- Publishing ---
+def publish(source, target):
+    """Copy an artifact to where the readers expect it, unless it is already there.
+
+    Returns True when something was copied. Directories are copied beside
+    the target and swapped in, so readers never see half a dataset.
+    """
+    if os.path.exists(target) and path_digest(source) == path_digest(target):
+        return False
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    staging = target + ".tmp"
+    if os.path.isdir(source):
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(source, staging)
+        old = target + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(target):
+            os.replace(target, old)
+        os.replace(staging, target)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        shutil.copyfile(source, staging)
+        os.replace(staging, target)
+    return True
@@ -0,0 +1,217 @@
+"""Columnar (Parquet) storage for the raw and cleaned listings.
+
+- Raw listings: dataset/combined_listings.parquet, one file written next
+  to combined_listings.csv by the scrapers. Columns are typed the way the
+  cleaner reads the CSV (RAW_DTYPES), so reading it skips the text parsing
+  and gives the same frame.
+- Cleaned listings: dataset/cleaned_properties/, a Parquet dataset
+  partitioned by month_posted and city (month_posted=2025-10/city=Lagos/).
+  Repeated text columns are dictionary-encoded and come back as
+  categoricals, dates are stored as timestamps and numbers as float64.
+
+read_cleaned reads only the `columns` asked for and takes pyarrow
+`filters` such as [("city", "==", "Lagos")], which skip whole partitions
+and row groups whose statistics rule them out. The CSV files stay as the
+export format. Parquet needs pyarrow.
+"""
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = ds = pq = None
+
+RAW_PATH = os.path.join("dataset", "combined_listings.parquet")
+CLEANED_PATH = os.path.join("dataset", "cleaned_properties")
+CLEANED_CSV_PATH = os.path.join("dataset", "new_cleaned_properties.csv")
+
+# Fixed, so every chunk reads alike (a chunk without blanks would otherwise read bedrooms as int)
+RAW_DTYPES = {
+    "title": str, "property_type": str, "location": str, "price": str,
+    "bedrooms": "float64", "bathrooms": "float64", "toilets": "float64",
+    "added_date": str, "updated_date": str,
+}
+COUNT_COLUMNS = ["bedrooms", "bathrooms", "toilets"]
+DICTIONARY_COLUMNS = [
+    "location", "property_type", "city", "area", "price_unit", "currency", "price_category", "property_category",
+]
+TIMESTAMP_COLUMNS = ["added_date", "updated_date"]
+FLOAT_COLUMNS = ["price", "bedrooms", "bathrooms", "toilets", "price_per_bedroom"]
+INTEGER_COLUMNS = ["cluster_id"]
+PARTITION_COLUMNS = ["month_posted", "city"]
+
+
+def available():
+    return pq is not None
+
+
+def require_pyarrow():
+    if pq is None:
+        raise ImportError("Parquet storage needs pyarrow (pip install pyarrow)")
+
+
+# --- Raw listings ---
+def write_raw(df, path=RAW_PATH):
+    """Write raw listings (as read with RAW_DTYPES) to one Parquet file, replacing it whole."""
+    require_pyarrow()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    table = pa.Table.from_pandas(df.astype(RAW_DTYPES), preserve_index=False)
+    staging = path + ".tmp"
+    pq.write_table(table, staging, use_dictionary=["property_type", "location"])
+    os.replace(staging, path)
+    return path
+
+
+def read_raw_csv(csv_path):
+    """A raw listings CSV with RAW_DTYPES; counts that are not numbers ("6 Beds") become NaN.
+
+    Scrapers write whatever a page shows, so the count columns are read as
+    text and coerced, rather than failing the whole file on one odd value.
+    """
+    dtypes = {column: (str if column in COUNT_COLUMNS else dtype) for column, dtype in RAW_DTYPES.items()}
+    df = pd.read_csv(csv_path, dtype=dtypes)
+    for column in COUNT_COLUMNS:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(RAW_DTYPES[column])
+    return df
+
+
+def write_raw_copy(csv_path, path=RAW_PATH):
+    """Parquet copy of a raw listings CSV; returns its path, or None without pyarrow."""
+    if not available():
+        print("⚠️ pyarrow is not installed, skipping the Parquet copy")
+        return None
+    return write_raw(read_raw_csv(csv_path), path)
+
+
+def raw_columns(path=RAW_PATH):
+    require_pyarrow()
+    return pq.read_schema(path).names
+
+
+def read_raw(path=RAW_PATH, columns=None, chunksize=None):
+    """Raw listings as read_csv(dtype=RAW_DTYPES) gives them; with chunksize, an iterator of frames."""
+    require_pyarrow()
+    if chunksize is None:
+        return pq.read_table(path, columns=columns).to_pandas()
+    return iter_raw(path, columns, chunksize)
+
+
+def iter_raw(path, columns, chunksize):
+    start = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+        chunk = batch.to_pandas()
+        # Row labels run on across chunks, as read_csv's do
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+
+# --- Cleaned listings ---
+def column_type(column):
+    if column in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if column in TIMESTAMP_COLUMNS:
+        return pa.timestamp("us")
+    if column in FLOAT_COLUMNS:
+        return pa.float64()
+    if column in INTEGER_COLUMNS:
+        return pa.int64()
+    return pa.string()
+
+
+def cleaned_table(df):
+    """Arrow table of cleaned rows: dictionary-encoded text, timestamps for both dates.
+
+    The schema is fixed per column, so files written from different chunks
+    (an all-blank column, a few categories or many) read back as one table.
+    """
+    df = df.copy()
+    for column in TIMESTAMP_COLUMNS:
+        if column in df:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    df["month_posted"] = df["month_posted"].astype(str)
+    schema = pa.schema([(column, column_type(column)) for column in df.columns])
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def write_partitions(df, root, name):
+    """Add cleaned rows to the dataset at `root`, one `name`-* file per partition touched."""
+    require_pyarrow()
+    if not len(df):
+        return
+    pq.write_to_dataset(
+        cleaned_table(df), root, partition_cols=PARTITION_COLUMNS,
+        basename_template=f"{name}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def append_cleaned(df, path=CLEANED_PATH):
+    """Add cleaned rows to an existing dataset."""
+    write_partitions(df, path, f"part-{uuid.uuid4().hex}")
+
+
+class CleanedWriter:
+    """Build a fresh cleaned dataset chunk by chunk; commit() swaps it in for the old one.
+
+    Readers see the old dataset until the swap, never a half-written one.
+    """
+
+    def __init__(self, path=CLEANED_PATH):
+        require_pyarrow()
+        self.path = path
+        self.staging = path + ".tmp"
+        shutil.rmtree(self.staging, ignore_errors=True)
+        os.makedirs(self.staging)
+        self.parts = 0
+
+    def write(self, df):
+        write_partitions(df, self.staging, f"part-{self.parts:05d}")
+        self.parts += 1
+
+    def commit(self):
+        old = self.path + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.replace(self.path, old)
+        os.replace(self.staging, self.path)
+        shutil.rmtree(old, ignore_errors=True)
+        return self.path
+
+
+def write_cleaned(df, path=CLEANED_PATH):
+    """Replace the cleaned dataset with `df`."""
+    writer = CleanedWriter(path)
+    writer.write(df)
+    return writer.commit()
+
+
+def read_cleaned(path=CLEANED_PATH, columns=None, filters=None):
+    """Read the cleaned dataset; only `columns` are read and `filters` are pushed down."""
+    require_pyarrow()
+    # Partition values stay strings (a city named "1" is not a number) and come back as categoricals
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+    return pd.read_parquet(path, engine="pyarrow", columns=columns, filters=filters, partitioning=partitioning)
+
+
+def load_cleaned(columns=None, filters=None, path=CLEANED_PATH, csv_path=CLEANED_CSV_PATH):
+    """Cleaned listings from the Parquet dataset, or from the CSV export when there is none.
+
+    The CSV fallback parses the date columns the way the app always has;
+    `filters` need the Parquet dataset.
+    """
+    if available() and os.path.isdir(path):
+        return read_cleaned(path, columns, filters)
+    if filters:
+        raise ValueError("filters need the Parquet dataset at " + path)
+    df = pd.read_csv(csv_path, usecols=columns)
+    for column in TIMESTAMP_COLUMNS:
+        if column in df:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    return df
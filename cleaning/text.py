@@ -0,0 +1,29 @@
+"""Transform a column once per distinct value.
+
+Listing columns repeat the same few values many times over (a few hundred
+property types across thousands of rows), so transforms run on the
+distinct values from pd.factorize and are mapped back by code.
+"""
+import pandas as pd
+
+
+def map_distinct(values, transform):
+    """Apply `transform` to the distinct values of `values` and map the result back.
+
+    `transform` takes a Series of distinct values (missing values included,
+    as one entry) and returns a Series or DataFrame of the same length.
+    The result is aligned with `values`.
+    """
+    values = pd.Series(values)
+    codes, distinct = pd.factorize(values, use_na_sentinel=False)
+    transformed = transform(pd.Series(distinct, dtype=values.dtype))
+    result = transformed.take(codes)
+    result.index = values.index
+    if isinstance(result, pd.Series):
+        result.name = values.name
+    return result
+
+
+def normalize_text(values):
+    """Lowercase and strip, as `.astype(str).str.lower().str.strip()` does."""
+    return map_distinct(values, lambda distinct: distinct.astype(str).str.lower().str.strip())
@@ -1,6 +1,10 @@
 import pandas as pd
 import streamlit as st
 
+from cleaning.loader import load_listings
+
+DASHBOARD_COLUMNS = ["city", "location", "price", "bedrooms", "added_date", "property_category"]
+
 # helper functions
 def calculate_growth(df):
     df = df.sort_values("month_posted")
@@ -31,9 +35,13 @@ st.caption(
 # ======================================================
 # LOAD DATA
 # ======================================================
-@st.cache_data
+# cache_resource: one shared frame per process, where cache_data would hand
+# every rerun its own copy. Frames that get new columns below are copied
+# first, so the shared frame stays unchanged whether or not copy-on-write
+# is on (pandas < 3).
+@st.cache_resource
 def load_data():
-    df = pd.read_csv("dataset/new_cleaned_properties.csv")
+    df, _ = load_listings(DASHBOARD_COLUMNS)
     return df
 
 df = load_data()
@@ -100,7 +108,7 @@ filtered_df = buildings_df.copy()
 
 growth_df = (
     filtered_df
-    .groupby(["city", "month_posted"])["price"]
+    .groupby(["city", "month_posted"], observed=True)["price"]
     .median()
     .reset_index()
 )
@@ -137,7 +145,7 @@ with tab1:
 
     city_price = (
         filtered_df
-        .groupby("city")["price"]
+        .groupby("city", observed=True)["price"]
         .median()
         .sort_values(ascending=False)
         .reset_index()
@@ -150,7 +158,7 @@ with tab1:
 
     top_areas = (
         filtered_df
-        .groupby("location")["price"]
+        .groupby("location", observed=True)["price"]
         .median()
         .sort_values(ascending=False)
         .head(10)
@@ -217,7 +225,7 @@ with tab3:
     st.subheader("Land Price Intelligence (₦ per sqm)")
     st.caption("Land is analyzed separately using price per square meter.")
 
-    land_df = df[df["property_category"] == "land"].copy()
+    land_df = df[df["property_category"] == "land"]
 
     if land_df.empty:
         st.warning("No land data available.")
@@ -227,7 +235,7 @@ with tab3:
 
         land_city = (
             land_df
-            .groupby("city")["price"]
+            .groupby("city", observed=True)["price"]
             .median()
             .sort_values(ascending=False)
             .reset_index()
@@ -238,7 +246,7 @@ with tab3:
         st.subheader("Top 10 Most Expensive Land Locations (₦/sqm)")
         top_land = (
             land_df
-            .groupby("location")["price"]
+            .groupby("location", observed=True)["price"]
             .median()
             .sort_values(ascending=False)
             .head(10)
@@ -263,7 +271,7 @@ with tab4:
 
     ppb_city = (
         filtered_df
-        .groupby("city")["price_per_bedroom"]
+        .groupby("city", observed=True)["price_per_bedroom"]
         .median()
         .sort_values(ascending=False)
         .reset_index()
@@ -275,7 +283,7 @@ with tab4:
 
     top_ppb = (
         filtered_df
-        .groupby("location")["price_per_bedroom"]
+        .groupby("location", observed=True)["price_per_bedroom"]
         .median()
         .sort_values(ascending=False)
         .head(10)
@@ -293,7 +301,7 @@ with tab5:
 
     comparison_table = (
         filtered_df
-        .groupby("city")
+        .groupby("city", observed=True)
         .agg(
             median_price=("price", "median"),
             median_price_per_bedroom=("price_per_bedroom", "median"),
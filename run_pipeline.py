@@ -0,0 +1,99 @@
+"""Refresh the scrape -> clean -> serve pipeline, redoing only the stages that changed.
+
+1. scrape (with --scrape): runs the scrapers into dataset/combined_listings.csv.
+   Its input is the live sites, which cannot be hashed before fetching, so it
+   always runs when asked; without --scrape the CSV already on disk is used.
+2. clean: a cached stage (cleaning/stages.py). Its key hashes the raw listings
+   file it reads (the CSV, or its Parquet copy when that is current), the
+   gazetteer and rules files, the cleaning modules and its parameters
+   (EXCHANGE_RATE_USD_NGN, the exclude keywords, the dedupe columns,
+   --near-duplicates and the pandas/pyarrow versions). An unchanged key reuses
+   artifacts/clean/<key>/ instead of cleaning again.
+3. publish: copies that version's CSV and Parquet dataset to
+   dataset/new_cleaned_properties.csv and dataset/cleaned_properties/, where
+   app.py and dashboard.py read them, unless they are already identical.
+
+Run from the repo root:  python run_pipeline.py [--scrape] [--near-duplicates] [--force] [--keep 5]
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from cleaning import storage
+from cleaning.categories import RULES_PATH
+from cleaning.locations import GAZETTEER_PATH
+from cleaning.pipeline import DEDUPE_COLUMNS, EXCLUDE_PATTERN, INPUT_PATH, clean_listings, default_input
+from cleaning.prices import EXCHANGE_RATE_USD_NGN
+from cleaning.stages import ARTIFACTS_DIR, Stage, StageRunner, publish
+
+CLEANED_CSV = "new_cleaned_properties.csv"
+CLEANED_DATASET = "cleaned_properties"
+# The modules clean_listings runs (cleaning/pipeline.py and what it imports); the API-only
+# modules (loader, query, aggregates, snapshot) stay out, so editing them never re-cleans
+CLEAN_MODULES = ["pipeline", "categories", "locations", "neardup", "prices", "storage", "text"]
+CLEAN_CODE = [os.path.join(os.path.dirname(storage.__file__), name + ".py") for name in CLEAN_MODULES]
+
+
+def run_clean(inputs, out_dir, near_duplicates=False, **params):
+    """Clean stage: the raw listings (CSV or its Parquet copy) into out_dir."""
+    clean_listings(
+        inputs["raw"],
+        os.path.join(out_dir, CLEANED_CSV),
+        gazetteer_path=inputs["gazetteer"],
+        rules_path=inputs["rules"],
+        dataset_path=os.path.join(out_dir, CLEANED_DATASET),
+        near_duplicates=near_duplicates,
+    )
+
+
+def clean_stage(near_duplicates=False):
+    outputs = [CLEANED_CSV] + ([CLEANED_DATASET] if storage.available() else [])
+    return Stage("clean", run_clean, outputs, CLEAN_CODE, params={
+        "exchange_rate_usd_ngn": EXCHANGE_RATE_USD_NGN,
+        "exclude_pattern": EXCLUDE_PATTERN,
+        "dedupe_columns": DEDUPE_COLUMNS,
+        "near_duplicates": near_duplicates,
+        "pandas": pd.__version__,
+        "pyarrow": storage.pa.__version__ if storage.available() else None,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scrape", action="store_true", help="run the scrapers first (incrementally)")
+    parser.add_argument("--input", default=INPUT_PATH, help="combined listings CSV to clean")
+    parser.add_argument("--artifacts", default=ARTIFACTS_DIR, help="versioned artifact directory")
+    parser.add_argument("--near-duplicates", action="store_true",
+                        help="also fold near-duplicate listings (MinHash/LSH) into one per cluster_id")
+    parser.add_argument("--gazetteer", default=GAZETTEER_PATH, help="cities/areas gazetteer JSON")
+    parser.add_argument("--rules", default=RULES_PATH, help="property category rules JSON")
+    parser.add_argument("--force", action="store_true", help="rebuild the clean stage even if it is cached")
+    parser.add_argument("--keep", type=int, default=5, help="artifact versions to keep per stage")
+    args = parser.parse_args()
+
+    if args.scrape:
+        from baseSrapper import scrape_all_sources
+
+        scrape_all_sources(propertypro_pages=100, npc_pages=50, private_pages=50, concurrent=True,
+                           async_details=True, incremental=True)
+
+    # Key the stage on the file the cleaner will actually read: the Parquet copy when it is current
+    raw_path = default_input(args.input, os.path.splitext(args.input)[0] + ".parquet")
+    runner = StageRunner(args.artifacts)
+    cleaned = runner.run(
+        clean_stage(args.near_duplicates),
+        {"raw": raw_path, "gazetteer": args.gazetteer, "rules": args.rules},
+        force=args.force,
+    )
+
+    targets = {CLEANED_CSV: storage.CLEANED_CSV_PATH, CLEANED_DATASET: storage.CLEANED_PATH}
+    for name, source in cleaned.items():
+        if publish(source, targets[name]):
+            print(f"📦 publish: {targets[name]} updated")
+        else:
+            print(f"⏭️ publish: {targets[name]} already up to date")
+
+    removed = runner.prune("clean", args.keep)
+    if removed:
+        print(f"🧹 Pruned {len(removed)} old clean version(s)")
@@ -0,0 +1,161 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# --- AIMD policy (per host) ---
+DEFAULT_INITIAL = 2         # requests in flight to start with
+DEFAULT_MIN = 1
+DEFAULT_MAX = 16
+DEFAULT_INCREASE = 1.0      # slots added per window of fast, successful responses
+DEFAULT_DECREASE = 0.5      # multiplier applied when the site pushes back
+LATENCY_FACTOR = 2.0        # "slow" = this many times the best smoothed latency
+WARMUP_RESPONSES = 5        # responses before latency counts as a signal
+MAX_RETRY_AFTER = 300       # seconds; ignore longer Retry-After values
+PUSHBACK_STATUSES = {429, 503}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease concurrency limit for one host.
+
+    Fast 2xx responses grow the limit by `increase` per window of `limit`
+    responses; 429/503, timeouts, connection errors and latency rising above
+    LATENCY_FACTOR x the best seen cut it by `decrease` (at most once per
+    window, so a burst of failures counts once). Retry-After pauses every
+    request to the host until it has passed.
+    """
+
+    def __init__(self, host, initial=DEFAULT_INITIAL, minimum=DEFAULT_MIN, maximum=DEFAULT_MAX,
+                 increase=DEFAULT_INCREASE, decrease=DEFAULT_DECREASE, latency_factor=LATENCY_FACTOR):
+        self.host = host
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.latency = None         # smoothed latency (EWMA)
+        self.best_latency = None
+        self.responses = 0
+        self.increases = 0
+        self.decreases = 0
+        self.cond = threading.Condition()
+
+    # --- Gate ---
+    def acquire(self):
+        """Block until a slot is free and no Retry-After pause is running."""
+        with self.cond:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    break
+                self.cond.wait(timeout=pause if pause > 0 else None)
+            self.in_flight += 1
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    # --- Signals ---
+    def observe(self, status, seconds, retry_after=None):
+        """Feed one response (status None for a timeout or connection error)."""
+        with self.cond:
+            self.responses += 1
+            now = time.monotonic()
+            pause = parse_retry_after(retry_after)
+            if pause:
+                self.paused_until = max(self.paused_until, now + pause)
+
+            if status is None or status in PUSHBACK_STATUSES:
+                self._cut(now, "error" if status is None else str(status), pause)
+                return
+
+            self.latency = seconds if self.latency is None else 0.7 * self.latency + 0.3 * seconds
+            self.best_latency = self.latency if self.best_latency is None else min(self.best_latency, self.latency)
+            if self.responses > WARMUP_RESPONSES and self.latency > self.best_latency * self.latency_factor:
+                if self._cut(now, "slow", pause):
+                    # Only a further rise counts next time, not the new normal
+                    self.best_latency = self.latency / self.latency_factor
+            elif status < 400:
+                old = int(self.limit)
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+                if int(self.limit) > old:
+                    self.increases += 1
+                    self._log(old, "fast")
+                    self.cond.notify_all()
+
+    def _cut(self, now, reason, pause):
+        window = max(self.latency or 0.0, 0.5)
+        if now - self.last_decrease < window:
+            return False
+        self.last_decrease = now
+        old = int(self.limit)
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.decreases += 1
+        self._log(old, reason, pause)
+        return True
+
+    def _log(self, old, reason, pause=None):
+        latency = f"{self.latency * 1000:.0f} ms" if self.latency is not None else "n/a"
+        paused = f", paused {pause:.0f}s (Retry-After)" if pause else ""
+        print(f"📶 {self.host}: concurrency {old} → {int(self.limit)} ({reason}), "
+              f"{self.in_flight} in flight, latency {latency}{paused}")
+
+    def state(self):
+        with self.cond:
+            return {
+                "host": self.host,
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+                "best_latency_ms": round(self.best_latency * 1000, 1) if self.best_latency is not None else None,
+                "responses": self.responses,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "paused_for": round(max(self.paused_until - time.monotonic(), 0.0), 1),
+            }
+
+
+class AdaptiveLimits:
+    """One AIMDController per host, created on first use with shared options."""
+
+    def __init__(self, **options):
+        self.options = options
+        self.controllers = {}
+        self.lock = threading.Lock()
+
+    @property
+    def maximum(self):
+        return self.options.get("maximum", DEFAULT_MAX)
+
+    def controller_for(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.controllers:
+                self.controllers[host] = AIMDController(host, **self.options)
+            return self.controllers[host]
+
+    def states(self):
+        with self.lock:
+            controllers = list(self.controllers.values())
+        return [controller.state() for controller in controllers]
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from scrapers import http_client
+from scrapers.metrics import metrics
+
+# --- Defaults (per host) ---
+DEFAULT_CONCURRENCY = 4     # detail pages in flight per host
+DEFAULT_RATE = 1.0          # requests per second per host
+DEFAULT_BURST = 2           # requests allowed back-to-back
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available, then take it."""
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class HostLimiter:
+    """Concurrency cap plus rate limit for one host."""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+
+
+class AsyncFetcher:
+    """Bounded-concurrency fetch engine.
+
+    Blocking fetch and parse callables run on a worker thread pool, so the
+    event loop only schedules requests and enforces the per-host limits.
+    Under adaptive pacing (http_client.enable_adaptive) the fixed limits
+    are bypassed: the pool is sized for the controllers' maximum and each
+    fetch waits for a slot from its host's AIMD controller instead.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.limiters = {}
+        self.adaptive = http_client.adaptive_limits()
+        workers = concurrency * 2
+        if self.adaptive is not None:
+            workers = max(workers, self.adaptive.maximum * 2)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def limiter_for(self, url):
+        host = urlparse(url).netloc
+        if host not in self.limiters:
+            self.limiters[host] = HostLimiter(self.concurrency, self.rate, self.burst)
+        return self.limiters[host]
+
+    async def run_blocking(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def fetch(self, url, fetch_fn):
+        """Fetch one URL through its host limiter."""
+        if self.adaptive is not None:
+            return await self.run_blocking(fetch_fn, url)
+        limiter = self.limiter_for(url)
+        queued = time.perf_counter()
+        async with limiter.semaphore:
+            await limiter.bucket.acquire()
+            metrics.record_throttle(url, time.perf_counter() - queued)
+            return await self.run_blocking(fetch_fn, url)
+
+    async def fetch_and_parse(self, url, fetch_fn, parse_fn, on_error=None, request_url=None):
+        """Fetch `request_url` (defaults to `url`) and parse it off the event loop."""
+        try:
+            html = await self.fetch(request_url or url, fetch_fn)
+        except Exception as e:
+            if on_error is None:
+                raise
+            return on_error(url, e)
+        return await self.run_blocking(parse_fn, url, html)
+
+    async def map_details(self, urls, fetch_fn, parse_fn, on_error=None, url_for=None):
+        """Fetch and parse many detail pages; results keep the order of `urls`."""
+        tasks = [
+            self.fetch_and_parse(
+                url, fetch_fn, parse_fn, on_error,
+                request_url=url_for(url) if url_for else None,
+            )
+            for url in urls
+        ]
+        return await asyncio.gather(*tasks)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def iterate_async(agen):
+    """Drive an async generator from synchronous code, one item at a time."""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
@@ -0,0 +1,252 @@
+"""lxml-based extraction for the three sources.
+
+Each function here returns exactly what the BeautifulSoup extractors in the
+scraper modules return, but walks an lxml tree with precompiled XPath, so a
+page costs a fraction of an html.parser soup. When lxml is not installed
+AVAILABLE is False and the scrapers keep using BeautifulSoup.
+"""
+import re
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - optional dependency
+    lxml = None
+    etree = None
+
+AVAILABLE = lxml is not None
+ENABLED = AVAILABLE          # switch off to force the BeautifulSoup path
+
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+def has_class(name):
+    """XPath predicate matching a whitespace-separated class token, like bs4's class_."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def class_token(*names):
+    """SoupStrainer class_ predicate matching any of `names` as a class token.
+
+    At parse time bs4 hands strainers the raw class string, so a plain
+    class_="x" misses elements like <div class="a x">.
+    """
+    wanted = set(names)
+
+    def match(value):
+        return bool(value) and not wanted.isdisjoint(str(value).split())
+    return match
+
+
+def compile_xpath(expr):
+    return etree.XPath(expr) if AVAILABLE else None
+
+
+# --- Selectors (CSS descendant chains expressed as ancestor checks) ---
+# PropertyPro
+PP_LISTINGS = compile_xpath(f"//div[{has_class('property-listing')}]")
+PP_TITLE_LINK = compile_xpath(f".//a[ancestor::h3[ancestor::*[{has_class('pl-title')}]]]")
+PP_LOCATION = compile_xpath(f".//p[ancestor::*[{has_class('pl-title')}]]")
+PP_TYPE = compile_xpath(f".//h6[ancestor::*[{has_class('pl-title')}]]")
+PP_PRICE = compile_xpath(f".//h3[ancestor::*[{has_class('pl-price')}]]")
+PP_DETAILS = compile_xpath(f".//h6[ancestor::*[{has_class('pl-price')}]]")
+PP_DATE = compile_xpath(f".//*[{has_class('date-added')}]")
+
+# NigeriaPropertyCentre
+NPC_LINKS = compile_xpath(
+    f"//a[@itemprop='url'][ancestor::div[{has_class('wp-block-title')}]"
+    f"[ancestor::div[{has_class('wp-block')}][{has_class('property')}][{has_class('list')}]]]"
+)
+NPC_TITLE = compile_xpath(f"//h4[{has_class('content-title')}]")
+NPC_ADDRESS = compile_xpath("//address")
+NPC_PRICE = compile_xpath("//span[@itemprop='price']")
+NPC_TABLE = compile_xpath(f"//table[{has_class('table-bordered')}]")
+NPC_CELLS = compile_xpath(".//td[ancestor::tr]")
+
+# PrivateProperty
+PV_LISTINGS = compile_xpath(f"//div[{has_class('similar-listings-item')}]")
+PV_LINK = compile_xpath(".//a[@href]")
+PV_TITLE = compile_xpath(f"//h1[ancestor::*[{has_class('property-info')}]]")
+PV_LOCATION = compile_xpath(f"//p[ancestor::*[{has_class('property-info')}]]")
+PV_PRICE = compile_xpath(f"//p[{has_class('price')}][ancestor::*[{has_class('property-info')}]]")
+PV_DETAIL_LIS = f"//li[ancestor::ul[ancestor::*[{has_class('property-details')}]]]"
+PV_TYPE_SPAN = compile_xpath(f"//span[contains(., 'Property Type')][ancestor::li[ancestor::ul[ancestor::*[{has_class('property-details')}]]]]")
+PV_FIRST_LI = compile_xpath(PV_DETAIL_LIS)
+PV_FIRST_A = compile_xpath(".//a")
+PV_NEXT_A = compile_xpath("following-sibling::a[1]")
+PV_BENEFITS = compile_xpath(f"//li[ancestor::*[{has_class('property-benefit')}]]")
+PV_ADDED_SPAN = compile_xpath(f"//span[contains(., 'Added')][ancestor::li[ancestor::*[{has_class('property-details')}]]]")
+PV_UPDATED_SPAN = compile_xpath(f"//span[contains(., 'Updated')][ancestor::li[ancestor::*[{has_class('property-details')}]]]")
+
+
+# --- Helpers ---
+def parse_html(html):
+    if not html or not html.strip():
+        return lxml.html.fromstring("<html></html>")
+    try:
+        return lxml.html.fromstring(html)
+    except ValueError:
+        # str input with an <?xml encoding=...?> declaration
+        return lxml.html.fromstring(html.encode("utf-8"))
+
+
+def _strings(el):
+    if not isinstance(el.tag, str) or el.tag in SKIP_TEXT_TAGS:
+        return
+    if el.text:
+        yield el.text
+    for child in el:
+        yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def text_of(el):
+    """Equivalent of bs4's get_text(strip=True)."""
+    return "".join(s.strip() for s in _strings(el) if s.strip())
+
+
+def first(xpath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def first_text(xpath, node):
+    el = first(xpath, node)
+    return text_of(el) if el is not None else None
+
+
+def next_sibling_text(el):
+    """bs4's `tag.next_sibling.strip()` for a tag followed by a text node."""
+    if el.tail is not None:
+        return el.tail.strip()
+    if el.getnext() is not None:
+        raise TypeError(f"next sibling of <{el.tag}> is a tag, not text")
+    raise AttributeError(f"<{el.tag}> has no next sibling")
+
+
+# --- PropertyPro ---
+def propertypro_listings(html):
+    """Return (detail href or None, record) for every card on a results page."""
+    root = parse_html(html)
+    cards = []
+    for listing in PP_LISTINGS(root):
+        link = first(PP_TITLE_LINK, listing)
+        title = text_of(link) if link is not None else None
+        price = first_text(PP_PRICE, listing)
+        price = price.replace("₦", "").replace(",", "").strip() if price is not None else None
+        details_text = first_text(PP_DETAILS, listing) or ""
+        date_info = first_text(PP_DATE, listing) or ""
+        href = link.get("href") if link is not None else None
+        cards.append((href.strip() if href else None, listing_record(
+            title, first_text(PP_LOCATION, listing), first_text(PP_TYPE, listing),
+            price, details_text, date_info,
+        )))
+    return cards
+
+
+def listing_record(title, location, property_type, price, details_text, date_info):
+    """Build a PropertyPro record from card text (mirrors extract_listing_data)."""
+    bedrooms = re.search(r"(\d+)\s*Bed", details_text)
+    bathrooms = re.search(r"(\d+)\s*Bath", details_text)
+    toilets = re.search(r"(\d+)\s*Toilet", details_text)
+    parking = re.search(r"(\d+)\s*Parking", details_text)
+
+    updated_date, added_date = None, None
+    if date_info:
+        match = re.search(r"Updated\s+([\dA-Za-z ]+)", date_info)
+        if match:
+            updated_date = match.group(1).strip()
+        match = re.search(r"Added\s+([\dA-Za-z ]+)", date_info)
+        if match:
+            added_date = match.group(1).strip()
+
+    return {
+        "title": title,
+        "property_type": property_type,
+        "location": location,
+        "price": price,
+        "bedrooms": int(bedrooms.group(1)) if bedrooms else None,
+        "bathrooms": int(bathrooms.group(1)) if bathrooms else None,
+        "toilets": int(toilets.group(1)) if toilets else None,
+        "parking_spaces": int(parking.group(1)) if parking else None,
+        "updated_date": updated_date,
+        "added_date": added_date,
+    }
+
+
+# --- NigeriaPropertyCentre ---
+def npc_links(html, base_url):
+    root = parse_html(html)
+    return [base_url + a.get("href").strip() for a in NPC_LINKS(root) if a.get("href") is not None]
+
+
+def npc_details(html):
+    """Same dict as nigeria_property_center_scraper.extract_details."""
+    root = parse_html(html)
+    table = first(NPC_TABLE, root)
+    details_map = {}
+    for cell in (NPC_CELLS(table) if table is not None else []):
+        text = text_of(cell)
+        if ":" in text:
+            key, val = text.split(":", 1)
+            details_map[key.strip()] = val.strip()
+
+    return {
+        "title": first_text(NPC_TITLE, root),
+        "location": first_text(NPC_ADDRESS, root),
+        "price": first_text(NPC_PRICE, root),
+        "bedrooms": details_map.get("Bedrooms"),
+        "bathrooms": details_map.get("Bathrooms"),
+        "toilets": details_map.get("Toilets"),
+        "property_type": details_map.get("Type"),
+        "market_status": details_map.get("Market Status"),
+        "date_added": details_map.get("Added On"),
+        "date_updated": details_map.get("Last Updated"),
+    }
+
+
+# --- PrivateProperty ---
+def private_links(html):
+    root = parse_html(html)
+    urls = []
+    for listing in PV_LISTINGS(root):
+        a_tag = first(PV_LINK, listing)
+        if a_tag is not None:
+            urls.append(a_tag.get("href"))
+    return urls
+
+
+def private_details(html):
+    """Same dict as private_propertng_scrapper's detail parser."""
+    root = parse_html(html)
+
+    type_span = first(PV_TYPE_SPAN, root)
+    if type_span is None:
+        first_li = first(PV_FIRST_LI, root)
+        proper_type = text_of(_required(first(PV_FIRST_A, first_li))) if first_li is not None else None
+    else:
+        proper_type = text_of(_required(first(PV_NEXT_A, type_span)))
+
+    benefits = PV_BENEFITS(root)
+    added_span = first(PV_ADDED_SPAN, root)
+    updated_span = first(PV_UPDATED_SPAN, root)
+
+    return {
+        "title": first_text(PV_TITLE, root),
+        "proper_type": proper_type,
+        "location": first_text(PV_LOCATION, root),
+        "price": first_text(PV_PRICE, root),
+        "bedrooms": text_of(benefits[0]) if len(benefits) > 0 else None,
+        "bathrooms": text_of(benefits[1]) if len(benefits) > 1 else None,
+        "toilets": text_of(benefits[2]) if len(benefits) > 2 else None,
+        "added_date": next_sibling_text(added_span) if added_span is not None else None,
+        "updated_dates": next_sibling_text(updated_span) if updated_span is not None else None,
+    }
+
+
+def _required(el):
+    # The BeautifulSoup version fails with AttributeError on a missing tag
+    if el is None:
+        raise AttributeError("'NoneType' object has no attribute 'get_text'")
+    return el
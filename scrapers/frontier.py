@@ -0,0 +1,226 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_FRONTIER_PATH = os.path.join("dataset", "crawl_frontier.sqlite")
+
+
+class CrawlFrontier:
+    """SQLite-backed crawl checkpoint, per source.
+
+    Tracks which listing pages are finished and the state of every detail
+    URL found on them (queued, fetched or failed, with the error). A resumed
+    run skips finished pages, picks up the queued URLs of the page it was on,
+    and retries only the URLs that failed.
+    """
+
+    def __init__(self, path=DEFAULT_FRONTIER_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                source TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                finished_at REAL NOT NULL,
+                PRIMARY KEY (source, page)
+            );
+            CREATE TABLE IF NOT EXISTS details (
+                source TEXT NOT NULL,
+                url TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source, url)
+            );
+            CREATE TABLE IF NOT EXISTS parts (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+        self.db.commit()
+
+    def reset(self, source):
+        """Forget all progress for a source (start of a fresh run)."""
+        with self.lock:
+            self.db.execute("DELETE FROM pages WHERE source = ?", (source,))
+            self.db.execute("DELETE FROM details WHERE source = ?", (source,))
+            self.db.commit()
+
+    # --- Listing pages ---
+    def page_done(self, source, page):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT 1 FROM pages WHERE source = ? AND page = ?", (source, page)
+            ).fetchone()
+        return row is not None
+
+    def mark_page_done(self, source, page):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages (source, page, finished_at) VALUES (?, ?, ?)",
+                (source, page, time.time()),
+            )
+            self.db.commit()
+
+    # --- Detail URLs ---
+    def queue(self, source, page, urls):
+        """Record the detail URLs found on a listing page."""
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                """
+                INSERT OR IGNORE INTO details (source, url, page, position, status, error, updated_at)
+                VALUES (?, ?, ?, ?, 'queued', NULL, ?)
+                """,
+                [(source, url, page, position, now) for position, url in enumerate(urls)],
+            )
+            self.db.commit()
+
+    def record(self, source, url, error=None):
+        """Mark a detail URL fetched, or failed with its error message."""
+        status = "failed" if error else "fetched"
+        with self.lock:
+            self.db.execute(
+                "UPDATE details SET status = ?, error = ?, updated_at = ? WHERE source = ? AND url = ?",
+                (status, error, time.time(), source, url),
+            )
+            self.db.commit()
+
+    def resume_links(self, source, page):
+        """Detail URLs still to fetch for a page, or None if the page was never reached.
+
+        For a finished page only its failed URLs come back; for the page a
+        run died on, its queued and failed URLs come back.
+        """
+        done = self.page_done(source, page)
+        wanted = ("failed",) if done else ("queued", "failed")
+        with self.lock:
+            rows = self.db.execute(
+                f"""
+                SELECT url FROM details
+                WHERE source = ? AND page = ? AND status IN ({",".join("?" * len(wanted))})
+                ORDER BY position
+                """,
+                (source, page, *wanted),
+            ).fetchall()
+            seen_page = done or self.db.execute(
+                "SELECT 1 FROM details WHERE source = ? AND page = ? LIMIT 1", (source, page)
+            ).fetchone() is not None
+        if not seen_page:
+            return None
+        return [url for (url,) in rows]
+
+    # --- Output files ---
+    def mark_part(self, path, size):
+        """Record how many bytes of a part file the committed checkpoints cover."""
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO parts (path, size, updated_at) VALUES (?, ?, ?)",
+                (path, size, time.time()),
+            )
+            self.db.commit()
+
+    def part_size(self, path):
+        """Bytes of a part file covered by committed checkpoints, or None if unknown."""
+        with self.lock:
+            row = self.db.execute("SELECT size FROM parts WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def summary(self, source):
+        """Return {'pages': n, 'queued': n, 'fetched': n, 'failed': n} for a source."""
+        with self.lock:
+            pages = self.db.execute(
+                "SELECT COUNT(*) FROM pages WHERE source = ?", (source,)
+            ).fetchone()[0]
+            counts = dict(self.db.execute(
+                "SELECT status, COUNT(*) FROM details WHERE source = ? GROUP BY status", (source,)
+            ).fetchall())
+        return {
+            "pages": pages,
+            "queued": counts.get("queued", 0),
+            "fetched": counts.get("fetched", 0),
+            "failed": counts.get("failed", 0),
+        }
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class DeferredCheckpoints:
+    """Hold a scraper's checkpoint writes until the records they cover are on disk.
+
+    wrap() returns a stand-in for a CrawlFrontier or SeenStore whose writes
+    (record, mark_page_done, mark_seen) are queued while lookups and queue()
+    go straight through. commit(size) is ChunkedCSVWriter's on_flush: the
+    writer flushes a chunk when the record after it arrives, by which time
+    the scraper has queued the checkpoints of every record in the chunk.
+    commit() first stores the part file's size in the frontier, then replays
+    the queued writes in order. A resumed run cuts the part file back to
+    that size, so rows whose checkpoints were never committed are dropped
+    and fetched again rather than written twice. is_known() also answers
+    from the queued mark_seen calls, so a listing repeated within the
+    current chunk is still recognised.
+    """
+
+    DEFERRED = ("record", "mark_page_done", "mark_seen")
+
+    def __init__(self, frontier=None, part_path=None):
+        self.frontier = frontier
+        self.part_path = part_path
+        self.lock = threading.Lock()
+        self.pending = []
+
+    def wrap(self, target):
+        return None if target is None else DeferredStore(self, target)
+
+    def defer(self, method, args, kwargs):
+        with self.lock:
+            self.pending.append((method, args, kwargs))
+
+    def marked(self, source, listing_id):
+        """The queued mark_seen call for a listing, as (args, kwargs), or None."""
+        with self.lock:
+            for method, args, kwargs in reversed(self.pending):
+                if method.__name__ == "mark_seen" and args[:2] == (source, listing_id):
+                    return args, kwargs
+        return None
+
+    def commit(self, size=None):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        # The size goes first: a crash before the replay leaves rows that are fetched
+        # again and written twice, never checkpoints for rows that were cut off
+        if self.frontier is not None and size is not None:
+            self.frontier.mark_part(self.part_path, size)
+        for method, args, kwargs in pending:
+            method(*args, **kwargs)
+
+
+class DeferredStore:
+    """A CrawlFrontier or SeenStore whose checkpoint writes wait for DeferredCheckpoints.commit()."""
+
+    def __init__(self, checkpoints, target):
+        self.checkpoints = checkpoints
+        self.target = target
+
+    def is_known(self, source, listing_id, updated_date=None):
+        marked = self.checkpoints.marked(source, listing_id)
+        if marked is None:
+            return self.target.is_known(source, listing_id, updated_date)
+        args, kwargs = marked
+        seen_updated = args[3] if len(args) > 3 else kwargs.get("updated_date")
+        stored = str(seen_updated) if seen_updated else None    # as SeenStore.mark_seen keeps it
+        return updated_date is None or stored == str(updated_date)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.target, name)
+        if name not in DeferredCheckpoints.DEFERRED:
+            return attribute
+        return lambda *args, **kwargs: self.checkpoints.defer(attribute, args, kwargs)
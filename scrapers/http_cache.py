@@ -0,0 +1,192 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+# --- Cache defaults ---
+DEFAULT_CACHE_DIR = os.path.join("dataset", "http_cache")
+DEFAULT_TTL = 6 * 60 * 60               # seconds a response is served without revalidation
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024   # total body bytes kept on disk
+
+
+class CacheMiss(requests.exceptions.RequestException):
+    """Raised in offline mode when a URL has never been cached."""
+
+
+class CachedPage:
+    """A cached response body plus the validators needed to revalidate it."""
+
+    def __init__(self, url, body, encoding, etag, last_modified, fetched_at):
+        self.url = url
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    def is_fresh(self, ttl):
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Persistent, content-addressed HTTP response cache keyed by URL.
+
+    Bodies live under `objects/` named by their SHA-256, so identical pages
+    are stored once; a SQLite index maps each URL to its body, validators
+    and last access time. When the stored bodies exceed `max_bytes` the
+    least recently used URLs are evicted; the stored size is read from the
+    index once and then kept as a running total, so a put does not re-sum
+    the table. With offline=True the network is never touched and stale
+    entries are served as-is.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.objects_dir = os.path.join(path, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_body_hash ON entries (body_hash)")
+        self.db.commit()
+        self.stored_bytes = self.total_bytes()
+
+    # --- Object store ---
+    def _object_path(self, body_hash):
+        return os.path.join(self.objects_dir, body_hash[:2], body_hash)
+
+    def _write_object(self, body):
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        return body_hash
+
+    def _drop_object_if_unused(self, body_hash):
+        in_use = self.db.execute(
+            "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)
+        ).fetchone()
+        if in_use:
+            return False
+        try:
+            os.remove(self._object_path(body_hash))
+        except FileNotFoundError:
+            pass
+        return True
+
+    # --- Public API ---
+    def get(self, url):
+        """Return the CachedPage for a URL, or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT body_hash, size, encoding, etag, last_modified, fetched_at FROM entries WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            body_hash, size, encoding, etag, last_modified, fetched_at = row
+            try:
+                with open(self._object_path(body_hash), "rb") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                if self._drop_object_if_unused(body_hash):
+                    self.stored_bytes -= size
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+        return CachedPage(url, body, encoding, etag, last_modified, fetched_at)
+
+    def put(self, url, response):
+        """Store a 200 response for a URL."""
+        body = response.content
+        with self.lock:
+            body_hash = self._write_object(body)
+            old = self.db.execute("SELECT body_hash, size FROM entries WHERE url = ?", (url,)).fetchone()
+            stored = self.db.execute(
+                "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)
+            ).fetchone()
+            now = time.time()
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url, body_hash, len(body), response.encoding,
+                    response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                    now, now,
+                ),
+            )
+            if not stored:
+                self.stored_bytes += len(body)
+            if old and old[0] != body_hash and self._drop_object_if_unused(old[0]):
+                self.stored_bytes -= old[1]
+            self._evict()
+            self.db.commit()
+
+    def mark_revalidated(self, url):
+        """Reset the TTL clock after a 304 Not Modified."""
+        with self.lock:
+            now = time.time()
+            self.db.execute(
+                "UPDATE entries SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url)
+            )
+            self.db.commit()
+
+    def total_bytes(self):
+        """Body bytes on disk, summed from the index (put/get keep `stored_bytes` in step with it)."""
+        row = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entries)"
+        ).fetchone()
+        return row[0]
+
+    def _evict(self):
+        """Drop least recently used URLs until the body store fits max_bytes."""
+        if self.stored_bytes <= self.max_bytes:
+            return
+        rows = self.db.execute(
+            "SELECT url, body_hash, size FROM entries ORDER BY last_access ASC"
+        ).fetchall()
+        for url, body_hash, size in rows:
+            if self.stored_bytes <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            if self._drop_object_if_unused(body_hash):
+                self.stored_bytes -= size
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,201 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.http_cache import ResponseCache, CacheMiss
+from scrapers.adaptive import AdaptiveLimits, parse_retry_after
+from scrapers.metrics import metrics
+
+# --- Shared fetch policy ---
+DEFAULT_TIMEOUT = (10, 30)      # (connect, read) seconds
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2             # seconds; doubles every attempt
+POOL_SIZE = 10                  # keep-alive connections per host
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS_POOL = [
+    {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"},
+]
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_cache = None
+_adaptive = None
+_rate_limiter = None
+
+
+def get_session(url):
+    """Return the keep-alive session for the URL's host, creating it on first use."""
+    host = urlparse(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def close_sessions():
+    """Close every pooled session (e.g. at the end of a crawl)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def enable_cache(path=None, offline=False, **kwargs):
+    """Route fetch_text() through an on-disk ResponseCache (see http_cache)."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    options = dict(kwargs, offline=offline)
+    if path:
+        options["path"] = path
+    _cache = ResponseCache(**options)
+    return _cache
+
+
+def disable_cache():
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None
+
+
+def enable_adaptive(**options):
+    """Pace every host with an AIMD concurrency controller (see adaptive).
+
+    While enabled, fetch() waits for a slot from the host's controller and
+    the scrapers' fixed politeness sleeps are skipped.
+    """
+    global _adaptive
+    _adaptive = AdaptiveLimits(**options)
+    return _adaptive
+
+
+def disable_adaptive():
+    global _adaptive
+    _adaptive = None
+
+
+def adaptive_limits():
+    """The active AdaptiveLimits, or None when fixed pacing is in use."""
+    return _adaptive
+
+
+def use_rate_limiter(limiter):
+    """Take a token from `limiter` (e.g. a SharedRateLimiter) before every request attempt; None to stop."""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def polite_sleep(source, seconds):
+    """A scraper's fixed delay between requests; skipped under adaptive pacing."""
+    if _adaptive is not None:
+        return
+    metrics.record_sleep(source, seconds)
+    time.sleep(seconds)
+
+
+def backoff_delay(attempt, backoff=DEFAULT_BACKOFF):
+    """Exponential backoff with jitter for the given 1-based attempt."""
+    return backoff * (2 ** (attempt - 1)) + random.uniform(0, 1)
+
+
+def retry_delay(response, attempt, backoff=DEFAULT_BACKOFF):
+    """The server's Retry-After when it sent one, else exponential backoff."""
+    retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+    return retry_after if retry_after is not None else backoff_delay(attempt, backoff)
+
+
+def fetch(url, headers_pool=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+          backoff=DEFAULT_BACKOFF, extra_headers=None):
+    """GET a URL through the pooled session and return the response.
+
+    Connection errors, timeouts and 429/5xx responses are retried after the
+    server's Retry-After, or with exponential backoff; other HTTP errors are
+    raised straight away. The last error is re-raised once all attempts are
+    used up. Under adaptive pacing every attempt holds a slot from the
+    host's controller and reports its outcome to it; with a rate limiter
+    set, every attempt, retries included, first takes a token from it.
+    """
+    session = get_session(url)
+    headers_pool = headers_pool or DEFAULT_HEADERS_POOL
+    controller = _adaptive.controller_for(url) if _adaptive is not None else None
+
+    for attempt in range(1, retries + 1):
+        if _rate_limiter is not None:
+            metrics.record_throttle(url, _rate_limiter.acquire(url))
+        if controller is not None:
+            controller.acquire()
+        start = time.perf_counter()
+        response = None
+        try:
+            headers = dict(random.choice(headers_pool), **(extra_headers or {}))
+            response = session.get(url, headers=headers, timeout=timeout)
+            record_attempt(url, response, start, controller)
+            response.raise_for_status()
+            return response
+        except requests.exceptions.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            if response is None:
+                record_attempt(url, e.response, start, controller)
+            retryable = status is None or status in RETRY_STATUSES
+            print(f"⚠️ Attempt {attempt}/{retries} failed for {url}: {e}")
+            if not retryable or attempt == retries:
+                raise
+            wait = retry_delay(e.response, attempt, backoff)
+        finally:
+            if controller is not None:
+                controller.release()
+        print(f"🔁 Retrying in {wait:.1f}s...")
+        metrics.record_retry(url, wait)
+        time.sleep(wait)
+
+
+def record_attempt(url, response, start, controller=None):
+    """Report one request attempt (response None for a connection error) to the metrics."""
+    seconds = time.perf_counter() - start
+    if response is None:
+        metrics.record_request(url, None, seconds)
+        if controller is not None:
+            controller.observe(None, seconds)
+        return
+    metrics.record_request(url, response.status_code, seconds, len(response.content),
+                           ttfb=response.elapsed.total_seconds())
+    if controller is not None:
+        controller.observe(response.status_code, seconds, response.headers.get("Retry-After"))
+
+
+def fetch_text(url, headers_pool=None, **kwargs):
+    """Like fetch(), but return the response body as text.
+
+    When the response cache is enabled, fresh entries are served from disk,
+    stale ones are revalidated with If-None-Match/If-Modified-Since, and in
+    offline mode a cache miss raises CacheMiss instead of touching the network.
+    """
+    cache = _cache
+    if cache is None:
+        return fetch(url, headers_pool=headers_pool, **kwargs).text
+
+    cached = cache.get(url)
+    if cached is not None and (cache.offline or cached.is_fresh(cache.ttl)):
+        metrics.record_cache_hit(url)
+        return cached.text
+    if cache.offline:
+        raise CacheMiss(f"Not in cache (offline mode): {url}")
+
+    extra_headers = cached.conditional_headers() if cached is not None else None
+    response = fetch(url, headers_pool=headers_pool, extra_headers=extra_headers, **kwargs)
+    if response.status_code == 304 and cached is not None:
+        cache.mark_revalidated(url)
+        return cached.text
+    cache.put(url, response)
+    return response.text
@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+from urllib.parse import urlparse
+
+DEFAULT_METRICS_DIR = os.path.join("dataset", "metrics")
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class HostStats:
+    """Request totals for one host."""
+
+    def __init__(self):
+        self.statuses = Counter()       # status code (or "error") -> requests
+        self.bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.ttfb_sum = 0.0             # time to response headers (connect + server time)
+        self.retries = 0
+        self.backoff_seconds = 0.0
+        self.throttle_seconds = 0.0     # waiting on the async engine's host limiter
+        self.cache_hits = 0
+
+    @property
+    def requests(self):
+        return sum(self.statuses.values())
+
+    def as_dict(self):
+        requests = self.requests
+        return {
+            "requests": requests,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items(), key=str)},
+            "bytes": self.bytes,
+            "latency_avg": self.latency_sum / requests if requests else 0.0,
+            "latency_max": self.latency_max,
+            "latency_sum": self.latency_sum,
+            "ttfb_avg": self.ttfb_sum / requests if requests else 0.0,
+            "retries": self.retries,
+            "backoff_seconds": self.backoff_seconds,
+            "throttle_seconds": self.throttle_seconds,
+            "cache_hits": self.cache_hits,
+        }
+
+
+class SourceStats:
+    """Sleep and parse totals for one scraper."""
+
+    def __init__(self):
+        self.sleep_seconds = 0.0
+        self.pages_parsed = Counter()               # page kind -> pages
+        self.parse_seconds = defaultdict(float)     # page kind -> seconds
+
+    def as_dict(self):
+        return {
+            "sleep_seconds": self.sleep_seconds,
+            "parse": {
+                kind: {
+                    "pages": pages,
+                    "seconds": self.parse_seconds[kind],
+                    "ms_per_page": self.parse_seconds[kind] * 1000 / pages,
+                }
+                for kind, pages in sorted(self.pages_parsed.items())
+            },
+        }
+
+
+class CrawlMetrics:
+    """Thread-safe totals of every request, sleep and parse in a crawl.
+
+    http_client records each request attempt (latency, bytes, status,
+    retries, backoff), the async engine records time spent waiting on host
+    limits, and the scrapers record their politeness sleeps and parse time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.hosts = defaultdict(HostStats)
+            self.sources = defaultdict(SourceStats)
+
+    # --- Recording ---
+    def record_request(self, url, status, seconds, size=0, ttfb=None):
+        host = urlparse(url).netloc
+        with self.lock:
+            stats = self.hosts[host]
+            stats.statuses[status if status is not None else "error"] += 1
+            stats.bytes += size
+            stats.latency_sum += seconds
+            stats.latency_max = max(stats.latency_max, seconds)
+            stats.ttfb_sum += ttfb if ttfb is not None else seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.latency_buckets[i] += 1
+
+    def record_retry(self, url, wait):
+        with self.lock:
+            stats = self.hosts[urlparse(url).netloc]
+            stats.retries += 1
+            stats.backoff_seconds += wait
+
+    def record_throttle(self, url, seconds):
+        with self.lock:
+            self.hosts[urlparse(url).netloc].throttle_seconds += seconds
+
+    def record_cache_hit(self, url):
+        with self.lock:
+            self.hosts[urlparse(url).netloc].cache_hits += 1
+
+    def record_sleep(self, source, seconds):
+        with self.lock:
+            self.sources[source].sleep_seconds += seconds
+
+    def record_parse(self, source, kind, seconds):
+        with self.lock:
+            stats = self.sources[source]
+            stats.pages_parsed[kind] += 1
+            stats.parse_seconds[kind] += seconds
+
+    def timed_parse(self, source, kind):
+        """Decorator recording the run time of a page parser."""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record_parse(source, kind, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    # --- Export ---
+    def snapshot(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "elapsed_seconds": time.time() - self.started,
+                "hosts": {host: stats.as_dict() for host, stats in sorted(self.hosts.items())},
+                "sources": {source: stats.as_dict() for source, stats in sorted(self.sources.items())},
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Render the totals in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        with self.lock:
+            hosts = sorted(self.hosts.items())
+            sources = sorted(self.sources.items())
+
+            metric("scraper_requests_total", "counter", "HTTP request attempts by host and status.", [
+                ({"host": host, "status": status}, n)
+                for host, stats in hosts for status, n in sorted(stats.statuses.items(), key=str)
+            ])
+            metric("scraper_response_bytes_total", "counter", "Response body bytes received.",
+                   [({"host": host}, stats.bytes) for host, stats in hosts])
+
+            lines.append("# HELP scraper_request_seconds Request latency in seconds.")
+            lines.append("# TYPE scraper_request_seconds histogram")
+            for host, stats in hosts:
+                label = f'host="{_escape(host)}"'
+                for bound, n in zip(LATENCY_BUCKETS, stats.latency_buckets):
+                    lines.append(f'scraper_request_seconds_bucket{{{label},le="{bound}"}} {n}')
+                lines.append(f'scraper_request_seconds_bucket{{{label},le="+Inf"}} {stats.requests}')
+                lines.append(f"scraper_request_seconds_sum{{{label}}} {stats.latency_sum}")
+                lines.append(f"scraper_request_seconds_count{{{label}}} {stats.requests}")
+
+            metric("scraper_ttfb_seconds_total", "counter", "Time to response headers (connect + server).",
+                   [({"host": host}, stats.ttfb_sum) for host, stats in hosts])
+            metric("scraper_retries_total", "counter", "Requests retried after an error.",
+                   [({"host": host}, stats.retries) for host, stats in hosts])
+            metric("scraper_backoff_seconds_total", "counter", "Time slept between retries.",
+                   [({"host": host}, stats.backoff_seconds) for host, stats in hosts])
+            metric("scraper_throttle_seconds_total", "counter", "Time waiting on per-host limits.",
+                   [({"host": host}, stats.throttle_seconds) for host, stats in hosts])
+            metric("scraper_cache_hits_total", "counter", "Pages served from the HTTP cache.",
+                   [({"host": host}, stats.cache_hits) for host, stats in hosts])
+            metric("scraper_sleep_seconds_total", "counter", "Politeness delays slept by each scraper.",
+                   [({"source": source}, stats.sleep_seconds) for source, stats in sources])
+            metric("scraper_pages_parsed_total", "counter", "Pages parsed by source and page kind.", [
+                ({"source": source, "kind": kind}, n)
+                for source, stats in sources for kind, n in sorted(stats.pages_parsed.items())
+            ])
+            metric("scraper_parse_seconds_total", "counter", "Time spent parsing pages.", [
+                ({"source": source, "kind": kind}, stats.parse_seconds[kind])
+                for source, stats in sources for kind in sorted(stats.pages_parsed)
+            ])
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory=DEFAULT_METRICS_DIR, name="crawl_metrics"):
+        """Write <name>.json and <name>.prom; returns both paths."""
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{name}.json")
+        prom_path = os.path.join(directory, f"{name}.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide recorder used by the fetch layer and the scrapers
+metrics = CrawlMetrics()
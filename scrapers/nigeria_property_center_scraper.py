@@ -1,11 +1,16 @@
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 import time
 import random
+from scrapers.http_client import fetch_text, polite_sleep
+from scrapers import fast_parse
+from scrapers.metrics import metrics
+from scrapers.async_fetch import AsyncFetcher, iterate_async, DEFAULT_CONCURRENCY, DEFAULT_RATE
+from scrapers.seen_store import below_watermark
 
 BASE_URL = "https://nigeriapropertycentre.com"
 LISTING_URL = f"{BASE_URL}/for-sale"
+SOURCE = "nigeriapropertycentre"
 
 HEADERS_POOL = [
     {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/124.0.0.0 Safari/537.36"},
@@ -13,90 +18,220 @@ HEADERS_POOL = [
     {"User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:124.0) Gecko/20100101 Firefox/124.0"},
 ]
 
+# Only the regions the extractors read are parsed on the BeautifulSoup path
+LINKS_STRAINER = SoupStrainer("div", class_=fast_parse.class_token("wp-block"))
+DETAILS_STRAINER = SoupStrainer(["h4", "address", "span", "table"])
+
+def get_html(url):
+    """Fetch raw HTML with rotating headers."""
+    return fetch_text(url, HEADERS_POOL)
+
 def get_soup(url):
     """Fetch and parse HTML with rotating headers."""
-    headers = random.choice(HEADERS_POOL)
-    response = requests.get(url, headers=headers, timeout=20)
-    response.raise_for_status()
-    return BeautifulSoup(response.text, "html.parser")
+    return BeautifulSoup(get_html(url), "html.parser")
+
+def listing_page_url(page_number):
+    return f"{LISTING_URL}?page={page_number}"
 
 def get_property_links(page_number):
     """Extract property detail links from one listing page."""
-    url = f"{LISTING_URL}?page={page_number}"
     print(f"📄 Scraping listings page {page_number} ...")
-
-    soup = get_soup(url)
-    cards = soup.select("div.wp-block.property.list div.wp-block-title a[itemprop='url']")
-    links = [BASE_URL + card["href"].strip() for card in cards if card.has_attr("href")]
+    return parse_property_links(get_html(listing_page_url(page_number)), page_number)
+
+@metrics.timed_parse(SOURCE, "listing")
+def parse_property_links(html, page_number):
+    """Pull detail links out of a listing page's HTML."""
+    if fast_parse.ENABLED:
+        links = fast_parse.npc_links(html, BASE_URL)
+    else:
+        links = extract_property_links(BeautifulSoup(html, "html.parser", parse_only=LINKS_STRAINER))
     print(f"→ Found {len(links)} property links on page {page_number}")
     return links
 
+def extract_property_links(soup):
+    """Pull detail links out of a parsed listing page."""
+    cards = soup.select("div.wp-block.property.list div.wp-block-title a[itemprop='url']")
+    return [BASE_URL + card["href"].strip() for card in cards if card.has_attr("href")]
+
 def parse_details_page(url):
     """Extract all required data from the property details page."""
     try:
-        soup = get_soup(url)
-        # Title
-        title = soup.select_one("h4.content-title")
-        title = title.get_text(strip=True) if title else None
-
-        # Location
-        location = soup.select_one("address")
-        location = location.get_text(strip=True) if location else None
-
-        # Price
-        price = soup.select_one("span[itemprop='price']")
-        price = price.get_text(strip=True) if price else None
-
-        # Bedrooms, Bathrooms, Toilets (from Property Details table)
-        table = soup.select_one("table.table-bordered")
-        rows = table.select("tr td") if table else []
-        details_map = {}
-        for cell in rows:
-            text = cell.get_text(strip=True)
-            if ":" in text:
-                key, val = text.split(":", 1)
-                details_map[key.strip()] = val.strip()
-
-        bedrooms = details_map.get("Bedrooms")
-        bathrooms = details_map.get("Bathrooms")
-        toilets = details_map.get("Toilets")
-        property_type = details_map.get("Type")
-        market_status = details_map.get("Market Status")
-        added_date = details_map.get("Added On")
-        updated_date = details_map.get("Last Updated")
-
-        data = {
-            "title": title,
-            "location": location,
-            "price": price,
-            "bedrooms": bedrooms,
-            "bathrooms": bathrooms,
-            "toilets": toilets,
-            "property_type": property_type,
-            "market_status": market_status,
-            "date_added": added_date,
-            "date_updated": updated_date
-
-        }
-
-        print(f"✅ Scraped: {title}")
-        return data
+        html = get_html(url)
+    except Exception as e:
+        return details_error(url, e)
+    return parse_details_html(url, html)
 
+@metrics.timed_parse(SOURCE, "details")
+def parse_details_html(url, html):
+    """Same as parse_details_page, for HTML that was already downloaded."""
+    try:
+        if fast_parse.ENABLED:
+            data = fast_parse.npc_details(html)
+        else:
+            data = extract_details(BeautifulSoup(html, "html.parser", parse_only=DETAILS_STRAINER))
     except Exception as e:
-        print(f"⚠️ Error on {url}: {e}")
-        return {"url": url, "error": str(e)}
+        return details_error(url, e)
+    print(f"✅ Scraped: {data['title']}")
+    return data
+
+def details_error(url, e):
+    print(f"⚠️ Error on {url}: {e}")
+    return {"url": url, "error": str(e)}
+
+def extract_details(soup):
+    """Read the listing fields from a parsed details page."""
+    # Title
+    title = soup.select_one("h4.content-title")
+    title = title.get_text(strip=True) if title else None
+
+    # Location
+    location = soup.select_one("address")
+    location = location.get_text(strip=True) if location else None
+
+    # Price
+    price = soup.select_one("span[itemprop='price']")
+    price = price.get_text(strip=True) if price else None
+
+    # Bedrooms, Bathrooms, Toilets (from Property Details table)
+    table = soup.select_one("table.table-bordered")
+    rows = table.select("tr td") if table else []
+    details_map = {}
+    for cell in rows:
+        text = cell.get_text(strip=True)
+        if ":" in text:
+            key, val = text.split(":", 1)
+            details_map[key.strip()] = val.strip()
+
+    bedrooms = details_map.get("Bedrooms")
+    bathrooms = details_map.get("Bathrooms")
+    toilets = details_map.get("Toilets")
+    property_type = details_map.get("Type")
+    market_status = details_map.get("Market Status")
+    added_date = details_map.get("Added On")
+    updated_date = details_map.get("Last Updated")
+
+    data = {
+        "title": title,
+        "location": location,
+        "price": price,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "toilets": toilets,
+        "property_type": property_type,
+        "market_status": market_status,
+        "date_added": added_date,
+        "date_updated": updated_date
+    }
+
+    return data
+
+def new_links_only(links, seen_store, page):
+    """In incremental mode drop known links (unless due a revisit, see SeenStore.unseen); None means stop."""
+    if seen_store is None:
+        return links
+    links = seen_store.unseen(SOURCE, links)
+    if not links:
+        print(f"🛑 Page {page} has only known listings, stopping.")
+        return None
+    return links
 
-def scrape_all(max_pages=1):
-    """Main controller for scraping multiple pages."""
-    all_properties = []
+def run_watermark(seen_store):
+    """The newest added date seen before this run (ISO), or None."""
+    return seen_store.watermark(SOURCE)[0] if seen_store is not None else None
+
+def past_watermark(added_dates, watermark, page):
+    """True once a page held only listings added before the run's watermark: the rest are older still."""
+    if not below_watermark(added_dates, watermark):
+        return False
+    print(f"🛑 Page {page} has only listings added before {watermark}, stopping.")
+    return True
+
+def remember(seen_store, link, property_data):
+    if seen_store is not None and "error" not in property_data:
+        seen_store.mark_seen(SOURCE, link, property_data["date_added"], property_data["date_updated"])
+
+def checkpoint(frontier, link, property_data):
+    if frontier is not None:
+        frontier.record(SOURCE, link, property_data.get("error"))
+
+def iter_all(max_pages=1, use_async=False, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+             seen_store=None, frontier=None):
+    """Yield property records as each listing page's details are scraped.
+
+    With use_async=True detail pages are fetched concurrently (at most
+    `concurrency` in flight, `rate` requests/sec) instead of one by one.
+    With a SeenStore only new detail pages, and known ones due a revisit
+    for updates, are fetched; paging stops at the first listing page that
+    holds nothing to fetch, or whose fetched listings were all added before
+    the newest one the store had (listings are shown newest first).
+    With a CrawlFrontier progress is checkpointed, and pages it already has
+    are resumed from their queued/failed URLs instead of being re-listed.
+    """
+    if use_async:
+        yield from iterate_async(iter_all_async(max_pages, concurrency, rate, seen_store, frontier))
+        return
+
+    watermark = run_watermark(seen_store)
     for page in range(1, max_pages + 1):
-        links = get_property_links(page)
+        links = frontier.resume_links(SOURCE, page) if frontier is not None else None
+        if links is None:
+            links = new_links_only(get_property_links(page), seen_store, page)
+            if links is None:
+                break
+            if frontier is not None:
+                frontier.queue(SOURCE, page, links)
+        elif links:
+            print(f"⏯️ Resuming page {page}: {len(links)} detail pages left")
+        added_dates = []
         for link in links:
-            time.sleep(random.uniform(2, 5))  # polite delay
+            polite_sleep(SOURCE, random.uniform(2, 5))
             property_data = parse_details_page(link)
-            all_properties.append(property_data)
-        time.sleep(random.uniform(4, 8))
-    return all_properties
+            yield property_data
+            remember(seen_store, link, property_data)
+            checkpoint(frontier, link, property_data)
+            added_dates.append(property_data.get("date_added"))
+        if frontier is not None:
+            frontier.mark_page_done(SOURCE, page)
+        if past_watermark(added_dates, watermark, page):
+            break
+        if links:
+            polite_sleep(SOURCE, random.uniform(4, 8))
+
+async def iter_all_async(max_pages=1, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                         seen_store=None, frontier=None):
+    """Async variant of iter_all; the token bucket replaces the fixed sleeps."""
+    fetcher = AsyncFetcher(concurrency=concurrency, rate=rate)
+    watermark = run_watermark(seen_store)
+    try:
+        for page in range(1, max_pages + 1):
+            links = frontier.resume_links(SOURCE, page) if frontier is not None else None
+            if links is None:
+                print(f"📄 Scraping listings page {page} ...")
+                html = await fetcher.fetch(listing_page_url(page), get_html)
+                links = await fetcher.run_blocking(parse_property_links, html, page)
+                links = new_links_only(links, seen_store, page)
+                if links is None:
+                    break
+                if frontier is not None:
+                    frontier.queue(SOURCE, page, links)
+            elif links:
+                print(f"⏯️ Resuming page {page}: {len(links)} detail pages left")
+            results = await fetcher.map_details(links, get_html, parse_details_html, on_error=details_error)
+            for link, property_data in zip(links, results):
+                yield property_data
+                remember(seen_store, link, property_data)
+                checkpoint(frontier, link, property_data)
+            if frontier is not None:
+                frontier.mark_page_done(SOURCE, page)
+            if past_watermark([property_data.get("date_added") for property_data in results], watermark, page):
+                break
+    finally:
+        fetcher.close()
+
+def scrape_all(max_pages=1, use_async=False, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+               seen_store=None, frontier=None):
+    """Main controller for scraping multiple pages."""
+    return list(iter_all(max_pages, use_async, concurrency, rate, seen_store, frontier))
 
 """if __name__ == "__main__":
     properties = scrape_all(max_pages=1)
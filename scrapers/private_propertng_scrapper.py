@@ -1,11 +1,17 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import random
 import time
 import csv
+from scrapers.http_client import fetch_text, polite_sleep
+from scrapers import fast_parse
+from scrapers.metrics import metrics
+from scrapers.async_fetch import AsyncFetcher, iterate_async, DEFAULT_CONCURRENCY, DEFAULT_RATE
+from scrapers.seen_store import below_watermark
 
 BASE_URL = "https://privateproperty.ng"
 LISTING_URL = f"{BASE_URL}/property-for-sale"
+SOURCE = "privateproperty"
 
 HEADERS_POOL = [
     {
@@ -25,24 +31,28 @@ HEADERS_POOL = [
     },
 ]
 
+# Only the regions the extractors read are parsed on the BeautifulSoup path
+LISTING_STRAINER = SoupStrainer("div", class_=fast_parse.class_token("similar-listings-item"))
+DETAILS_STRAINER = SoupStrainer(
+    class_=fast_parse.class_token("property-info", "property-details", "property-benefit")
+)
+
 def get_page(url):
-    for _ in range(5):
-        try:
-            headers = random.choice(HEADERS_POOL)
-            r = requests.get(url, headers=headers, timeout=10)
-            if r.status_code == 200:
-                return r.text
-            else:
-                time.sleep(random.uniform(2, 5))
-        except requests.RequestException:
-            time.sleep(random.uniform(2, 5))
-    return None
+    try:
+        return fetch_text(url, HEADERS_POOL)
+    except requests.RequestException:
+        return None
 
 def parse_listing_page(url):
-    html = get_page(url)
+    return parse_listing_html(get_page(url))
+
+@metrics.timed_parse(SOURCE, "listing")
+def parse_listing_html(html):
     if not html:
         return []
-    soup = BeautifulSoup(html, "html.parser")
+    if fast_parse.ENABLED:
+        return fast_parse.private_links(html)
+    soup = BeautifulSoup(html, "html.parser", parse_only=LISTING_STRAINER)
     listings = soup.find_all("div", class_="similar-listings-item")
     urls = []
     for listing in listings:
@@ -52,11 +62,17 @@ def parse_listing_page(url):
     return urls
 
 def parse_details_page(url):
-    html = get_page(BASE_URL + url)
+    return parse_details_html(url, get_page(BASE_URL + url))
+
+@metrics.timed_parse(SOURCE, "details")
+def parse_details_html(url, html):
     if not html:
         return None
-    soup = BeautifulSoup(html, "html.parser")
+    if fast_parse.ENABLED:
+        return fast_parse.private_details(html)
+    return extract_details(BeautifulSoup(html, "html.parser", parse_only=DETAILS_STRAINER))
 
+def extract_details(soup):
     # Title
     title_tag = soup.select_one(".property-info h1")
     title = title_tag.get_text(strip=True) if title_tag else None
@@ -102,23 +118,121 @@ def parse_details_page(url):
         "updated_dates": updated_date
     }
 
-def scrape_all(max_pages=3):
-    all_properties = []
+def new_urls_only(property_urls, seen_store, page):
+    """In incremental mode drop known URLs (unless due a revisit, see SeenStore.unseen); None means stop."""
+    if seen_store is None:
+        return property_urls
+    property_urls = seen_store.unseen(SOURCE, property_urls)
+    if not property_urls:
+        print(f"Page {page} has only known properties, stopping.")
+        return None
+    return property_urls
+
+def run_watermark(seen_store):
+    """The newest added date seen before this run (ISO), or None."""
+    return seen_store.watermark(SOURCE)[0] if seen_store is not None else None
+
+def past_watermark(added_dates, watermark, page):
+    """True once a page held only properties added before the run's watermark: the rest are older still."""
+    if not below_watermark(added_dates, watermark):
+        return False
+    print(f"Page {page} has only properties added before {watermark}, stopping.")
+    return True
+
+def remember(seen_store, url, details):
+    if seen_store is not None and details:
+        seen_store.mark_seen(SOURCE, url, details["added_date"], details["updated_dates"])
+
+def checkpoint(frontier, url, details):
+    if frontier is not None:
+        frontier.record(SOURCE, url, None if details else "no response")
+
+def iter_all(max_pages=3, use_async=False, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+             seen_store=None, frontier=None):
+    """Yield property records as each listing page's details are scraped.
+
+    With a SeenStore paging stops at the first listing page with nothing to
+    fetch, or whose fetched properties were all added before the newest one
+    the store had.
+    """
+    if use_async:
+        yield from iterate_async(iter_all_async(max_pages, concurrency, rate, seen_store, frontier))
+        return
+
+    watermark = run_watermark(seen_store)
     for page in range(1, max_pages + 1):
-        print(f"Scraping listing page {page}...")
-        page_url = f"{LISTING_URL}?page={page}"
-        property_urls = parse_listing_page(page_url)
-        if not property_urls:
-            print("No more properties found, stopping.")
-            break
+        property_urls = frontier.resume_links(SOURCE, page) if frontier is not None else None
+        if property_urls is None:
+            print(f"Scraping listing page {page}...")
+            page_url = f"{LISTING_URL}?page={page}"
+            property_urls = parse_listing_page(page_url)
+            if not property_urls:
+                print("No more properties found, stopping.")
+                break
+            property_urls = new_urls_only(property_urls, seen_store, page)
+            if property_urls is None:
+                break
+            if frontier is not None:
+                frontier.queue(SOURCE, page, property_urls)
+        elif property_urls:
+            print(f"Resuming listing page {page}: {len(property_urls)} properties left")
+        added_dates = []
         for url in property_urls:
             print(f"Scraping property {url}")
             details = parse_details_page(url)
             if details:
-                all_properties.append(details)
-            time.sleep(random.uniform(1, 3))
-        time.sleep(random.uniform(2, 5))
-    return all_properties
+                yield details
+            remember(seen_store, url, details)
+            checkpoint(frontier, url, details)
+            added_dates.append(details["added_date"] if details else None)
+            polite_sleep(SOURCE, random.uniform(1, 3))
+        if frontier is not None:
+            frontier.mark_page_done(SOURCE, page)
+        if past_watermark(added_dates, watermark, page):
+            break
+        if property_urls:
+            polite_sleep(SOURCE, random.uniform(2, 5))
+
+async def iter_all_async(max_pages=3, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                         seen_store=None, frontier=None):
+    """Async variant of iter_all; the token bucket replaces the fixed sleeps."""
+    fetcher = AsyncFetcher(concurrency=concurrency, rate=rate)
+    watermark = run_watermark(seen_store)
+    try:
+        for page in range(1, max_pages + 1):
+            property_urls = frontier.resume_links(SOURCE, page) if frontier is not None else None
+            if property_urls is None:
+                print(f"Scraping listing page {page}...")
+                html = await fetcher.fetch(f"{LISTING_URL}?page={page}", get_page)
+                property_urls = await fetcher.run_blocking(parse_listing_html, html)
+                if not property_urls:
+                    print("No more properties found, stopping.")
+                    break
+                property_urls = new_urls_only(property_urls, seen_store, page)
+                if property_urls is None:
+                    break
+                if frontier is not None:
+                    frontier.queue(SOURCE, page, property_urls)
+            elif property_urls:
+                print(f"Resuming listing page {page}: {len(property_urls)} properties left")
+            results = await fetcher.map_details(
+                property_urls, get_page, parse_details_html, url_for=lambda url: BASE_URL + url
+            )
+            for url, details in zip(property_urls, results):
+                if details:
+                    yield details
+                remember(seen_store, url, details)
+                checkpoint(frontier, url, details)
+            if frontier is not None:
+                frontier.mark_page_done(SOURCE, page)
+            if past_watermark([details["added_date"] if details else None for details in results], watermark, page):
+                break
+    finally:
+        fetcher.close()
+
+def scrape_all(max_pages=3, use_async=False, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+               seen_store=None, frontier=None):
+    return list(iter_all(max_pages, use_async, concurrency, rate, seen_store, frontier))
 
 """if __name__ == "__main__":
     properties = scrape_all(max_pages=3)
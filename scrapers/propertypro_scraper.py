@@ -1,9 +1,12 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 import re
 import random
 import time
+from scrapers.http_client import fetch_text, polite_sleep
+from scrapers import fast_parse
+from scrapers.metrics import metrics
 
 # --- Header Pool (Rotating User-Agents) ---
 HEADERS_LIST = [
@@ -13,24 +16,25 @@ HEADERS_LIST = [
     {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Edge/126.0.2592.68"},
 ]
 
-def get_soup(url, retries=3, backoff=5):
-    """Fetch a page with retries and return a BeautifulSoup object."""
-    for attempt in range(1, retries + 1):
-        try:
-            headers = random.choice(HEADERS_LIST)
-            print(f"🌐 Fetching ({attempt}/{retries}): {url}")
-            response = requests.get(url, headers=headers, timeout=35)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ Attempt {attempt} failed: {e}")
-            if attempt < retries:
-                wait = backoff * attempt
-                print(f"🔁 Retrying in {wait}s...")
-                time.sleep(wait)
-            else:
-                print(f"❌ All {retries} attempts failed for {url}")
-                return None
+BASE_URL = "https://www.propertypro.ng"
+LISTING_URL = f"{BASE_URL}/property-for-sale"
+SOURCE = "propertypro"
+
+LISTING_STRAINER = SoupStrainer("div", class_=fast_parse.class_token("property-listing"))
+
+def get_html(url):
+    """Fetch a page through the shared client; None if every attempt failed."""
+    print(f"🌐 Fetching: {url}")
+    try:
+        return fetch_text(url, HEADERS_LIST)
+    except requests.exceptions.RequestException:
+        print(f"❌ All attempts failed for {url}")
+        return None
+
+def get_soup(url):
+    """Fetch a page and return a BeautifulSoup object (None on failure)."""
+    html = get_html(url)
+    return BeautifulSoup(html, "html.parser") if html is not None else None
 
 
 def extract_listing_data(listing):
@@ -50,63 +54,77 @@ def extract_listing_data(listing):
     details_text = details.get_text(strip=True) if details else ""
     date_info = date_info.get_text(strip=True) if date_info else ""
 
-    # Extract numeric features
-    bedrooms = re.search(r"(\d+)\s*Bed", details_text)
-    bathrooms = re.search(r"(\d+)\s*Bath", details_text)
-    toilets = re.search(r"(\d+)\s*Toilet", details_text)
-    parking = re.search(r"(\d+)\s*Parking", details_text)
-
-    bedrooms = int(bedrooms.group(1)) if bedrooms else None
-    bathrooms = int(bathrooms.group(1)) if bathrooms else None
-    toilets = int(toilets.group(1)) if toilets else None
-    parking = int(parking.group(1)) if parking else None
-
-    # Extract updated and added dates
-    updated_date, added_date = None, None
-    if date_info:
-        match = re.search(r"Updated\s+([\dA-Za-z ]+)", date_info)
-        if match:
-            updated_date = match.group(1).strip()
-        match = re.search(r"Added\s+([\dA-Za-z ]+)", date_info)
-        if match:
-            added_date = match.group(1).strip()
-
-    return {
-        "title": title,
-        "property_type": property_type,
-        "location": location,
-        "price": price,
-        "bedrooms": bedrooms,
-        "bathrooms": bathrooms,
-        "toilets": toilets,
-        "parking_spaces": parking,
-        "updated_date": updated_date,
-        "added_date": added_date,
-    }
-
-def scrape_propertypro(max_pages=2):
-    """Scrape multiple pages from PropertyPro."""
-    base_url = "https://www.propertypro.ng/property-for-sale?page="
-    all_data = []
-
+    # Extract numeric features and dates
+    return fast_parse.listing_record(title, location, property_type, price, details_text, date_info)
+
+@metrics.timed_parse(SOURCE, "listing")
+def parse_listings_html(html):
+    """Return (detail href or None, record) for every listing card on a page.
+
+    Uses the lxml extractor when available; otherwise BeautifulSoup, parsing
+    only the listing cards.
+    """
+    if fast_parse.ENABLED:
+        return fast_parse.propertypro_listings(html)
+    soup = BeautifulSoup(html, "html.parser", parse_only=LISTING_STRAINER)
+    cards = []
+    for listing in soup.find_all("div", class_="property-listing"):
+        link = listing.select_one(".pl-title h3 a")
+        href = link["href"].strip() if link and link.get("href") else None
+        cards.append((href, extract_listing_data(listing)))
+    return cards
+
+def listing_id(href, data):
+    """Stable ID for a listing card: its detail link, else title/location/price."""
+    if href:
+        return href
+    return "|".join(str(data.get(key)) for key in ("title", "location", "price"))
+
+def iter_propertypro(max_pages=2, seen_store=None, frontier=None):
+    """Yield PropertyPro listings one by one as each page is scraped.
+
+    With a SeenStore only new or updated listings are yielded, and paging
+    stops at the first page that holds nothing new. With a CrawlFrontier
+    pages finished by an earlier run are skipped.
+    """
     for page in range(1, max_pages + 1):
-        url = f"{base_url}{page}"
+        if frontier is not None and frontier.page_done(SOURCE, page):
+            continue
+        url = f"{LISTING_URL}?page={page}"
         print(f"\n📄 Scraping page {page}...")
-        soup = get_soup(url)
-        if not soup:
+        html = get_html(url)
+        if html is None:
             continue
 
-        listings = soup.find_all("div", class_="property-listing")
+        listings = parse_listings_html(html)
         print(f"→ Found {len(listings)} listings")
 
-        for listing in listings:
-            data = extract_listing_data(listing)
-            all_data.append(data)
+        new_on_page = 0
+        for href, data in listings:
+            if seen_store is not None:
+                lid = listing_id(href, data)
+                if seen_store.is_known(SOURCE, lid, data["updated_date"]):
+                    continue
+            new_on_page += 1
+            yield data
+            if seen_store is not None:
+                seen_store.mark_seen(SOURCE, lid, data["added_date"], data["updated_date"])
+
+        if frontier is not None:
+            frontier.mark_page_done(SOURCE, page)
+
+        if seen_store is not None and new_on_page == 0:
+            print(f"🛑 Page {page} has only known listings, stopping.")
+            break
 
         # Random delay (anti-block)
         delay = random.uniform(3, 6)
         print(f"⏳ Waiting {delay:.1f}s before next page...")
-        time.sleep(delay)
+        polite_sleep(SOURCE, delay)
+
+def scrape_propertypro(max_pages=2, seen_store=None, frontier=None):
+    """Scrape multiple pages from PropertyPro."""
+    all_data = list(iter_propertypro(max_pages, seen_store, frontier))
 
     # Save results
     #df = pd.DataFrame(all_data)
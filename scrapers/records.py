@@ -0,0 +1,142 @@
+import csv
+import os
+import shutil
+
+# --- Shared record schema ---
+COLUMN_MAP = {
+    "proper_type": "property_type",
+    "date_added": "added_date",
+    "date_updated": "updated_date",
+    "updated_dates": "updated_date",
+}
+
+STANDARD_COLUMNS = [
+    "title",
+    "property_type",
+    "location",
+    "price",
+    "bedrooms",
+    "bathrooms",
+    "toilets",
+    "added_date",
+    "updated_date",
+]
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def normalize_record(record):
+    """Rename a scraper's raw dict to the standard columns (dict version of normalize_columns)."""
+    renamed = {COLUMN_MAP.get(key, key): value for key, value in record.items()}
+    return {col: renamed.get(col) for col in STANDARD_COLUMNS}
+
+
+def iter_normalized(records):
+    """Map normalize_record over a scraper's record iterator."""
+    for record in records:
+        yield normalize_record(record)
+
+
+def drop_partial_line(path):
+    """Cut a row a crash left half-written off the end of a CSV, so appends start on a new line."""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        position = end
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            block = f.read(step)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != end:
+            f.truncate(position)
+
+
+class ChunkedCSVWriter:
+    """Append records to a CSV in chunks, flushing each chunk to disk.
+
+    Whatever was written before a crash stays on disk; records still in the
+    buffer are flushed when the writer is closed, even on an exception.
+    With append=True an existing file is continued instead of truncated;
+    with resume_size it is first cut back to that many bytes (rows past it
+    will be written again), else only a half-written last row is dropped.
+    A full chunk is flushed when the next record arrives, and on_flush(size)
+    is then called with the file's size on disk, so checkpoints taken up to
+    that record can be committed with the rows they cover.
+    """
+
+    def __init__(self, path, columns=STANDARD_COLUMNS, chunk_size=DEFAULT_CHUNK_SIZE, append=False,
+                 on_flush=None, resume_size=None):
+        self.path = path
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.on_flush = on_flush
+        self.buffer = []
+        self.count = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        continuing = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if continuing:
+            if resume_size is not None and resume_size <= os.path.getsize(path):
+                os.truncate(path, resume_size)
+            else:
+                drop_partial_line(path)
+            continuing = os.path.getsize(path) > 0
+        self.file = open(path, "a" if continuing else "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=columns, extrasaction="ignore")
+        if not continuing:
+            self.writer.writeheader()
+        self.flush()
+
+    def write(self, record):
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+        self.buffer.append(record)
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def flush(self):
+        self.writer.writerows(self.buffer)
+        self.count += len(self.buffer)
+        self.buffer = []
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        if self.on_flush is not None:
+            self.on_flush(os.fstat(self.file.fileno()).st_size)
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def concat_csv_files(paths, output_path):
+    """Stream several CSVs with the same header into one file (atomic replace)."""
+    tmp_path = f"{output_path}.tmp"
+    header_written = False
+    with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, newline="", encoding="utf-8") as f:
+                header = f.readline()
+                if not header_written:
+                    out.write(header)
+                    header_written = True
+                shutil.copyfileobj(f, out)
+        if not header_written:
+            out.write(",".join(STANDARD_COLUMNS) + "\n")
+    os.replace(tmp_path, output_path)
+    return output_path
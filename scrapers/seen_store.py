@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+DEFAULT_STATE_PATH = os.path.join("dataset", "crawl_state.sqlite")
+
+DATE_FORMATS = ["%d %b %Y", "%d %B %Y", "%Y-%m-%d", "%d/%m/%Y"]
+REVISIT_AFTER = 7 * 24 * 3600   # seconds before a known listing with no date to compare is fetched again
+REVISIT_SPREAD = 1.0            # each listing falls due between 1x and (1 + spread)x REVISIT_AFTER
+
+
+def parse_listing_date(value):
+    """Parse the date strings the sites use ("10 Oct 2025", ...) to ISO, or None."""
+    if not value:
+        return None
+    value = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def revisit_due(listing_id, last_seen, revisit_after):
+    """When a known listing is due a revisit: a fixed per-ID share of the spread is added, so
+    listings scraped together do not all fall due together."""
+    share = zlib.crc32(str(listing_id).encode("utf-8")) / 0xFFFFFFFF
+    return last_seen + revisit_after * (1 + REVISIT_SPREAD * share)
+
+
+def below_watermark(added_dates, watermark):
+    """True when every added date parses and is older than the ISO `watermark`."""
+    if not watermark or not added_dates:
+        return False
+    parsed = [parse_listing_date(value) for value in added_dates]
+    return all(value is not None and value < watermark for value in parsed)
+
+
+class SeenStore:
+    """Persistent record of listings already scraped, per source.
+
+    Each listing is keyed by its URL (or another stable ID) and remembers the
+    last updated_date it was scraped with, so a listing counts as known only
+    while its updated date is unchanged. The store also keeps a high-watermark
+    of the newest added/updated dates seen for every source.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS seen_listings (
+                source TEXT NOT NULL,
+                listing_id TEXT NOT NULL,
+                updated_date TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (source, listing_id)
+            );
+            CREATE TABLE IF NOT EXISTS watermarks (
+                source TEXT PRIMARY KEY,
+                added_date TEXT,
+                updated_date TEXT
+            );
+        """)
+        self.db.commit()
+
+    def is_known(self, source, listing_id, updated_date=None):
+        """True if the listing was scraped before and has not been updated since."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT updated_date FROM seen_listings WHERE source = ? AND listing_id = ?",
+                (source, listing_id),
+            ).fetchone()
+        if row is None:
+            return False
+        if updated_date is None:
+            return True
+        return row[0] == str(updated_date)
+
+    def unseen(self, source, listings, revisit_after=REVISIT_AFTER):
+        """Filter a page of listings down to the ones to fetch: never scraped, or updated since.
+
+        `listings` holds (listing_id, updated_date) pairs, or bare listing IDs
+        where the listing page shows no date; items come back as given. A
+        pair counts as updated when its date differs from the stored one. A
+        bare ID cannot show an update (NigeriaPropertyCentre and
+        PrivateProperty only print "Last Updated" on the detail page), so a
+        known one is fetched again once it is due (revisit_due: between
+        `revisit_after` and (1 + REVISIT_SPREAD) times that after its last
+        fetch, staggered per ID; None: never), and its detail page then
+        brings the new updated date.
+        """
+        now = time.time()
+        wanted = []
+        for item in listings:
+            listing_id, updated_date = item if isinstance(item, tuple) else (item, None)
+            with self.lock:
+                row = self.db.execute(
+                    "SELECT updated_date, last_seen FROM seen_listings WHERE source = ? AND listing_id = ?",
+                    (source, listing_id),
+                ).fetchone()
+            if row is None:
+                wanted.append(item)
+            elif updated_date is not None:
+                if row[0] != str(updated_date):
+                    wanted.append(item)
+            elif revisit_after is not None and revisit_due(listing_id, row[1], revisit_after) <= now:
+                wanted.append(item)
+        return wanted
+
+    def mark_seen(self, source, listing_id, added_date=None, updated_date=None):
+        """Remember a scraped listing and push the source's watermark forward."""
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                """
+                INSERT INTO seen_listings (source, listing_id, updated_date, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source, listing_id)
+                DO UPDATE SET updated_date = excluded.updated_date, last_seen = excluded.last_seen
+                """,
+                (source, listing_id, str(updated_date) if updated_date else None, now, now),
+            )
+            self._advance_watermark(source, parse_listing_date(added_date),
+                                    parse_listing_date(updated_date))
+            self.db.commit()
+
+    def _advance_watermark(self, source, added_iso, updated_iso):
+        row = self.db.execute(
+            "SELECT added_date, updated_date FROM watermarks WHERE source = ?", (source,)
+        ).fetchone()
+        current_added, current_updated = row if row else (None, None)
+        new_added = max(filter(None, [current_added, added_iso]), default=None)
+        new_updated = max(filter(None, [current_updated, updated_iso]), default=None)
+        self.db.execute(
+            "INSERT OR REPLACE INTO watermarks (source, added_date, updated_date) VALUES (?, ?, ?)",
+            (source, new_added, new_updated),
+        )
+
+    def watermark(self, source):
+        """Return (added_date, updated_date) ISO high-watermarks for a source."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT added_date, updated_date FROM watermarks WHERE source = ?", (source,)
+            ).fetchone()
+        return row if row else (None, None)
+
+    def count(self, source):
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM seen_listings WHERE source = ?", (source,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
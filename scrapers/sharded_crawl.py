@@ -0,0 +1,204 @@
+"""Sharded crawl: worker processes draining a shared SQLite work queue.
+
+The coordinator (baseSrapper.crawl_sharded) queues every listing page
+of the three sources. Workers lease items one at a time: a listing page
+queues its detail URLs (or, for PropertyPro, yields its records directly),
+a detail URL yields one record. Each worker appends its records to its own
+shard CSV per source, and baseSrapper.merge_shards combines the shards.
+All workers draw from the same per-host token buckets, taking a token
+before every request attempt (retries included), so the rate limit holds
+however many workers run.
+
+To add workers on another machine sharing the volume:
+    python -m scrapers.sharded_crawl --queue /shared/crawl_queue.sqlite --shards /shared/shards
+"""
+import argparse
+import glob
+import os
+import socket
+import time
+
+from scrapers import http_client
+from scrapers import propertypro_scraper as propertypro
+from scrapers import nigeria_property_center_scraper as npc
+from scrapers import private_propertng_scrapper as private
+from scrapers.metrics import metrics
+from scrapers.records import ChunkedCSVWriter
+from scrapers.work_queue import (
+    DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DEFAULT_QUEUE_PATH, SharedRateLimiter, WorkQueue,
+)
+
+DEFAULT_SHARD_DIR = os.path.join("dataset", "shards")
+IDLE_WAIT = 0.5     # seconds between polls while other workers hold the remaining items
+
+SOURCES = [propertypro.SOURCE, npc.SOURCE, private.SOURCE]
+LISTING_PATHS = {
+    propertypro.SOURCE: "/property-for-sale",
+    npc.SOURCE: "/for-sale",
+    private.SOURCE: "/property-for-sale",
+}
+MODULES = {propertypro.SOURCE: propertypro, npc.SOURCE: npc, private.SOURCE: private}
+
+# Shard files keep each source's raw record fields, plus where the record came from
+SHARD_KEY_COLUMNS = ["item_id", "item_index", "page", "position"]
+RAW_COLUMNS = {
+    propertypro.SOURCE: ["title", "property_type", "location", "price", "bedrooms", "bathrooms",
+                         "toilets", "parking_spaces", "updated_date", "added_date"],
+    npc.SOURCE: ["title", "location", "price", "bedrooms", "bathrooms", "toilets", "property_type",
+                 "market_status", "date_added", "date_updated"],
+    private.SOURCE: ["title", "proper_type", "location", "price", "bedrooms", "bathrooms", "toilets",
+                     "added_date", "updated_dates"],
+}
+
+
+# --- Site URLs (pinned in the queue so every worker crawls the same target) ---
+def site_urls():
+    return {source: MODULES[source].BASE_URL for source in SOURCES}
+
+
+def use_site_urls(urls):
+    """Point the scraper modules at the given base URLs (e.g. a mirror or a replay server)."""
+    for source, base_url in urls.items():
+        module = MODULES[source]
+        module.BASE_URL = base_url
+        module.LISTING_URL = base_url + LISTING_PATHS[source]
+
+
+# --- Planning ---
+def plan(queue, pages, rate, burst):
+    """Queue the listing pages of each source; `pages` maps source -> page count."""
+    for source, base_url in site_urls().items():
+        queue.set_setting(f"base_url:{source}", base_url)
+    queue.set_setting("rate", str(rate))
+    queue.set_setting("burst", str(burst))
+    for source, count in pages.items():
+        for page in range(1, count + 1):
+            queue.add(source, "listing", [page], page)
+    print(f"🗂️ Planned {sum(pages.values())} listing pages: {pages}")
+
+
+def shard_paths(shard_dir, source):
+    return sorted(glob.glob(os.path.join(shard_dir, f"*-{source}.csv")))
+
+
+def clear_shards(shard_dir=DEFAULT_SHARD_DIR):
+    for path in glob.glob(os.path.join(shard_dir, "*")):
+        os.remove(path)
+
+
+# --- Work item handlers ---
+def fetch_page(url, fetch_fn):
+    """Fetch a page (paced by the shared rate limiter in http_client); raises if there is no response."""
+    html = fetch_fn(url)
+    if not html:
+        raise RuntimeError(f"No response from {url}")
+    return html
+
+
+def propertypro_listing(item, queue):
+    html = fetch_page(f"{propertypro.LISTING_URL}?page={item['page']}", propertypro.get_html)
+    return [data for _, data in propertypro.parse_listings_html(html)]
+
+
+def npc_listing(item, queue):
+    html = fetch_page(npc.listing_page_url(item["page"]), npc.get_html)
+    queue.add(npc.SOURCE, "details", npc.parse_property_links(html, item["page"]), item["page"])
+    return []
+
+
+def npc_details(item, queue):
+    url = item["payload"]
+    data = npc.parse_details_html(url, fetch_page(url, npc.get_html))
+    if "error" in data:
+        raise RuntimeError(data["error"])
+    return [data]
+
+
+def private_listing(item, queue):
+    html = fetch_page(f"{private.LISTING_URL}?page={item['page']}", private.get_page)
+    queue.add(private.SOURCE, "details", private.parse_listing_html(html), item["page"])
+    return []
+
+
+def private_details(item, queue):
+    url = item["payload"]
+    return [private.parse_details_html(url, fetch_page(private.BASE_URL + url, private.get_page))]
+
+
+HANDLERS = {
+    (propertypro.SOURCE, "listing"): propertypro_listing,
+    (npc.SOURCE, "listing"): npc_listing,
+    (npc.SOURCE, "details"): npc_details,
+    (private.SOURCE, "listing"): private_listing,
+    (private.SOURCE, "details"): private_details,
+}
+
+
+# --- Worker ---
+def run_worker(queue_path=DEFAULT_QUEUE_PATH, shard_dir=DEFAULT_SHARD_DIR, worker_id=None,
+               lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Lease and process items until the queue is drained; returns items handled.
+
+    Records are flushed to the shard before their item is marked done, so a
+    worker that dies loses nothing: its leased item is picked up again once
+    the lease expires (and the merge drops the duplicate rows).
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(queue_path)
+    settings = queue.settings()
+    use_site_urls({source: settings[f"base_url:{source}"] for source in SOURCES})
+    limiter = SharedRateLimiter(queue_path, float(settings["rate"]), float(settings["burst"]))
+    http_client.use_rate_limiter(limiter)
+    writers = {}
+    handled = 0
+    print(f"👷 Worker {worker_id} started")
+    try:
+        while True:
+            item = queue.lease(worker_id, lease_seconds)
+            if item is None:
+                if queue.outstanding() == 0:
+                    break
+                time.sleep(IDLE_WAIT)
+                continue
+
+            source = item["source"]
+            try:
+                records = HANDLERS[(source, item["kind"])](item, queue)
+            except Exception as e:
+                status = queue.fail(item, str(e), max_attempts)
+                print(f"⚠️ [{worker_id}] {source} {item['kind']} {item['payload']}: {e} ({status})")
+                continue
+
+            if records:
+                if source not in writers:
+                    writers[source] = ChunkedCSVWriter(
+                        os.path.join(shard_dir, f"{worker_id}-{source}.csv"),
+                        columns=SHARD_KEY_COLUMNS + RAW_COLUMNS[source], append=True,
+                    )
+                for index, record in enumerate(records):
+                    writers[source].write(dict(
+                        record, item_id=item["id"], item_index=index,
+                        page=item["page"], position=item["position"],
+                    ))
+                writers[source].flush()
+            queue.complete(item["id"])
+            handled += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+        http_client.use_rate_limiter(None)
+        limiter.close()
+        queue.close()
+        metrics.export(shard_dir, f"{worker_id}-metrics")
+    print(f"🏁 Worker {worker_id} handled {handled} items")
+    return handled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Join a sharded crawl as a worker")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="shared work queue database")
+    parser.add_argument("--shards", default=DEFAULT_SHARD_DIR, help="shared shard output directory")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="lease length in seconds")
+    args = parser.parse_args()
+
+    run_worker(args.queue, args.shards, lease_seconds=args.lease)
@@ -0,0 +1,223 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_QUEUE_PATH = os.path.join("dataset", "crawl_queue.sqlite")
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def connect(path):
+    """Open the queue database for use by several processes at once."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    # A commit lost to a power cut only means an item is handled twice
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA busy_timeout=60000")
+    return db
+
+
+class WorkQueue:
+    """Durable SQLite work queue shared by crawl workers.
+
+    Each item is a listing page or a detail URL of one source. Workers lease
+    items for a limited time; an item whose lease runs out (its worker died
+    or stalled) goes back to the pool, so every item is handled at least
+    once. Failed items are retried until they run out of attempts.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                UNIQUE (source, kind, payload)
+            );
+            CREATE INDEX IF NOT EXISTS items_status ON items (status, source, id);
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def reset(self):
+        """Drop every item and setting (start of a fresh crawl)."""
+        with self.lock:
+            self.db.execute("DELETE FROM items")
+            self.db.execute("DELETE FROM settings")
+
+    # --- Settings shared with every worker ---
+    def set_setting(self, key, value):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+
+    def settings(self):
+        with self.lock:
+            return {row["key"]: row["value"] for row in self.db.execute("SELECT key, value FROM settings")}
+
+    # --- Items ---
+    def add(self, source, kind, payloads, page, first_position=0):
+        """Queue payloads found on `page`; items already in the queue are left alone."""
+        now = time.time()
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.executemany(
+                """
+                INSERT OR IGNORE INTO items (source, kind, payload, page, position, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(source, kind, str(payload), page, position, now)
+                 for position, payload in enumerate(payloads, start=first_position)],
+            )
+            self.db.execute("COMMIT")
+
+    def lease(self, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Lease an available item to `owner`; None when nothing is available.
+
+        The oldest item of the source with the fewest live leases goes first,
+        so workers spread over the sites instead of queueing up behind one
+        site's rate limit.
+        """
+        now = time.time()
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            busy = dict(self.db.execute(
+                "SELECT source, COUNT(*) FROM items WHERE status = 'leased' AND lease_expires >= ? GROUP BY source",
+                (now,),
+            ).fetchall())
+            oldest = self.db.execute(
+                """
+                SELECT source, MIN(id) FROM items
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                GROUP BY source
+                """,
+                (now,),
+            ).fetchall()
+            row = None
+            if oldest:
+                _, item_id = min(oldest, key=lambda r: (busy.get(r[0], 0), r[1]))
+                row = self.db.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone()
+            if row is not None:
+                self.db.execute(
+                    """
+                    UPDATE items SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                                     attempts = attempts + 1, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (owner, now + lease_seconds, now, row["id"]),
+                )
+            self.db.execute("COMMIT")
+        if row is None:
+            return None
+        item = dict(row)
+        item["attempts"] += 1
+        return item
+
+    def complete(self, item_id):
+        with self.lock:
+            self.db.execute(
+                "UPDATE items SET status = 'done', lease_owner = NULL, error = NULL, updated_at = ? WHERE id = ?",
+                (time.time(), item_id),
+            )
+
+    def fail(self, item, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Put a failed item back in the pool, or mark it failed once out of attempts."""
+        status = "failed" if item["attempts"] >= max_attempts else "pending"
+        with self.lock:
+            self.db.execute(
+                "UPDATE items SET status = ?, lease_owner = NULL, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), item["id"]),
+            )
+        return status
+
+    def outstanding(self):
+        """Items still pending or leased (a leased item may add more work)."""
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM items WHERE status IN ('pending', 'leased')"
+            ).fetchone()[0]
+
+    def summary(self):
+        """Return {source: {status: n}} over all items."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT source, status, COUNT(*) AS n FROM items GROUP BY source, status"
+            ).fetchall()
+        counts = {}
+        for row in rows:
+            counts.setdefault(row["source"], {})[row["status"]] = row["n"]
+        return counts
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class SharedRateLimiter:
+    """Per-host token bucket stored in SQLite, so the rate holds across processes.
+
+    Every worker opening the same database draws from the same buckets.
+    Uses wall-clock time, since workers may run on different machines
+    sharing the volume.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, rate=1.0, burst=2):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.lock = threading.Lock()
+        self.db = connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS host_tokens (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+
+    def acquire(self, url):
+        """Block until the URL's host has a token, then take it; returns seconds waited."""
+        host = urlparse(url).netloc
+        waited = 0.0
+        while True:
+            with self.lock:
+                self.db.execute("BEGIN IMMEDIATE")
+                row = self.db.execute(
+                    "SELECT tokens, updated FROM host_tokens WHERE host = ?", (host,)
+                ).fetchone()
+                now = time.time()
+                tokens = self.capacity if row is None else min(
+                    self.capacity, row["tokens"] + max(now - row["updated"], 0) * self.rate
+                )
+                wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+                if not wait:
+                    tokens -= 1
+                self.db.execute(
+                    "INSERT OR REPLACE INTO host_tokens (host, tokens, updated) VALUES (?, ?, ?)",
+                    (host, tokens, now),
+                )
+                self.db.execute("COMMIT")
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def close(self):
+        with self.lock:
+            self.db.close()